@@ -0,0 +1,4 @@
+"""
+Agent Runtime
+Shared infrastructure for Cornerstone's agents and tools (caching, agent answer caching, data versions, workflow DAGs, tool tracing, dashboard read model, change events, process offload, cross-worker shared state, intent routing, compact tool output, shared workflow state, local model, lazy agents)
+"""
@@ -0,0 +1,212 @@
+"""
+Agent Run Cache
+Two-level cache for agent runs: final answers and read-only tool results
+
+Installed through ADK callbacks, an AgentCache lets an agent skip work it has already done:
+
+1. Answers: before the agent runs, the normalized user message, the agent and the versions
+   of every data domain the agents read (plus the shared workflow state) form a key. On a
+   hit the cached answer is returned and no model is called at all. Answers are stored only
+   for turns that changed nothing: no domain version bump and no workflow state update.
+2. Tool results: calls to the agent's read-only tools are keyed by tool, arguments, data
+   versions and workflow state. On a hit the stored result, and whatever the tool recorded
+   in the workflow state, is replayed without running the tool.
+
+Both levels are TieredCaches: an in-memory LRU with TTL in front of a SQLite disk tier that
+survives restarts. Keys use durable_version_snapshot(), so stored entries stay valid only
+while the data is still pristine (version 0) or within the process that wrote them. Tools
+that change data (create_bid_window, update_timeline, plan_logistics, ...) bump their
+domain, which makes every dependent entry unreachable and clears the memory tiers.
+
+The disk tier lives in CORNERSTONE_CACHE_DIR (default: .cache/ in the repository); set it
+to "off" to keep the caches in memory only.
+"""
+
+import os
+import threading
+
+from .cache import DiskTier, TieredCache
+from .data_versions import durable_version_snapshot, on_version_bump
+from .intent_router import _normalize
+from .workflow_state import STATE_KEY, WorkflowState
+
+
+# Every domain an agent's answer may depend on
+CACHE_DOMAINS = ("signals", "forecasts", "catalog", "bids", "timelines", "logistics")
+
+AGENT_CACHES = {}
+
+_ANSWER_STATE_KEY = "temp:answer_cache"
+_TOOL_STATE_KEY = "temp:tool_cache"
+
+
+def _disk_path(filename):
+    directory = os.environ.get(
+        "CORNERSTONE_CACHE_DIR",
+        os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+    )
+    return None if directory.lower() == "off" else os.path.join(directory, filename)
+
+
+ANSWER_CACHE = TieredCache("agent_answers", max_entries=256, ttl_seconds=900, disk_path=_disk_path("agent_answers.sqlite3"))
+TOOL_CACHE = TieredCache("agent_tools", max_entries=1024, ttl_seconds=300, disk_path=_disk_path("agent_tools.sqlite3"))
+
+
+@on_version_bump
+def _invalidate(domain):
+    # Stale entries are already unreachable (keys carry versions); this frees memory early
+    if domain in CACHE_DOMAINS:
+        ANSWER_CACHE.clear()
+        TOOL_CACHE.clear()
+
+
+def _workflow_facts(state):
+    """The workflow state as a key component; the per-run id never changes a result."""
+    return {name: value for name, value in (state or {}).items() if name != "run_id"}
+
+
+class AgentCache:
+    """
+    Answer and tool-result caching for one agent; see module docstring.
+
+    Args:
+        name: Agent name (part of every key, and used in stats)
+        read_only_tools: Names of the tools whose results may be replayed
+        refresh: Optional callable run before each lookup to pull in fresh data (which may
+                 itself bump a domain version)
+    """
+
+    def __init__(self, name, read_only_tools=(), refresh=None):
+        self.name = name
+        self.read_only_tools = frozenset(read_only_tools)
+        self.refresh = refresh
+        self._lock = threading.Lock()
+        self.answer_hits = 0
+        self.answer_misses = 0
+        self.answers_stored = 0
+        self.tool_hits = 0
+        self.tool_misses = 0
+        AGENT_CACHES[name] = self
+
+    def _versions(self):
+        if self.refresh is not None:
+            self.refresh()
+        return durable_version_snapshot(CACHE_DOMAINS)
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def _answer_key(self, callback_context, text):
+        return DiskTier.hash_key(
+            ("answer", self.name, _normalize(text), self._versions(), _workflow_facts(callback_context.state.get(STATE_KEY)))
+        )
+
+    # ------------------------------------------------------------------
+    # Level 1: answers
+    # ------------------------------------------------------------------
+
+    def before_agent_callback(self, callback_context):
+        """ADK before_agent_callback: returns the cached answer to skip the agent, or None."""
+        content = callback_context.user_content
+        text = "".join(part.text or "" for part in (content.parts or [])) if content else ""
+        if not text.strip():
+            return None
+        key = self._answer_key(callback_context, text)
+        answer = ANSWER_CACHE.get(key)
+        if answer is not None:
+            from google.genai import types   # Only reached inside ADK runs
+
+            self._count("answer_hits")
+            return types.Content(role="model", parts=[types.Part(text=answer)])
+        self._count("answer_misses")
+        callback_context.state[f"{_ANSWER_STATE_KEY}:{self.name}"] = {"key": key, "text": text}
+        return None
+
+    def after_model_callback(self, callback_context, llm_response):
+        """ADK after_model_callback: stores the final answer of a turn that changed nothing."""
+        pending = callback_context.state.get(f"{_ANSWER_STATE_KEY}:{self.name}")
+        content = llm_response.content
+        if not pending or llm_response.partial or content is None or not content.parts:
+            return None
+        if any(part.function_call for part in content.parts):
+            return None
+        answer = "".join(part.text or "" for part in content.parts)
+        # Same key as at the start of the turn: no data version bump, no workflow state update
+        if answer and self._answer_key(callback_context, pending["text"]) == pending["key"]:
+            ANSWER_CACHE.set(pending["key"], answer)
+            self._count("answers_stored")
+        return None
+
+    # ------------------------------------------------------------------
+    # Level 2: read-only tool results
+    # ------------------------------------------------------------------
+
+    def before_tool_callback(self, tool, args, tool_context):
+        """ADK before_tool_callback: returns a cached tool result to skip the call, or None."""
+        if tool.name not in self.read_only_tools:
+            return None
+        versions = self._versions()
+        key = DiskTier.hash_key(("tool", tool.name, args, versions, _workflow_facts(tool_context.state.get(STATE_KEY))))
+        entry = TOOL_CACHE.get(key)
+        if entry is not None:
+            self._count("tool_hits")
+            if entry["recorded"]:
+                # Replay only what the tool recorded, keeping this run's own identity (run_id)
+                state = WorkflowState.from_dict(tool_context.state.get(STATE_KEY))
+                tool_context.state[STATE_KEY] = WorkflowState.from_dict({**state.to_dict(), **entry["recorded"]}).to_dict()
+            return entry["result"]
+        self._count("tool_misses")
+        tool_context.state[f"{_TOOL_STATE_KEY}:{tool_context.function_call_id}"] = {
+            "key": key,
+            "versions": list(versions),
+            "workflow": tool_context.state.get(STATE_KEY) or {}
+        }
+        return None
+
+    def after_tool_callback(self, tool, args, tool_context, tool_response):
+        """ADK after_tool_callback: stores a successful read-only tool result."""
+        pending = tool_context.state.get(f"{_TOOL_STATE_KEY}:{tool_context.function_call_id}")
+        if not pending or not isinstance(tool_response, dict) or tool_response.get("status") == "error":
+            return None
+        if list(durable_version_snapshot(CACHE_DOMAINS)) == pending["versions"]:
+            after = tool_context.state.get(STATE_KEY) or {}
+            recorded = {
+                name: value for name, value in after.items()
+                if name != "run_id" and pending["workflow"].get(name) != value
+            }
+            TOOL_CACHE.set(pending["key"], {"result": tool_response, "recorded": recorded})
+        return None
+
+    def callbacks(self):
+        """Keyword arguments installing this cache on an Agent(...)."""
+        return {
+            "before_agent_callback": self.before_agent_callback,
+            "after_model_callback": self.after_model_callback,
+            "before_tool_callback": self.before_tool_callback,
+            "after_tool_callback": self.after_tool_callback
+        }
+
+    def stats(self):
+        answers = self.answer_hits + self.answer_misses
+        tools = self.tool_hits + self.tool_misses
+        return {
+            "name": self.name,
+            "answer_hits": self.answer_hits,
+            "answer_misses": self.answer_misses,
+            "answers_stored": self.answers_stored,
+            "answer_hit_rate": round(self.answer_hits / answers, 3) if answers else 0.0,
+            "tool_hits": self.tool_hits,
+            "tool_misses": self.tool_misses,
+            "tool_hit_rate": round(self.tool_hits / tools, 3) if tools else 0.0,
+            "read_only_tools": sorted(self.read_only_tools)
+        }
+
+
+def get_agent_cache_stats():
+    """Per-agent hit rates plus the stats of both cache levels."""
+    return {
+        "answers": ANSWER_CACHE.stats(),
+        "tools": TOOL_CACHE.stats(),
+        "agents": [cache.stats() for cache in AGENT_CACHES.values()]
+    }
@@ -0,0 +1,269 @@
+"""
+Tool Result Cache
+Size-bounded LRU cache with TTL expiry and hit/miss counters, an optional SQLite-backed disk
+tier that survives restarts, and a memoizing decorator for agent tools
+
+Cache keys include the versions of the data domains a tool reads, so results are
+invalidated as soon as that data changes; the cache also drops its entries eagerly
+when one of its domains is bumped.
+"""
+
+import copy
+import functools
+import hashlib
+import inspect
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+from .data_versions import version_snapshot, on_version_bump
+
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire after `ttl_seconds`."""
+
+    def __init__(self, max_entries=512, ttl_seconds=300.0, name="cache"):
+        self.name = name
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key, default=None):
+        """Returns the cached value for `key`, or `default` on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is _MISSING:
+                self.misses += 1
+                return default
+            expires_at, value = entry
+            if expires_at <= now:
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return default
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, ttl_seconds=None):
+        """Stores `value`, evicting the least recently used entry when full."""
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        with self._lock:
+            self._entries[key] = (time.monotonic() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Drops every entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.invalidations += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+    def stats(self):
+        """Hit/miss counters and occupancy."""
+        lookups = self.hits + self.misses
+        return {
+            "name": self.name,
+            "size": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+            "invalidations": self.invalidations
+        }
+
+
+class DiskTier:
+    """
+    SQLite key/value store with TTL, used behind a TTLCache so entries survive restarts.
+
+    Keys are hashed; values must be JSON-serializable. Expiry uses wall-clock time, and the
+    table is pruned back to `max_entries` (oldest writes first) as it grows.
+    """
+
+    PRUNE_EVERY = 64   # writes between size checks
+
+    def __init__(self, path, max_entries=10000, ttl_seconds=3600.0):
+        self.path = path
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._connect()
+        # A SQLite connection must not be used across fork: forked server workers open their own
+        os.register_at_fork(after_in_child=self._connect)
+
+    def _connect(self):
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS entries (key TEXT PRIMARY KEY, value TEXT, expires_at REAL, written_at REAL)"
+        )
+
+    @staticmethod
+    def hash_key(key):
+        return hashlib.sha256(json.dumps(key, sort_keys=True, default=str).encode()).hexdigest()
+
+    def get(self, key, default=None):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT value FROM entries WHERE key = ? AND expires_at > ?", (self.hash_key(key), time.time())
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return json.loads(row[0])
+
+    def set(self, key, value, ttl_seconds=None):
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        now = time.time()
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)",
+                (self.hash_key(key), json.dumps(value, default=str), now + ttl, now)
+            )
+            self._writes += 1
+            if self._writes % self.PRUNE_EVERY == 0:
+                self._prune(now)
+
+    def _prune(self, now):
+        self._db.execute("DELETE FROM entries WHERE expires_at <= ?", (now,))
+        self._db.execute(
+            "DELETE FROM entries WHERE key NOT IN (SELECT key FROM entries ORDER BY written_at DESC LIMIT ?)",
+            (self.max_entries,)
+        )
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM entries")
+
+    def __len__(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+
+class TieredCache:
+    """
+    In-memory TTLCache in front of an optional DiskTier. Disk hits are promoted to memory.
+
+    Both tiers key on the same tuple, so keys should include durable data versions
+    (data_versions.durable_version_snapshot) when entries are meant to outlive the process.
+    """
+
+    def __init__(self, name, max_entries=512, ttl_seconds=300.0, disk_path=None, disk_max_entries=10000):
+        self.name = name
+        self.memory = TTLCache(max_entries, ttl_seconds, name)
+        self.disk = DiskTier(disk_path, disk_max_entries, ttl_seconds) if disk_path else None
+
+    def get(self, key, default=None):
+        value = self.memory.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        if self.disk is not None:
+            value = self.disk.get(key, _MISSING)
+            if value is not _MISSING:
+                self.memory.set(key, value)
+                return value
+        return default
+
+    def set(self, key, value):
+        self.memory.set(key, value)
+        if self.disk is not None:
+            self.disk.set(key, value)
+
+    def clear(self, disk=False):
+        """Drops the memory tier (and the disk tier too if `disk`)."""
+        self.memory.clear()
+        if disk and self.disk is not None:
+            self.disk.clear()
+
+    def stats(self):
+        stats = self.memory.stats()
+        if self.disk is not None:
+            stats["disk"] = {
+                "path": self.disk.path,
+                "size": len(self.disk),
+                "max_entries": self.disk.max_entries,
+                "hits": self.disk.hits,
+                "misses": self.disk.misses
+            }
+        return stats
+
+
+def memoize_tool(cache, domains=(), before=None):
+    """
+    Decorator that caches a tool's result per (arguments, data versions of `domains`).
+    Arguments are bound to the tool's signature first, so positional, keyword and default
+    spellings of a call share one entry; hits return a copy of the stored result.
+
+    Args:
+        cache: TTLCache to store results in
+        domains: Data domains the tool reads; a version bump on any of them invalidates
+        before: Optional callable run before each lookup (e.g. to pull in fresh data,
+                which may itself bump a domain version)
+    """
+    watched = set(domains)
+
+    @on_version_bump
+    def _invalidate(domain):
+        if domain in watched:
+            cache.clear()
+
+    def decorator(fn):
+        signature = inspect.signature(fn)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if before is not None:
+                before()
+            try:
+                # f(x), f(arg=x) and f() with x as the default are the same call
+                bound = signature.bind(*args, **kwargs)
+            except TypeError:
+                return fn(*args, **kwargs)  # Let the tool raise its own argument error
+            bound.apply_defaults()
+            key = (fn.__name__, tuple(bound.arguments.items()), version_snapshot(domains))
+            try:
+                hash(key)
+            except TypeError:
+                return fn(*args, **kwargs)  # Unhashable arguments are never cached
+
+            result = cache.get(key, _MISSING)
+            if result is not _MISSING:
+                # Callers annotate and compact results in place; each gets its own copy
+                return copy.deepcopy(result)
+            result = fn(*args, **kwargs)
+            # Only successful results are worth keeping
+            if not (isinstance(result, dict) and result.get("status") == "error"):
+                cache.set(key, copy.deepcopy(result))
+            return result
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
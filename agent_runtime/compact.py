@@ -0,0 +1,86 @@
+"""
+Compact Tool Output
+LLM-facing variants of agent tools that return smaller, numeric payloads
+
+Everything a tool returns to an agent becomes model context, so the agents are given
+wrapped tools that trim results before the model sees them: redundant fields are dropped,
+ranked lists are cut to their top k (with a count of what was omitted), empty values are
+removed, and preformatted strings ("$11,425.00", "92%", "2000 units", "$2.20 - $3.20")
+become plain numbers. The Flask API imports the unwrapped tools and keeps full payloads.
+"""
+
+import functools
+import re
+
+
+_NUMBER = r"-?\$?(\d[\d,]*(?:\.\d+)?)"
+_AMOUNT_RE = re.compile(rf"{_NUMBER}(%|/unit| units?)?")
+_RANGE_RE = re.compile(rf"{_NUMBER}\s*-\s*{_NUMBER}(?: per unit)?")
+
+
+def _to_number(text):
+    """Numeric value of a preformatted amount, range or percentage, or the text itself."""
+    stripped = text.strip()
+    if not stripped or not (stripped[0].isdigit() or stripped[0] in "$-"):
+        return text
+    amount = _AMOUNT_RE.fullmatch(stripped)
+    if amount:
+        value = float(amount.group(1).replace(",", ""))
+        if stripped.startswith("-"):
+            value = -value
+        if amount.group(2) == "%":
+            return round(value / 100, 4)
+        return int(value) if value.is_integer() and "." not in amount.group(1) else value
+    price_range = _RANGE_RE.fullmatch(stripped)
+    if price_range:
+        return [float(price_range.group(1).replace(",", "")), float(price_range.group(2).replace(",", ""))]
+    return text
+
+
+def compact_result(value, drop=(), top_k=None):
+    """
+    Compacts a tool result (recursively).
+
+    Args:
+        value: The tool's return value
+        drop: Field names removed wherever they appear
+        top_k: Maximum length of any list (longer lists are truncated, and an
+               '<field>_omitted' count is added next to them); None keeps whole lists
+
+    Returns:
+        The compacted value
+    """
+    if isinstance(value, dict):
+        compacted = {}
+        for key, item in value.items():
+            if key in drop or item is None or item == "" or item == [] or item == {}:
+                continue
+            if isinstance(item, list) and top_k is not None and len(item) > top_k:
+                compacted[f"{key}_omitted"] = len(item) - top_k
+                item = item[:top_k]
+            compacted[key] = compact_result(item, drop, top_k)
+        return compacted
+    if isinstance(value, list):
+        return [compact_result(item, drop, top_k) for item in value]
+    if isinstance(value, str):
+        return _to_number(value)
+    return value
+
+
+def compact_tool(fn, drop=(), top_k=None):
+    """
+    Wraps a tool so agents receive compact_result(fn(...)).
+
+    The wrapper keeps the tool's name, docstring and signature, so ADK builds the same
+    function declaration for it. Error results pass through unchanged.
+    """
+    drop = frozenset(drop)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        result = fn(*args, **kwargs)
+        if isinstance(result, dict) and result.get("status") == "error":
+            return result
+        return compact_result(result, drop, top_k)
+
+    return wrapper
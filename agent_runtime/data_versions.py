@@ -0,0 +1,68 @@
+"""
+Data Versions
+Monotonic version counters per data domain ('signals', 'forecasts', 'catalog', ...)
+
+Anything derived from a domain's data can key itself on that domain's version: a bump
+makes old derived results unreachable. Listeners registered with on_version_bump() are
+called after every bump, so caches can also drop stale entries eagerly.
+"""
+
+import os
+import threading
+import uuid
+
+# Identifies this process's version history; see durable_version_snapshot()
+BOOT_ID = uuid.uuid4().hex[:8]
+
+
+def _new_boot_id():
+    # Forked server workers share the master's history only up to the fork
+    global BOOT_ID
+    BOOT_ID = uuid.uuid4().hex[:8]
+
+
+os.register_at_fork(after_in_child=_new_boot_id)
+
+_VERSIONS = {}
+_LISTENERS = []
+_LOCK = threading.Lock()
+
+
+def bump_version(domain):
+    """Increments a domain's version and notifies listeners. Returns the new version."""
+    with _LOCK:
+        version = _VERSIONS.get(domain, 0) + 1
+        _VERSIONS[domain] = version
+        listeners = list(_LISTENERS)
+    for listener in listeners:
+        listener(domain)
+    return version
+
+
+def get_version(domain):
+    """Current version of a domain (0 if it has never changed)."""
+    return _VERSIONS.get(domain, 0)
+
+
+def version_snapshot(domains):
+    """Tuple of current versions for several domains, usable as part of a cache key."""
+    return tuple(_VERSIONS.get(domain, 0) for domain in domains)
+
+
+def durable_version_snapshot(domains):
+    """
+    Like version_snapshot(), but safe to persist across restarts. The data and its counters
+    both start over on restart, so only version 0 (the pristine data) means the same thing
+    in every process; later versions are tagged with this process's BOOT_ID.
+    """
+    return tuple(
+        f"{BOOT_ID}:{version}" if version else 0
+        for version in (_VERSIONS.get(domain, 0) for domain in domains)
+    )
+
+
+def on_version_bump(listener):
+    """Registers `listener(domain)` to be called after every version bump."""
+    with _LOCK:
+        _LISTENERS.append(listener)
+    return listener
@@ -0,0 +1,308 @@
+"""
+Change Events
+In-process bus pushing bid, timeline and tracking changes to subscribed clients
+
+The stateful tools publish a ChangeEvent after each change ('bid.opened', 'bid.submitted',
+'bid.closed', 'bid.winners', 'timeline.updated', 'tracking.updated'). Each subscriber,
+normally one open SSE connection, picks the jobs and topics (the part before the dot) it
+cares about and gets its own bounded buffer.
+
+Publishing never waits for subscribers. A subscriber whose buffer is full is a slow
+consumer, and it is dropped instead of stalling the tools or growing without limit: its
+stream ends with a 'dropped' event and the client reconnects. A server worker that shuts
+down (close()) drops all of its subscribers the same way. The last REPLAY_EVENTS events
+are kept, so a reconnect that sends Last-Event-ID gets what it missed. If the gap is older
+than that, or holds more of the client's events than its buffer, the client gets a
+'resync' event telling it to reload /api/dashboard instead.
+
+Every open SSE stream (change events and workflow job progress alike) holds a server
+thread for as long as it is open. STREAM_SLOTS caps them per process at
+CORNERSTONE_MAX_STREAMS, which the servers set well below their thread count, so open
+streams cannot take every thread away from ordinary requests. A stream over the cap is
+refused (TooManySubscribers, a 503 for the client to retry).
+"""
+
+import json
+import os
+import threading
+import time
+from collections import deque
+
+
+BUFFER_EVENTS = int(os.environ.get("CORNERSTONE_EVENTS_BUFFER", "256"))
+MAX_SUBSCRIBERS = int(os.environ.get("CORNERSTONE_EVENTS_MAX_SUBSCRIBERS", "1000"))
+MAX_STREAMS = int(os.environ.get("CORNERSTONE_MAX_STREAMS", "0"))   # 0: no cap
+REPLAY_EVENTS = 1024
+HEARTBEAT_SECONDS = 15.0
+
+TOPICS = ("bid", "timeline", "tracking")
+
+
+class TooManySubscribers(Exception):
+    """Raised when MAX_SUBSCRIBERS subscribers, or MAX_STREAMS streams, are already open."""
+
+
+class ChangeEvent:
+    """One published change, numbered in publish order."""
+
+    __slots__ = ("event_id", "type", "topic", "job_id", "data", "published_at")
+
+    def __init__(self, event_id, event_type, job_id, data):
+        self.event_id = event_id
+        self.type = event_type
+        self.topic = event_type.split(".", 1)[0]
+        self.job_id = job_id
+        self.data = data
+        self.published_at = time.strftime("%Y-%m-%d %H:%M:%S")
+
+    def to_sse(self):
+        payload = {"type": self.type, "job_id": self.job_id, "published_at": self.published_at, "data": self.data}
+        return f"id: {self.event_id}\nevent: {self.type}\ndata: {json.dumps(payload, default=str)}\n\n"
+
+
+class Subscription:
+    """A subscriber's filter and bounded event buffer."""
+
+    def __init__(self, job_ids=None, topics=None, max_buffer=BUFFER_EVENTS):
+        self.job_ids = frozenset(job_ids) if job_ids else None
+        self.topics = frozenset(topics) if topics else None
+        self.max_buffer = max_buffer
+        self.dropped = False
+        self.drop_reason = None
+        self.resync = False
+        self._buffer = deque()
+        self._cond = threading.Condition()
+
+    def wants(self, event):
+        return ((self.job_ids is None or event.job_id in self.job_ids)
+                and (self.topics is None or event.topic in self.topics))
+
+    def deliver(self, event):
+        """Buffers the event; returns False (and marks the subscriber dropped) when full."""
+        with self._cond:
+            if self.dropped:
+                return False
+            if len(self._buffer) >= self.max_buffer:
+                self.drop("slow consumer: event buffer full")
+                return False
+            self._buffer.append(event)
+            self._cond.notify_all()
+            return True
+
+    def drop(self, reason):
+        """Ends the subscriber's stream (after it gets a 'dropped' event saying why)."""
+        with self._cond:
+            self.dropped = True
+            self.drop_reason = reason
+            self._buffer.clear()
+            self._cond.notify_all()
+
+    def next_events(self, timeout):
+        """Blocks until events are buffered (or the subscriber is dropped, or timeout); drains them."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._buffer or self.dropped, timeout)
+            events = list(self._buffer)
+            self._buffer.clear()
+            return events
+
+
+class ChangeBus:
+    """Fans published change events out to subscribers."""
+
+    def __init__(self, replay_events=REPLAY_EVENTS, max_subscribers=MAX_SUBSCRIBERS):
+        self.max_subscribers = max_subscribers
+        self._recent = deque(maxlen=replay_events)
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._next_id = 1
+        self.published = 0
+        self.dropped_subscribers = 0
+
+    def publish(self, event_type, job_id, event_id=None, **data):
+        """
+        Publishes a change to every interested subscriber. Returns the ChangeEvent.
+        `event_id` overrides the bus's own numbering (e.g. with a shared journal sequence).
+        """
+        with self._lock:
+            if event_id is None:
+                event_id = self._next_id
+            event = ChangeEvent(event_id, event_type, job_id, data)
+            self._next_id = max(self._next_id, event_id + 1)
+            self.published += 1
+            self._recent.append(event)
+            subscribers = list(self._subscribers)
+        for subscriber in subscribers:
+            if subscriber.wants(event) and not subscriber.deliver(event):
+                self.unsubscribe(subscriber, dropped=True)
+        return event
+
+    def subscribe(self, job_ids=None, topics=None, last_event_id=None):
+        """
+        Registers a subscriber for the given jobs and topics (None: all).
+
+        Args:
+            job_ids: Job ids to receive events for
+            topics: Topics ('bid', 'timeline', 'tracking') to receive events for
+            last_event_id: Id of the last event the client saw; the newer events it wants
+                           are buffered for it straight away, or, when some are no longer
+                           retained or they overflow its buffer, it is told to resync
+
+        Raises:
+            TooManySubscribers: If MAX_SUBSCRIBERS are already subscribed
+        """
+        subscription = Subscription(job_ids, topics)
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                raise TooManySubscribers(f"{len(self._subscribers)} event streams already open; try again shortly.")
+            if last_event_id is not None:
+                missed = [e for e in self._recent if e.event_id > last_event_id and subscription.wants(e)]
+                oldest = self._recent[0].event_id if self._recent else self._next_id
+                # Replay only a complete gap; otherwise the client reloads the dashboard instead
+                subscription.resync = last_event_id + 1 < oldest or len(missed) > subscription.max_buffer
+                if not subscription.resync:
+                    for event in missed:
+                        subscription.deliver(event)
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription, dropped=False):
+        with self._lock:
+            if subscription in self._subscribers:
+                self._subscribers.discard(subscription)
+                if dropped:
+                    self.dropped_subscribers += 1
+
+    def close(self, reason="server shutting down"):
+        """Drops every subscriber, so their clients reconnect (e.g. to another server worker)."""
+        with self._lock:
+            subscribers, self._subscribers = self._subscribers, set()
+        for subscriber in subscribers:
+            subscriber.drop(reason)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "subscribers": len(self._subscribers),
+                "max_subscribers": self.max_subscribers,
+                "buffer_events": BUFFER_EVENTS,
+                "published": self.published,
+                "last_event_id": self._next_id - 1,
+                "dropped_subscribers": self.dropped_subscribers
+            }
+
+
+CHANGE_BUS = ChangeBus()
+
+
+class StreamSlots:
+    """Counts this process's open SSE streams against a cap (each one holds a server thread)."""
+
+    def __init__(self, limit=MAX_STREAMS):
+        self.limit = limit
+        self.open = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def hold(self, open_stream):
+        """
+        Takes a slot and returns `open_stream()` wrapped so the slot is released when the
+        server closes the response.
+
+        Raises:
+            TooManySubscribers: If `limit` streams are already open
+        """
+        with self._lock:
+            if self.limit and self.open >= self.limit:
+                self.rejected += 1
+                raise TooManySubscribers(f"{self.open} event streams already open on this server worker; try again shortly.")
+            self.open += 1
+        try:
+            return _HeldStream(self, open_stream())
+        except BaseException:
+            self._release()
+            raise
+
+    def _release(self):
+        with self._lock:
+            self.open -= 1
+
+    def stats(self):
+        with self._lock:
+            return {"open": self.open, "max_streams": self.limit or None, "rejected": self.rejected}
+
+
+class _HeldStream:
+    """A stream iterable whose close() (called by the server, even before the first chunk) frees its slot."""
+
+    def __init__(self, slots, stream):
+        self._slots = slots
+        self._stream = stream
+        self._closed = False
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._stream)
+
+    def close(self):
+        if not self._closed:
+            self._closed = True
+            try:
+                getattr(self._stream, "close", lambda: None)()
+            finally:
+                self._slots._release()
+
+
+STREAM_SLOTS = StreamSlots()
+
+
+def publish_change(event_type, job_id, event_id=None, **data):
+    """Publishes a change on the process-wide bus."""
+    return CHANGE_BUS.publish(event_type, job_id, event_id, **data)
+
+
+class ChangeStream:
+    """
+    Server-Sent Events for a subscription, with periodic heartbeats. Ends when the
+    subscriber is dropped; closing it (as the server does when the client disconnects,
+    even before the first chunk) unsubscribes.
+    """
+
+    def __init__(self, subscription, bus=CHANGE_BUS, heartbeat_seconds=HEARTBEAT_SECONDS):
+        self.subscription = subscription
+        self._bus = bus
+        self._events = self._generate(heartbeat_seconds)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        return next(self._events)
+
+    def close(self):
+        self._events.close()
+        self._bus.unsubscribe(self.subscription)
+
+    def _generate(self, heartbeat_seconds):
+        subscription = self.subscription
+        try:
+            yield "retry: 3000\n\n"
+            if subscription.resync:
+                yield f"event: resync\ndata: {json.dumps({'reason': 'missed events can no longer be replayed', 'reload': '/api/dashboard'})}\n\n"
+            while True:
+                events = subscription.next_events(heartbeat_seconds)
+                for event in events:
+                    yield event.to_sse()
+                if subscription.dropped:
+                    yield f"event: dropped\ndata: {json.dumps({'reason': subscription.drop_reason, 'buffer_events': subscription.max_buffer})}\n\n"
+                    return
+                if not events:
+                    yield ": heartbeat\n\n"
+        finally:
+            self._bus.unsubscribe(subscription)
+
+
+def stream_changes(subscription, bus=CHANGE_BUS, heartbeat_seconds=HEARTBEAT_SECONDS):
+    """The SSE stream of a subscription (see ChangeStream)."""
+    return ChangeStream(subscription, bus, heartbeat_seconds)
@@ -0,0 +1,230 @@
+"""
+Intent Router
+Deterministic fast path that answers common chat queries without an LLM round trip
+
+Each agent declares a small table of Intents: phrasings that map unambiguously to one of
+its tools, plus parameter extraction (maker IDs, job IDs, dates, quantities). Installed as
+the agent's before_model_callback, the router handles a turn in two model-free steps:
+
+1. The user's message fully matches exactly one intent and every required parameter was
+   extracted: the router returns the tool call itself, so ADK runs the tool as usual.
+2. The tool's response comes back: the router answers with the tool's own summary.
+
+Anything else (no match, several matches, missing parameters) falls through to the LLM.
+"""
+
+import re
+import threading
+import uuid
+
+
+ROUTED_CALL_PREFIX = "route-"
+
+ROUTERS = {}
+
+
+# ============================================================================
+# PARAMETER EXTRACTION
+# ============================================================================
+
+# Fragments for intent patterns (matched against the lowercased message)
+JOB_PATTERN = r"(?:job|knick)_\w+"
+MAKER_PATTERN = r"maker(?!s\b)[\s_-]?[a-z]"   # Not the plural "makers"
+PRODUCT_PATTERN = r"prod[\s_-]?\d+"
+
+_MAKER_RE = re.compile(r"\bmaker(?!s\b)[\s_-]?([a-z])\b", re.IGNORECASE)
+_PRODUCT_RE = re.compile(r"\bprod[\s_-]?(\d{3,})\b", re.IGNORECASE)
+_JOB_RE = re.compile(r"\b((?:job|knick)_[a-z0-9_]+)\b", re.IGNORECASE)
+_DATE_RE = re.compile(r"\b(\d{4}-\d{2}-\d{2})\b")
+_QUANTITY_RE = re.compile(r"\b(\d{1,3}(?:,\d{3})+|\d+)\s*(?:units?|pcs|pieces)?\b", re.IGNORECASE)
+_DAYS_RE = re.compile(r"\b(\d+)\s+(?:more\s+|extra\s+|additional\s+)?days?\b", re.IGNORECASE)
+_SKILL_RE = re.compile(r"\b(cnc|3d)\b", re.IGNORECASE)
+_TIMEFRAME_RE = re.compile(r"\b(30|60|90)[\s_-]?days?\b", re.IGNORECASE)
+
+
+def maker_ids(text):
+    """All maker IDs mentioned, normalized to 'MAKER_X' ('maker a', 'Maker_A', ...)."""
+    return [f"MAKER_{letter.upper()}" for letter in _MAKER_RE.findall(text)]
+
+
+def maker_id(text):
+    """The single maker ID mentioned, or None when there is none or several."""
+    found = set(maker_ids(text))
+    return found.pop() if len(found) == 1 else None
+
+
+def product_id(text):
+    found = _PRODUCT_RE.search(text)
+    return f"PROD_{found.group(1)}" if found else None
+
+
+def job_id(text):
+    found = _JOB_RE.search(text)
+    return found.group(1).upper() if found else None
+
+
+def iso_date(text):
+    found = _DATE_RE.search(text)
+    return found.group(1) if found else None
+
+
+def quantity(text):
+    """First standalone number that is not part of an ID, date or day count."""
+    cleaned = _DATE_RE.sub(" ", _JOB_RE.sub(" ", _PRODUCT_RE.sub(" ", text)))
+    cleaned = _DAYS_RE.sub(" ", _TIMEFRAME_RE.sub(" ", cleaned))
+    found = _QUANTITY_RE.search(cleaned)
+    return int(found.group(1).replace(",", "")) if found else None
+
+
+def day_count(text):
+    found = _DAYS_RE.search(text)
+    return int(found.group(1)) if found else None
+
+
+def skill(text):
+    found = _SKILL_RE.search(text)
+    return found.group(1).upper() if found else None
+
+
+def timeframe(text):
+    found = _TIMEFRAME_RE.search(text)
+    return f"{found.group(1)}_days" if found else None
+
+
+def _normalize(text):
+    text = " ".join(text.lower().split())
+    text = re.sub(r"^(?:please|hey|hi|ok|okay)[\s,]+", "", text)
+    text = re.sub(r"[\s,]+please$", "", text.rstrip("?!. "))
+    return text.rstrip("?!. ")
+
+
+# ============================================================================
+# ROUTER
+# ============================================================================
+
+class Intent:
+    """
+    One deterministic phrasing -> tool mapping.
+
+    Args:
+        name: Intent name (used in stats)
+        tool: The tool function to call
+        patterns: Regexes that must match the whole normalized (lowercase) message
+        params: Optional callable(text) -> dict of tool arguments, or None when a required
+                argument could not be extracted (the message then goes to the LLM)
+        respond: Optional callable(result) -> str for tools whose report has no summary
+    """
+
+    def __init__(self, name, tool, patterns, params=None, respond=None):
+        self.name = name
+        self.tool = tool
+        self.patterns = [re.compile(p) for p in patterns]
+        self.params = params
+        self.respond = respond
+
+    def matches(self, normalized):
+        return any(p.fullmatch(normalized) for p in self.patterns)
+
+
+class IntentRouter:
+    """Per-agent intent table with hit-rate counters; see module docstring."""
+
+    def __init__(self, name, intents):
+        self.name = name
+        self.intents = {intent.name: intent for intent in intents}
+        self._by_tool = {intent.tool.__name__: intent for intent in intents}
+        self._lock = threading.Lock()
+        self.routed = 0
+        self.fallbacks = 0
+        self.ambiguous = 0
+        self.by_intent = {intent.name: 0 for intent in intents}
+        ROUTERS[name] = self
+
+    def route(self, text):
+        """
+        Resolves a user message to a tool call.
+
+        Returns:
+            (Intent, dict of arguments), or None when the LLM should handle the message
+        """
+        normalized = _normalize(text)
+        candidates = [intent for intent in self.intents.values() if intent.matches(normalized)]
+        args = None
+        if len(candidates) == 1:
+            intent = candidates[0]
+            args = intent.params(text) if intent.params else {}
+
+        with self._lock:
+            if args is None:
+                self.fallbacks += 1
+                if len(candidates) > 1:
+                    self.ambiguous += 1
+                return None
+            self.routed += 1
+            self.by_intent[intent.name] += 1
+        return intent, args
+
+    def answer(self, tool_name, result):
+        """Deterministic reply text for a routed tool's result."""
+        if not isinstance(result, dict):
+            return str(result)
+        if result.get("status") == "error":
+            return result.get("error_message", "The request could not be completed.")
+        intent = self._by_tool.get(tool_name)
+        if intent is not None and intent.respond is not None:
+            return intent.respond(result)
+        report = result.get("report", {})
+        return report.get("summary") or report.get("message") or str(report)
+
+    def before_model_callback(self, callback_context, llm_request):
+        """ADK before_model_callback: returns a response to skip the model, or None."""
+        # Only reached inside ADK runs; importing here keeps tool-only imports ADK-free
+        from google.adk.models import LlmResponse
+        from google.genai import types
+
+        if not llm_request.contents:
+            return None
+        last = llm_request.contents[-1]
+        parts = last.parts or []
+
+        # Step 2: the routed tool has run; answer from its result
+        for part in parts:
+            response = part.function_response
+            if response is not None and (response.id or "").startswith(ROUTED_CALL_PREFIX):
+                text = self.answer(response.name, response.response)
+                return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+        # Step 1: only a fresh user message is eligible for routing
+        text = "".join(part.text or "" for part in parts)
+        if last.role != "user" or not text or any(part.function_response for part in parts):
+            return None
+        routed = self.route(text)
+        if routed is None:
+            return None
+        intent, args = routed
+        call = types.FunctionCall(id=f"{ROUTED_CALL_PREFIX}{uuid.uuid4().hex[:12]}", name=intent.tool.__name__, args=args)
+        return LlmResponse(content=types.Content(role="model", parts=[types.Part(function_call=call)]))
+
+    def stats(self):
+        decisions = self.routed + self.fallbacks
+        return {
+            "name": self.name,
+            "routed": self.routed,
+            "fallbacks": self.fallbacks,
+            "ambiguous": self.ambiguous,
+            "hit_rate": round(self.routed / decisions, 3) if decisions else 0.0,
+            "by_intent": dict(self.by_intent)
+        }
+
+
+def get_router_stats():
+    """Hit-rate stats for every registered router, plus the overall hit rate."""
+    routers = [router.stats() for router in ROUTERS.values()]
+    routed = sum(r["routed"] for r in routers)
+    decisions = routed + sum(r["fallbacks"] for r in routers)
+    return {
+        "hit_rate": round(routed / decisions, 3) if decisions else 0.0,
+        "routed": routed,
+        "fallbacks": decisions - routed,
+        "routers": routers
+    }
@@ -0,0 +1,39 @@
+"""
+Lazy Agents
+Deferred construction of ADK agent objects, so importing tools does not import ADK
+
+Agent modules define their tools at module level but build `root_agent` in a function.
+lazy_module_attrs() returns a module-level __getattr__ (PEP 562) that builds an attribute
+on first access, caches it in the module's globals and returns it; later lookups never
+reach __getattr__ again. `from demand_agent.agent import root_agent`, ADK web's agent
+loader and the orchestrator all trigger the build transparently, while the Flask routes,
+which only import tool functions, never load google.adk at all.
+"""
+
+import threading
+
+
+def lazy_module_attrs(module_globals, **builders):
+    """
+    Module __getattr__ building each named attribute on first access.
+
+    Args:
+        module_globals: The module's globals() (built values are stored there)
+        **builders: Attribute name -> zero-argument callable building its value
+
+    Returns:
+        A function to assign to the module's __getattr__
+    """
+    lock = threading.RLock()
+    module_name = module_globals.get("__name__")
+
+    def __getattr__(name):
+        builder = builders.get(name)
+        if builder is None:
+            raise AttributeError(f"module {module_name!r} has no attribute {name!r}")
+        with lock:
+            if name not in module_globals:
+                module_globals[name] = builder()
+        return module_globals[name]
+
+    return __getattr__
@@ -0,0 +1,197 @@
+"""
+Local Model Backend
+Deterministic, offline stand-in for Gemini, for benchmarking the multi-agent stack
+
+ScriptedLlm plays each agent's turn the way its instruction describes it: it calls, one
+per model step, every tool the instruction mentions (in the order mentioned) whose
+required arguments it can omit, then replies with the tools' summaries. With workflow
+state shared between agents (see workflow_state.py) that is enough to drive the whole
+Master Orchestrator end to end without network access.
+
+Every model step sleeps for a configurable artificial latency (with optional seeded
+jitter), so runs measure orchestration overhead, tool time and concurrency limits
+reproducibly. Token usage is estimated from request size.
+
+Select it with:
+    CORNERSTONE_LLM_BACKEND=local
+    CORNERSTONE_LOCAL_LLM_LATENCY_MS=400     (per model step, default 0)
+    CORNERSTONE_LOCAL_LLM_JITTER_MS=100      (uniform +/- jitter, default 0)
+    CORNERSTONE_LOCAL_LLM_SEED=7
+"""
+
+import asyncio
+import os
+import random
+import re
+import threading
+from typing import AsyncGenerator
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+
+
+_TOOL_MENTION_RE = re.compile(r"\b([a-z_][a-z0-9_]*)\(")
+_CHARS_PER_TOKEN = 4
+
+
+class LocalModelStats:
+    """Counters shared by every ScriptedLlm instance."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls = 0
+            self.tool_calls = 0
+            self.simulated_latency_ms = 0.0
+            self.prompt_tokens = 0
+            self.by_agent = {}
+
+    def record(self, agent, latency_ms, prompt_tokens, tool_call):
+        with self._lock:
+            self.calls += 1
+            self.tool_calls += int(tool_call)
+            self.simulated_latency_ms += latency_ms
+            self.prompt_tokens += prompt_tokens
+            self.by_agent[agent] = self.by_agent.get(agent, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "model_calls": self.calls,
+                "tool_calls_requested": self.tool_calls,
+                "simulated_latency_ms": round(self.simulated_latency_ms, 1),
+                "estimated_prompt_tokens": self.prompt_tokens,
+                "calls_by_agent": dict(self.by_agent)
+            }
+
+
+LOCAL_MODEL_STATS = LocalModelStats()
+
+
+class ScriptedLlm(BaseLlm):
+    """BaseLlm that scripts tool calls from the agent instruction; see module docstring."""
+
+    latency_ms: float = 0.0
+    jitter_ms: float = 0.0
+    seed: int = 0
+
+    def model_post_init(self, context):
+        self._rng = random.Random(self.seed)
+        self._rng_lock = threading.Lock()
+
+    @classmethod
+    def supported_models(cls):
+        return [r"local/.*"]
+
+    def _latency(self):
+        if not self.jitter_ms:
+            return self.latency_ms
+        with self._rng_lock:
+            return max(0.0, self.latency_ms + self._rng.uniform(-self.jitter_ms, self.jitter_ms))
+
+    async def generate_content_async(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        latency = self._latency()
+        if latency:
+            await asyncio.sleep(latency / 1000)
+
+        called, summaries = _current_turn(llm_request.contents)
+        next_tool = next((name for name in _scripted_tools(llm_request) if name not in called), None)
+        if next_tool is not None:
+            part = types.Part(function_call=types.FunctionCall(name=next_tool, args={}))
+        else:
+            part = types.Part(text="\n".join(summaries) or "Nothing to do for this request.")
+
+        prompt_tokens = _estimate_tokens(llm_request)
+        agent = _agent_name(llm_request)
+        LOCAL_MODEL_STATS.record(agent, latency, prompt_tokens, next_tool is not None)
+        output_tokens = len(part.text or next_tool or "") // _CHARS_PER_TOKEN
+        yield LlmResponse(
+            content=types.Content(role="model", parts=[part]),
+            usage_metadata=types.GenerateContentResponseUsageMetadata(
+                prompt_token_count=prompt_tokens,
+                candidates_token_count=output_tokens,
+                total_token_count=prompt_tokens + output_tokens
+            )
+        )
+
+
+def _declarations(llm_request):
+    for tool in (llm_request.config.tools or []) if llm_request.config else []:
+        for declaration in getattr(tool, "function_declarations", None) or []:
+            yield declaration
+
+
+def _required_args(declaration):
+    if declaration.parameters_json_schema:
+        return declaration.parameters_json_schema.get("required", [])
+    return declaration.parameters.required or [] if declaration.parameters else []
+
+
+def _instruction_text(llm_request):
+    instruction = llm_request.config.system_instruction if llm_request.config else None
+    if isinstance(instruction, types.Content):
+        return "".join(part.text or "" for part in instruction.parts or [])
+    return instruction or ""
+
+
+def _scripted_tools(llm_request):
+    """Callable tools (no required arguments) in the order the instruction mentions them."""
+    callable_tools = [d.name for d in _declarations(llm_request) if not _required_args(d)]
+    mentioned = list(dict.fromkeys(_TOOL_MENTION_RE.findall(_instruction_text(llm_request))))
+    ordered = [name for name in mentioned if name in callable_tools]
+    return ordered + [name for name in callable_tools if name not in ordered]
+
+
+def _current_turn(contents):
+    """Tools already called since the last user text, and their result summaries."""
+    called, summaries = set(), []
+    for content in reversed(contents or []):
+        parts = content.parts or []
+        if content.role == "user" and any(part.text for part in parts):
+            break
+        for part in parts:
+            if part.function_response is not None:
+                called.add(part.function_response.name)
+                response = part.function_response.response or {}
+                report = response.get("report") if isinstance(response.get("report"), dict) else {}
+                summary = report.get("summary") or report.get("message") or response.get("error_message")
+                if summary:
+                    summaries.append(summary)
+    return called, list(reversed(summaries))
+
+
+def _estimate_tokens(llm_request):
+    chars = len(_instruction_text(llm_request))
+    for content in llm_request.contents or []:
+        for part in content.parts or []:
+            if part.text:
+                chars += len(part.text)
+            elif part.function_call is not None:
+                chars += len(str(part.function_call.args or {})) + len(part.function_call.name or "")
+            elif part.function_response is not None:
+                chars += len(str(part.function_response.response or {}))
+    return chars // _CHARS_PER_TOKEN
+
+
+def _agent_name(llm_request):
+    # ADK adds the agent's identity to the system instruction
+    match = re.search(r'internal name is "([^"]+)"', _instruction_text(llm_request))
+    return match.group(1) if match else "unknown"
+
+
+def resolve_model(default):
+    """
+    Model to use for an agent: `default` (a Gemini model name) unless the local backend is
+    selected with CORNERSTONE_LLM_BACKEND=local, in which case a ScriptedLlm.
+    """
+    if os.environ.get("CORNERSTONE_LLM_BACKEND", "gemini").lower() != "local":
+        return default
+    return ScriptedLlm(
+        model=f"local/{default}",
+        latency_ms=float(os.environ.get("CORNERSTONE_LOCAL_LLM_LATENCY_MS", "0")),
+        jitter_ms=float(os.environ.get("CORNERSTONE_LOCAL_LLM_JITTER_MS", "0")),
+        seed=int(os.environ.get("CORNERSTONE_LOCAL_LLM_SEED", "0"))
+    )
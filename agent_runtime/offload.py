@@ -0,0 +1,260 @@
+"""
+Process Pool Offload
+Runs CPU-heavy solver kernels in a warm pool of worker processes, with per-call timeouts
+
+A kernel is a module-level function that takes and returns NumPy arrays (plus a few
+scalars), e.g. the greedy bid allocation behind optimize_bids or the Monte Carlo order
+sizing behind size_order_quantities. Tools build the kernel's input arrays from their
+dict-shaped data, call offload(), and turn the output arrays back into their report, so
+what crosses the process boundary is a handful of flat buffers, never a pickled dict tree.
+Arrays of SHM_MIN_BYTES or more go through multiprocessing shared memory instead of the
+pickle stream.
+
+Solving in another process keeps the work off the request threads' GIL, so a heavy solve
+cannot slow down the other endpoints. Shipping small inputs to another process costs more
+than solving them, so each call passes an estimate of its work, and anything below
+CORNERSTONE_OFFLOAD_MIN_WORK runs inline. Each call has a timeout. A ProcessPoolExecutor
+cannot stop one task, or lose one worker without failing every call it is running, so on
+timeout the pool is retired instead. New calls go to a fresh pool at once. The calls
+already on the retired pool finish (each within its own timeout), and then its workers,
+including the overrunning one, are terminated.
+
+The pool starts on first use or at boot (OFFLOAD_POOL.start()) and is warmed by importing
+the kernels' modules in every worker. CORNERSTONE_OFFLOAD=off runs everything inline.
+"""
+
+import concurrent.futures
+import multiprocessing
+import os
+import threading
+import time
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .tracing import span
+
+
+ENABLED = os.environ.get("CORNERSTONE_OFFLOAD", "on").lower() not in ("0", "off", "false")
+WORKERS = int(os.environ.get("CORNERSTONE_OFFLOAD_WORKERS", str(max(1, (os.cpu_count() or 2) - 1))))
+DEFAULT_TIMEOUT = float(os.environ.get("CORNERSTONE_OFFLOAD_TIMEOUT", "30"))
+MIN_WORK = int(os.environ.get("CORNERSTONE_OFFLOAD_MIN_WORK", "200000"))
+START_METHOD = os.environ.get("CORNERSTONE_OFFLOAD_START_METHOD", "spawn")
+SHM_MIN_BYTES = 1 << 16
+
+# Imported in every worker as it starts, so the first real call does not pay for them
+WARM_MODULES = ("numpy", "cornerstone_agent.allocation", "demand_agent.sizing")
+
+
+class OffloadTimeout(Exception):
+    """A kernel did not finish within its timeout (its worker was stopped)."""
+
+
+# ============================================================================
+# ARRAY TRANSPORT
+# ============================================================================
+
+class _SharedArray:
+    """Picklable handle to an array copied into a shared memory block."""
+
+    __slots__ = ("name", "shape", "dtype")
+
+    def __init__(self, name, shape, dtype):
+        self.name = name
+        self.shape = shape
+        self.dtype = dtype
+
+
+def _pack(args):
+    """Large arrays -> shared memory handles. Returns (packed args, blocks to unlink)."""
+    packed, blocks = [], []
+    for arg in args:
+        if isinstance(arg, np.ndarray) and arg.nbytes >= SHM_MIN_BYTES:
+            block = shared_memory.SharedMemory(create=True, size=arg.nbytes)
+            np.ndarray(arg.shape, arg.dtype, buffer=block.buf)[...] = arg
+            blocks.append(block)
+            packed.append(_SharedArray(block.name, arg.shape, arg.dtype.str))
+        else:
+            packed.append(arg)
+    return packed, blocks
+
+
+def _invoke(kernel, packed):
+    """Worker side: maps shared arrays, runs the kernel, returns its (copied) outputs."""
+    blocks, args = [], []
+    try:
+        for arg in packed:
+            if isinstance(arg, _SharedArray):
+                # Workers share the parent's resource tracker, which already knows the block
+                block = shared_memory.SharedMemory(name=arg.name)
+                blocks.append(block)
+                args.append(np.ndarray(arg.shape, np.dtype(arg.dtype), buffer=block.buf))
+            else:
+                args.append(arg)
+        result = kernel(*args)
+        # Outputs must not be views into blocks about to be closed
+        if isinstance(result, tuple):
+            return tuple(np.array(r) if isinstance(r, np.ndarray) else r for r in result)
+        return np.array(result) if isinstance(result, np.ndarray) else result
+    finally:
+        del args
+        for block in blocks:
+            block.close()
+
+
+def _warm():
+    import importlib
+    for module in WARM_MODULES:
+        importlib.import_module(module)
+    return os.getpid()
+
+
+# ============================================================================
+# POOL
+# ============================================================================
+
+class OffloadPool:
+    """A ProcessPoolExecutor that is replaced when a call overruns, plus call counters."""
+
+    def __init__(self, workers=WORKERS, start_method=START_METHOD):
+        self.workers = workers
+        self.start_method = start_method
+        self._executor = None
+        self._running = {}           # executor -> its unfinished futures
+        self._lock = threading.RLock()
+        self._stats_lock = threading.Lock()
+        self.offloaded = 0
+        self.inline = 0
+        self.timeouts = 0
+        self.restarts = 0
+        self.offload_seconds = 0.0
+
+    def start(self):
+        """Starts and warms the worker processes (no-op if running or disabled)."""
+        if ENABLED:
+            self._get_executor()
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                executor = concurrent.futures.ProcessPoolExecutor(
+                    max_workers=self.workers, mp_context=multiprocessing.get_context(self.start_method)
+                )
+                # One warm-up task per worker: every process is started and has imported the kernels
+                for future in [executor.submit(_warm) for _ in range(self.workers)]:
+                    future.result()
+                self._executor = executor
+            return self._executor
+
+    def _submit(self, kernel, packed):
+        with self._lock:
+            executor = self._get_executor()
+            future = executor.submit(_invoke, kernel, packed)
+            self._running.setdefault(executor, set()).add(future)
+        future.add_done_callback(lambda done: self._finished(executor, done))
+        return executor, future
+
+    def _finished(self, executor, future):
+        with self._lock:
+            self._running.get(executor, set()).discard(future)
+
+    def retire(self, executor, stuck=None):
+        """
+        Takes `executor` out of service: the next call starts a new pool. Its other calls
+        may finish (up to DEFAULT_TIMEOUT) before its workers, and `stuck`, are stopped.
+        """
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+            others = self._running.pop(executor, set()) - {stuck}
+        threading.Thread(
+            target=self._stop_retired, args=(executor, others), name="offload-retire", daemon=True
+        ).start()
+
+    def _stop_retired(self, executor, others):
+        if others:
+            concurrent.futures.wait(others, timeout=DEFAULT_TIMEOUT)
+        # The public API cannot stop a running task; terminating its process can
+        processes = list((getattr(executor, "_processes", None) or {}).values())
+        executor.shutdown(wait=False, cancel_futures=True)
+        for process in processes:
+            process.terminate()
+        with self._stats_lock:
+            self.restarts += 1
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+            self._running.pop(executor, None)
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def run(self, kernel, *args, work=0, timeout=None):
+        """
+        Runs `kernel(*args)`, in a worker process when `work` reaches MIN_WORK.
+
+        Args:
+            kernel: Module-level function taking and returning arrays/scalars
+            *args: Kernel arguments (NumPy arrays and scalars)
+            work: Estimated size of the solve (e.g. bids x candidates); small solves run inline
+            timeout: Seconds to wait for a worker (default CORNERSTONE_OFFLOAD_TIMEOUT)
+
+        Raises:
+            OffloadTimeout: If the worker did not finish in time
+        """
+        if not ENABLED or work < MIN_WORK:
+            with self._stats_lock:
+                self.inline += 1
+            return kernel(*args)
+
+        timeout = DEFAULT_TIMEOUT if timeout is None else timeout
+        with span(f"offload:{kernel.__name__}", work=work) as current:
+            started = time.perf_counter()
+            packed, blocks = _pack(args)
+            current.attributes["shared_arrays"] = len(blocks)
+            try:
+                for attempt in (1, 2):
+                    executor, future = self._submit(kernel, packed)
+                    try:
+                        return future.result(timeout=timeout)
+                    except concurrent.futures.TimeoutError:
+                        future.cancel()
+                        with self._stats_lock:
+                            self.timeouts += 1
+                        self.retire(executor, stuck=future)
+                        raise OffloadTimeout(f"{kernel.__name__} did not finish within {timeout:g}s")
+                    except concurrent.futures.process.BrokenProcessPool:
+                        # A worker died (or its retired pool was stopped); retry once on a fresh pool
+                        self.retire(executor)
+                        if attempt == 2:
+                            raise
+            finally:
+                for block in blocks:
+                    block.close()
+                    block.unlink()
+                with self._stats_lock:
+                    self.offloaded += 1
+                    self.offload_seconds += time.perf_counter() - started
+
+    def stats(self):
+        with self._stats_lock:
+            return {
+                "enabled": ENABLED,
+                "running": self._executor is not None,
+                "workers": self.workers,
+                "min_work": MIN_WORK,
+                "timeout_seconds": DEFAULT_TIMEOUT,
+                "offloaded_calls": self.offloaded,
+                "inline_calls": self.inline,
+                "mean_offload_ms": round(self.offload_seconds / self.offloaded * 1000, 2) if self.offloaded else 0.0,
+                "timeouts": self.timeouts,
+                "restarts": self.restarts
+            }
+
+
+OFFLOAD_POOL = OffloadPool()
+
+
+def offload(kernel, *args, work=0, timeout=None):
+    """Runs a kernel on the process-wide pool (see OffloadPool.run)."""
+    return OFFLOAD_POOL.run(kernel, *args, work=work, timeout=timeout)
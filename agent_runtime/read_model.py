@@ -0,0 +1,169 @@
+"""
+Dashboard Read Model
+Per-job summaries kept up to date by the tools that change bids, timelines and logistics
+
+The dashboard's figures (open bids, winners, completion date, delays, shipments, costs)
+live in four separate mock stores. Rather than recomputing them from those stores on every
+dashboard load, the stateful tools apply each change to a materialized summary of the job
+it touches: create/close/notify update the bid fields, update_timeline the maker's
+schedule, plan_logistics the plan and costs. Each agent module seeds the model from its
+mock data at import.
+
+A summary is a plain dict that is replaced, never modified, on every change, so reads
+return it without copying or locking: GET /api/dashboard/<job_id> is one dict lookup, and
+the cross-job totals are adjusted by each change's delta instead of being re-summed.
+"""
+
+import threading
+import time
+
+
+# Summary fields that the totals add up across jobs
+_TOTAL_FIELDS = ("open_bids", "total_bids", "delayed", "shipments", "in_transit",
+                 "pending_pickup", "delivered", "shipping_cost")
+
+
+def _empty_summary(job_id):
+    return {
+        "job_id": job_id,
+        "product_name": None,
+        # Bidding
+        "bid_status": None,
+        "closes_at": None,
+        "closed_at": None,
+        "required_qty": 0,
+        "total_bids": 0,
+        "winners": [],
+        # Timelines
+        "manufacturers": 0,
+        "completion_date": None,
+        "delayed": 0,
+        "ahead_of_schedule": 0,
+        # Logistics
+        "logistics_status": None,
+        "consolidation_center": None,
+        "final_delivery_date": None,
+        "shipping_cost": 0.0,
+        "shipments": 0,
+        "in_transit": 0,
+        "pending_pickup": 0,
+        "delivered": 0,
+        "version": 0,
+        "updated_at": None
+    }
+
+
+def _contribution(summary):
+    values = {name: summary[name] for name in _TOTAL_FIELDS if name != "open_bids"}
+    values["open_bids"] = 1 if summary["bid_status"] == "OPEN" else 0
+    return values
+
+
+class DashboardReadModel:
+    """Materialized per-job dashboard summaries plus running totals across jobs."""
+
+    def __init__(self):
+        self._jobs = {}        # job_id -> summary dict (replaced on every change)
+        self._schedules = {}   # job_id -> {maker_id: (current_date, status)}
+        self._maker_jobs = {}  # maker_id -> job_id of the maker's active timeline
+        self._totals = {name: 0 for name in _TOTAL_FIELDS}
+        self._lock = threading.Lock()
+        self.version = 0
+
+    def _update(self, job_id, **changes):
+        # Caller holds the lock
+        old = self._jobs.get(job_id) or _empty_summary(job_id)
+        new = {**old, **changes, "version": old["version"] + 1, "updated_at": time.strftime("%Y-%m-%d %H:%M:%S")}
+        before, after = _contribution(old), _contribution(new)
+        totals = dict(self._totals)
+        for name in _TOTAL_FIELDS:
+            totals[name] += after[name] - before[name]
+        totals["shipping_cost"] = round(totals["shipping_cost"], 2)
+        self._jobs[job_id] = new
+        self._totals = totals
+        self.version += 1
+
+    # ------------------------------------------------------------------
+    # Changes, applied by the stateful tools
+    # ------------------------------------------------------------------
+
+    def apply_bid_window(self, window):
+        """A bid window was opened, closed or had its winners set."""
+        with self._lock:
+            self._update(
+                window["job_id"],
+                product_name=window.get("product_name"),
+                bid_status=window["status"],
+                closes_at=window.get("closes_at"),
+                closed_at=window.get("closed_at"),
+                required_qty=window.get("required_qty", 0),
+                total_bids=window.get("total_bids", 0),
+                winners=list(window.get("winning_manufacturers", []))
+            )
+
+    def apply_timeline(self, maker_id, timeline):
+        """A maker's completion date (and so its on-track status) changed."""
+        job_id = timeline["job_id"]
+        with self._lock:
+            previous_job = self._maker_jobs.get(maker_id)
+            if previous_job is not None and previous_job != job_id:
+                self._schedules[previous_job].pop(maker_id, None)
+                self._update_schedule(previous_job)
+            self._maker_jobs[maker_id] = job_id
+            self._schedules.setdefault(job_id, {})[maker_id] = (timeline["current_date"], timeline["status"])
+            self._update_schedule(job_id)
+
+    def _update_schedule(self, job_id):
+        # Only this job's makers are rescanned, never every timeline
+        schedule = self._schedules[job_id].values()
+        statuses = [status for _, status in schedule]
+        self._update(
+            job_id,
+            manufacturers=len(statuses),
+            completion_date=max((date for date, _ in schedule), default=None),
+            delayed=statuses.count("delayed"),
+            ahead_of_schedule=statuses.count("ahead_of_schedule")
+        )
+
+    def apply_logistics_plan(self, plan):
+        """A logistics plan was created."""
+        with self._lock:
+            self._update(
+                plan["job_id"],
+                logistics_status=plan.get("status"),
+                consolidation_center=plan.get("consolidation_center"),
+                final_delivery_date=plan.get("final_delivery_date"),
+                shipping_cost=float(plan.get("estimated_shipping_cost", 0.0))
+            )
+
+    def apply_shipments(self, job_id, shipments):
+        """A job's shipment tracking changed (shipments: maker_id -> tracking entry)."""
+        statuses = [entry["status"] for entry in shipments.values()]
+        with self._lock:
+            self._update(
+                job_id,
+                shipments=len(statuses),
+                in_transit=statuses.count("IN_TRANSIT"),
+                pending_pickup=statuses.count("PENDING_PICKUP"),
+                delivered=statuses.count("DELIVERED")
+            )
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def get(self, job_id):
+        """Summary of one job, or None for a job the model has never seen."""
+        return self._jobs.get(job_id)
+
+    def snapshot(self):
+        """All job summaries and the totals across them, at one model version."""
+        with self._lock:
+            return {
+                "version": self.version,
+                "totals": {**self._totals, "jobs": len(self._jobs)},
+                "jobs": dict(self._jobs)
+            }
+
+
+DASHBOARD = DashboardReadModel()
@@ -0,0 +1,283 @@
+"""
+Shared State
+Keeps the stateful tools' module-level data consistent across server worker processes
+
+Bid windows, timelines, logistics plans and shipments live in module-level dicts. A
+production server (backend/gunicorn.conf.py) forks several workers from a master that
+loaded those dicts once, so each worker starts with the same copy and then changes only
+its own.
+
+Each dict is registered with its data-version domain and a hook that re-applies a changed
+entry to derived state (the dashboard read model). Tools that change an entry are
+decorated with @mutates_shared_state and finish with commit_change(). That call updates
+the derived state, bumps the version and publishes the change event. When
+CORNERSTONE_SHARED_STATE names a file, commit_change() also appends the entry to a SQLite
+change journal there. Every worker replays the other workers' journal entries into its own
+dicts, with the same read-model updates, version bumps and change events. It does so
+before each request, at the start of each mutation, and from a background thread every
+CORNERSTONE_SHARED_STATE_SYNC seconds. Change events take their journal sequence number as
+their id, so an SSE Last-Event-ID means the same thing in every worker.
+
+A mutation holds the journal's write lock and catches up first, so check-then-act tools
+(submit_bid refusing a second bid from the same maker) see the latest state in any worker.
+Without a journal file a mutation is just a process-wide lock.
+"""
+
+import contextlib
+import functools
+import json
+import os
+import sqlite3
+import threading
+
+from .data_versions import bump_version
+from .events import publish_change
+
+
+PATH = os.environ.get("CORNERSTONE_SHARED_STATE", "")
+SYNC_SECONDS = float(os.environ.get("CORNERSTONE_SHARED_STATE_SYNC", "0.5"))
+BUSY_TIMEOUT_SECONDS = 10.0
+RETAINED_CHANGES = 10000     # Journal rows kept; a worker further behind reloads every entry
+PRUNE_EVERY = 256            # Commits between journal prunes
+
+
+class SharedState:
+    """Registered module-level dicts plus the optional cross-process change journal."""
+
+    def __init__(self, path=PATH):
+        self.path = path
+        self._stores = {}            # name -> (dict, version domain, on_change)
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._db = None
+        self._data_version = None
+        self._applied_seq = 0
+        self._loaded = False
+        self._commits = 0
+        self._stop = threading.Event()
+        self._thread = None
+        self.replayed = 0
+        self.reloads = 0
+        # Connections, locks and threads do not survive fork; workers open their own
+        os.register_at_fork(after_in_child=self._after_fork)
+
+    def _after_fork(self):
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._db = None
+        self._data_version = None
+        self._stop = threading.Event()
+        self._thread = None
+
+    def register(self, name, store, domain, on_change):
+        """
+        Registers a module-level dict under `name`.
+
+        Args:
+            name: Journal name of the dict (e.g. 'bid_windows')
+            store: The dict itself
+            domain: Data-version domain bumped when an entry changes
+            on_change: `on_change(key, entry)` re-applies a changed entry to derived state;
+                       it is run for every current entry straight away
+        """
+        self._stores[name] = (store, domain, on_change)
+        for key, entry in store.items():
+            on_change(key, entry)
+
+    # ------------------------------------------------------------------------
+    # Journal
+    # ------------------------------------------------------------------------
+
+    def _connection(self):
+        if self._db is None:
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+            db = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT_SECONDS, check_same_thread=False, isolation_level=None)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS changes (seq INTEGER PRIMARY KEY AUTOINCREMENT, store TEXT, key TEXT, "
+                "entry TEXT, event_type TEXT, job_id TEXT, event_data TEXT)"
+            )
+            db.execute("CREATE TABLE IF NOT EXISTS entries (store TEXT, key TEXT, entry TEXT, seq INTEGER, PRIMARY KEY (store, key))")
+            self._db = db
+        return self._db
+
+    def reset(self):
+        """Starts an empty journal (the server master does this before forking workers)."""
+        if not self.path:
+            return
+        with self._lock:
+            self.discard()
+            self._connection().close()
+            self._db = None
+
+    def discard(self):
+        """Deletes the journal files (when the server stops)."""
+        if not self.path:
+            return
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+            for suffix in ("", "-wal", "-shm"):
+                with contextlib.suppress(FileNotFoundError):
+                    os.remove(self.path + suffix)
+
+    def _catch_up(self, db):
+        """Applies journal entries committed by other processes since the last catch-up."""
+        data_version = db.execute("PRAGMA data_version").fetchone()[0]
+        if self._loaded and data_version == self._data_version:
+            return 0
+        self._data_version = data_version
+        if not self._loaded:
+            return self._reload(db)
+        rows = db.execute(
+            "SELECT seq, store, key, entry, event_type, job_id, event_data FROM changes WHERE seq > ? ORDER BY seq",
+            (self._applied_seq,)
+        ).fetchall()
+        if rows and rows[0][0] > self._applied_seq + 1:
+            # Fell behind the pruned journal: take the latest entries instead
+            return self._reload(db)
+        for seq, name, key, entry, event_type, job_id, event_data in rows:
+            if name in self._stores:
+                store, domain, on_change = self._stores[name]
+                store[key] = json.loads(entry)
+                on_change(key, store[key])
+                bump_version(domain)
+                if event_type:
+                    publish_change(event_type, job_id, event_id=seq, **json.loads(event_data))
+            self._applied_seq = seq
+        self.replayed += len(rows)
+        return len(rows)
+
+    def _reload(self, db):
+        rows = db.execute("SELECT store, key, entry, seq FROM entries").fetchall()
+        domains = set()
+        for name, key, entry, seq in rows:
+            self._applied_seq = max(self._applied_seq, seq)
+            if name in self._stores:
+                store, domain, on_change = self._stores[name]
+                store[key] = json.loads(entry)
+                on_change(key, store[key])
+                domains.add(domain)
+        for domain in domains:
+            bump_version(domain)
+        self._loaded = True
+        self.reloads += 1
+        return len(rows)
+
+    def sync(self):
+        """Applies other workers' changes (a cheap no-op when there are none, or no journal)."""
+        if not self.path:
+            return 0
+        with self._lock:
+            return self._catch_up(self._connection())
+
+    # ------------------------------------------------------------------------
+    # Mutations
+    # ------------------------------------------------------------------------
+
+    @contextlib.contextmanager
+    def mutation(self):
+        """Holds the write lock (of this process, and of the journal) around a tool's changes."""
+        with self._lock:
+            depth = getattr(self._local, "depth", 0)
+            self._local.depth = depth + 1
+            try:
+                if not self.path or depth:
+                    yield
+                    return
+                db = self._connection()
+                db.execute("BEGIN IMMEDIATE")
+                try:
+                    self._catch_up(db)
+                    yield
+                except BaseException:
+                    db.execute("ROLLBACK")
+                    raise
+                db.execute("COMMIT")
+            finally:
+                self._local.depth = depth
+
+    def commit(self, name, key, event_type=None, job_id=None, **event_data):
+        """
+        Records that `store[key]` changed: journals it, updates derived state, bumps the
+        version and publishes `event_type` (for `job_id`, default `key`) if given. Must run
+        inside mutation(), after the entry's last change.
+        """
+        if not getattr(self._local, "depth", 0):
+            raise RuntimeError("commit_change() must run inside a shared-state mutation")
+        store, domain, on_change = self._stores[name]
+        entry = store[key]
+        job_id = key if job_id is None else job_id
+        event_id = None
+        if self.path:
+            encoded = json.dumps(entry, default=str)
+            event_id = self._db.execute(
+                "INSERT INTO changes (store, key, entry, event_type, job_id, event_data) VALUES (?, ?, ?, ?, ?, ?)",
+                (name, key, encoded, event_type, job_id, json.dumps(event_data, default=str))
+            ).lastrowid
+            self._db.execute("INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?)", (name, key, encoded, event_id))
+            self._applied_seq = event_id
+            self._commits += 1
+            if self._commits % PRUNE_EVERY == 0:
+                self._db.execute("DELETE FROM changes WHERE seq <= ?", (event_id - RETAINED_CHANGES,))
+        on_change(key, entry)
+        bump_version(domain)
+        if event_type:
+            publish_change(event_type, job_id, event_id=event_id, **event_data)
+
+    # ------------------------------------------------------------------------
+    # Background sync
+    # ------------------------------------------------------------------------
+
+    def start(self):
+        """Starts the background sync thread (once per worker, after fork; no-op without a journal)."""
+        if not self.path or self._thread is not None:
+            return
+        self.sync()
+        self._thread = threading.Thread(target=self._sync_forever, name="shared-state-sync", daemon=True)
+        self._thread.start()
+
+    def _sync_forever(self):
+        while not self._stop.wait(SYNC_SECONDS):
+            with contextlib.suppress(sqlite3.Error):
+                self.sync()
+
+    def stop(self):
+        self._stop.set()
+
+    def stats(self):
+        with self._lock:
+            return {
+                "enabled": bool(self.path),
+                "path": self.path or None,
+                "stores": sorted(self._stores),
+                "applied_seq": self._applied_seq,
+                "replayed_changes": self.replayed,
+                "reloads": self.reloads,
+                "sync_seconds": SYNC_SECONDS
+            }
+
+
+SHARED_STATE = SharedState()
+
+
+def register_shared(name, store, domain, on_change):
+    """Registers a module-level dict with the process-wide shared state."""
+    SHARED_STATE.register(name, store, domain, on_change)
+
+
+def commit_change(name, key, event_type=None, job_id=None, **event_data):
+    """Records a changed entry on the process-wide shared state (see SharedState.commit)."""
+    SHARED_STATE.commit(name, key, event_type, job_id, **event_data)
+
+
+def mutates_shared_state(fn):
+    """Decorator running a tool inside SHARED_STATE.mutation() (signature and metadata preserved)."""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        with SHARED_STATE.mutation():
+            return fn(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,82 @@
+"""
+Thread Profiles
+Carries a request's cProfile run into the other threads that work on the request
+
+cProfile hooks only the thread that enables it (up to Python 3.11), but a workflow request
+spends its time elsewhere: DAG steps run on executor threads and ADK workflows run on the
+runner loop's thread. A ThreadProfiles set is placed in a context variable for the
+request. Code that hands the request's work to another thread wraps that work in
+profile_thread(), which profiles the thread into the same set, and the set's stats merge
+every thread into one report.
+
+From Python 3.12, cProfile uses sys.monitoring: one profiler per process, which already
+sees every thread. There profile_thread() does nothing, and the request's own profiler
+covers the other threads, including those of concurrent requests.
+"""
+
+import contextlib
+import contextvars
+import cProfile
+import pstats
+import sys
+import threading
+
+
+_ACTIVE = contextvars.ContextVar("cornerstone_thread_profiles", default=None)
+
+
+class ThreadProfiles:
+    """The cProfile profilers of every thread that ran part of one request."""
+
+    def __init__(self):
+        self._profilers = []
+        self._lock = threading.Lock()
+        self.threads = set()
+
+    def enable(self):
+        """Starts profiling the current thread; returns its profiler, or None if it is already profiled."""
+        if sys.getprofile() is not None:
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            return None  # Python 3.12+: the process-wide profiler already covers this thread
+        with self._lock:
+            self._profilers.append(profiler)
+            self.threads.add(threading.current_thread().name)
+        return profiler
+
+    def stats(self, stream=None):
+        """Merged pstats.Stats of every profiled thread."""
+        with self._lock:
+            return pstats.Stats(*self._profilers, stream=stream)
+
+
+def current_profiles():
+    """The ThreadProfiles of the request being handled, or None."""
+    return _ACTIVE.get()
+
+
+def activate(profiles):
+    """Makes `profiles` current for this context; returns a token for deactivate()."""
+    return _ACTIVE.set(profiles)
+
+
+def deactivate(token):
+    _ACTIVE.reset(token)
+
+
+@contextlib.contextmanager
+def profile_thread(profiles=None):
+    """
+    Profiles the current thread into `profiles` (default: the current context's set) for
+    the duration of the block. A no-op when no request is being profiled.
+    """
+    profiles = profiles or _ACTIVE.get()
+    profiler = profiles.enable() if profiles is not None else None
+    try:
+        yield
+    finally:
+        if profiler is not None:
+            profiler.disable()
@@ -0,0 +1,275 @@
+"""
+Tool Tracing
+Spans for workflow runs, workflow steps and agent tool calls
+
+A workflow run opens a trace (trace("complete-workflow-flask")); workflow steps and every
+tool decorated with @traced record spans under it, with duration, an argument summary,
+the result's status and serialized size. The current span travels in a contextvar, so
+spans nest across asyncio tasks and across DAG step threads (run_dag copies the context).
+A tool called outside any trace (a single Flask route, an agent chat turn) gets a
+one-span trace of its own.
+
+Finished traces are kept in an in-memory ring buffer (the most recent MAX_TRACES) for
+GET /api/traces/<trace_id>. With CORNERSTONE_TRACE_FILE set, each finished trace is also
+appended to that file as one OTLP/JSON line (the OpenTelemetry file exporter format), which
+collectors and trace viewers can import.
+"""
+
+import contextlib
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+
+
+MAX_TRACES = 200
+MAX_SPANS_PER_TRACE = 500
+ARG_SUMMARY_CHARS = 80
+
+SERVICE_NAME = "cornerstone"
+TRACE_FILE = os.environ.get("CORNERSTONE_TRACE_FILE")
+
+_CURRENT_SPAN = contextvars.ContextVar("cornerstone_current_span", default=None)
+
+
+class Span:
+    """One timed operation within a trace."""
+
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "attributes",
+                 "start_ns", "end_ns", "status", "_started")
+
+    def __init__(self, trace_id, parent_id, name, kind, attributes):
+        self.trace_id = trace_id
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.attributes = attributes
+        self.start_ns = time.time_ns()
+        self.end_ns = None
+        self.status = "ok"
+        self._started = time.perf_counter()
+
+    def end(self):
+        # Wall-clock start plus a monotonic duration
+        self.end_ns = self.start_ns + int((time.perf_counter() - self._started) * 1e9)
+
+    @property
+    def duration_ms(self):
+        return round(((self.end_ns or time.time_ns()) - self.start_ns) / 1e6, 3)
+
+    def to_dict(self):
+        return {
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "duration_ms": self.duration_ms,
+            "start_unix_ms": self.start_ns // 1_000_000,
+            "status": self.status,
+            "attributes": self.attributes
+        }
+
+
+class TraceStore:
+    """Ring buffer of recent traces, keyed by trace id."""
+
+    def __init__(self, max_traces=MAX_TRACES):
+        self.max_traces = max_traces
+        self._traces = OrderedDict()   # trace_id -> list of finished spans
+        self._lock = threading.Lock()
+        self.dropped_spans = 0
+
+    def add(self, span):
+        with self._lock:
+            spans = self._traces.get(span.trace_id)
+            if spans is None:
+                spans = self._traces[span.trace_id] = []
+                while len(self._traces) > self.max_traces:
+                    self._traces.popitem(last=False)
+            if len(spans) >= MAX_SPANS_PER_TRACE:
+                self.dropped_spans += 1
+                return
+            spans.append(span)
+
+    def spans(self, trace_id):
+        with self._lock:
+            return list(self._traces.get(trace_id, ()))
+
+    def recent(self, limit=20):
+        """Summaries of the most recent traces (root span name, duration, span count)."""
+        with self._lock:
+            items = list(self._traces.items())[-limit:]
+        summaries = []
+        for trace_id, spans in reversed(items):
+            root = next((s for s in spans if s.parent_id is None), None)
+            summaries.append({
+                "trace_id": trace_id,
+                "name": root.name if root else None,
+                "duration_ms": root.duration_ms if root else None,
+                "status": root.status if root else "in_progress",
+                "spans": len(spans)
+            })
+        return summaries
+
+    def clear(self):
+        with self._lock:
+            self._traces.clear()
+
+
+TRACE_STORE = TraceStore()
+_EXPORT_LOCK = threading.Lock()
+
+
+def current_trace_id():
+    """Trace id of the active trace, or None outside a trace."""
+    current = _CURRENT_SPAN.get()
+    return current.trace_id if current is not None else None
+
+
+@contextlib.contextmanager
+def span(name, kind="internal", **attributes):
+    """
+    Records a span around the block, as a child of the active span (or as the root of a
+    new trace when there is none). Yields the Span, whose attributes may be extended.
+    """
+    parent = _CURRENT_SPAN.get()
+    current = Span(
+        parent.trace_id if parent is not None else uuid.uuid4().hex,
+        parent.span_id if parent is not None else None,
+        name, kind, attributes
+    )
+    token = _CURRENT_SPAN.set(current)
+    try:
+        yield current
+    except BaseException as e:
+        current.status = "error"
+        current.attributes["error"] = f"{type(e).__name__}: {e}"[:200]
+        raise
+    finally:
+        _CURRENT_SPAN.reset(token)
+        current.end()
+        TRACE_STORE.add(current)
+        if parent is None and TRACE_FILE:
+            export_otlp(current.trace_id, TRACE_FILE)
+
+
+@contextlib.contextmanager
+def trace(name, **attributes):
+    """Starts a new trace (even inside another one) for one workflow run."""
+    token = _CURRENT_SPAN.set(None)
+    try:
+        with span(name, kind="server", **attributes) as root:
+            yield root
+    finally:
+        _CURRENT_SPAN.reset(token)
+
+
+def _summarize(value):
+    text = repr(value)
+    return text if len(text) <= ARG_SUMMARY_CHARS else text[:ARG_SUMMARY_CHARS - 3] + "..."
+
+
+def traced(fn):
+    """Decorator recording a 'tool' span for every call (signature and metadata preserved)."""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        arguments = {f"arg{i}": _summarize(value) for i, value in enumerate(args)}
+        arguments.update((k, _summarize(v)) for k, v in kwargs.items() if k != "tool_context")
+        with span(fn.__name__, kind="tool", args=arguments) as current:
+            result = fn(*args, **kwargs)
+            current.attributes["result_bytes"] = len(json.dumps(result, default=str))
+            if isinstance(result, dict) and result.get("status") == "error":
+                current.status = "error"
+                current.attributes["error"] = str(result.get("error_message", ""))[:200]
+            return result
+
+    return wrapper
+
+
+def get_trace(trace_id):
+    """
+    The recorded spans of a trace as a tree.
+
+    Returns:
+        dict with trace_id, total duration, span count, per-tool totals and the root spans
+        (each with nested 'children'), or None for an unknown or evicted trace
+    """
+    spans = TRACE_STORE.spans(trace_id)
+    if not spans:
+        return None
+    nodes = {s.span_id: {**s.to_dict(), "children": []} for s in spans}
+    roots = []
+    for s in sorted(spans, key=lambda s: s.start_ns):
+        node = nodes[s.span_id]
+        parent = nodes.get(s.parent_id)
+        (parent["children"] if parent is not None else roots).append(node)
+
+    tools = {}
+    for s in spans:
+        if s.kind == "tool":
+            total = tools.setdefault(s.name, {"calls": 0, "total_ms": 0.0})
+            total["calls"] += 1
+            total["total_ms"] = round(total["total_ms"] + s.duration_ms, 3)
+    return {
+        "trace_id": trace_id,
+        "duration_ms": max((s.duration_ms for s in spans if s.parent_id is None), default=None),
+        "span_count": len(spans),
+        "tools": dict(sorted(tools.items(), key=lambda item: item[1]["total_ms"], reverse=True)),
+        "spans": roots
+    }
+
+
+# ============================================================================
+# OTLP FILE EXPORT
+# ============================================================================
+
+def _otlp_value(value):
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, dict):
+        return {"stringValue": json.dumps(value, default=str)}
+    return {"stringValue": str(value)}
+
+
+_OTLP_KINDS = {"internal": 1, "server": 2, "client": 3, "tool": 1}
+
+
+def otlp_payload(trace_id):
+    """A trace as an OTLP/JSON ExportTraceServiceRequest."""
+    spans = []
+    for s in TRACE_STORE.spans(trace_id):
+        attributes = dict(s.attributes, **{"cornerstone.span_kind": s.kind})
+        spans.append({
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            **({"parentSpanId": s.parent_id} if s.parent_id else {}),
+            "name": s.name,
+            "kind": _OTLP_KINDS.get(s.kind, 1),
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns or s.start_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in attributes.items()],
+            "status": {"code": 2 if s.status == "error" else 1}
+        })
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "agent_runtime.tracing"}, "spans": spans}]
+        }]
+    }
+
+
+def export_otlp(trace_id, path):
+    """Appends a trace to `path` as one OTLP/JSON line."""
+    line = json.dumps(otlp_payload(trace_id), separators=(",", ":"))
+    with _EXPORT_LOCK, open(path, "a") as f:
+        f.write(line + "\n")
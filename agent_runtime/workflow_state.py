@@ -0,0 +1,132 @@
+"""
+Shared Workflow State
+Typed state that orchestrated sub-agents share through the ADK session
+
+When the Master Orchestrator runs, every sub-agent works in the same session. Instead of
+each agent re-deriving the job id, quantities and winning makers from earlier agents'
+prose, tools read their missing arguments from a WorkflowState kept in session state and
+write their results back, so downstream agents can call their tools straight away.
+
+Tools opt in with the @shares_workflow_state decorator. Outside an ADK run (Flask routes,
+the Flask workflow DAG) there is no tool_context and the tools behave exactly as before.
+"""
+
+import functools
+import inspect
+import uuid
+from dataclasses import dataclass, field, asdict, fields
+
+
+STATE_KEY = "workflow"
+
+
+@dataclass
+class WorkflowState:
+    """Facts established so far in one orchestrated workflow run."""
+
+    run_id: str = field(default_factory=lambda: uuid.uuid4().hex[:6].upper())
+
+    # Demand pick
+    product_id: str = ""
+    product_name: str = ""
+    demand_score: float = 0.0
+    order_qty: int = 0
+
+    # Job spec / bidding
+    job_id: str = ""
+    required_qty: int = 0
+    required_skill: str = ""
+    bid_status: str = ""
+
+    # Optimization
+    winning_makers: list = field(default_factory=list)
+    total_cost: float = 0.0
+    lead_time_days: int = 0
+
+    # Logistics
+    plan_id: str = ""
+    final_delivery_date: str = ""
+
+    @property
+    def proposed_job_id(self):
+        """Job id for a bid on the demand pick, unique to this run so repeated runs never collide."""
+        return f"JOB_{self.product_id}_{self.run_id}" if self.product_id else ""
+
+    @classmethod
+    def from_dict(cls, data):
+        known = {f.name for f in fields(cls)}
+        return cls(**{k: v for k, v in (data or {}).items() if k in known})
+
+    def to_dict(self):
+        return asdict(self)
+
+
+def load_workflow_state(tool_context):
+    """The WorkflowState stored in the tool's session (empty if none yet)."""
+    return WorkflowState.from_dict(tool_context.state.get(STATE_KEY))
+
+
+def save_workflow_state(tool_context, state):
+    # Stored as a plain dict so the session state stays JSON-serializable
+    tool_context.state[STATE_KEY] = state.to_dict()
+
+
+def shares_workflow_state(reads=None, record=None):
+    """
+    Decorator connecting a tool to the shared WorkflowState.
+
+    The decorated tool gains an optional `tool_context` parameter, which ADK fills in.
+    When present, empty arguments listed in `reads` are filled from the state before the
+    call (so the agent may omit them) and, after a successful call, `record` writes the
+    outcome back. Called without a tool_context, the tool is unchanged.
+
+    Args:
+        reads: Dict of argument name -> WorkflowState field used when the argument is empty
+        record: Optional callable(state, arguments, result) updating the state in place
+    """
+    reads = reads or {}
+
+    def decorator(fn):
+        signature = inspect.signature(fn)
+        required = [name for name, p in signature.parameters.items() if p.default is inspect.Parameter.empty]
+
+        @functools.wraps(fn)
+        def wrapper(*args, tool_context=None, **kwargs):
+            if tool_context is None:
+                return fn(*args, **kwargs)
+
+            state = load_workflow_state(tool_context)
+            arguments = dict(signature.bind_partial(*args, **kwargs).arguments)
+            for name, state_field in reads.items():
+                if not arguments.get(name):
+                    value = getattr(state, state_field)
+                    # List-valued state feeds comma-separated tool arguments
+                    arguments[name] = ",".join(value) if isinstance(value, list) else value
+
+            missing = [name for name in required if not arguments.get(name)]
+            if missing:
+                return {
+                    "status": "error",
+                    "error_message": f"Missing {', '.join(missing)}: not provided and not yet in the workflow state"
+                }
+
+            bound = signature.bind(**arguments)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            result = fn(**arguments)
+            if record is not None and isinstance(result, dict) and result.get("status") == "success":
+                record(state, arguments, result)
+                save_workflow_state(tool_context, state)
+            return result
+
+        # Agents see state-backed arguments as optional
+        parameters = [
+            p.replace(default=p.annotation() if isinstance(p.annotation, type) else "")
+            if p.name in reads and p.default is inspect.Parameter.empty else p
+            for p in signature.parameters.values()
+        ]
+        parameters.append(inspect.Parameter("tool_context", inspect.Parameter.KEYWORD_ONLY, default=None))
+        wrapper.__signature__ = signature.replace(parameters=parameters)
+        return wrapper
+
+    return decorator
@@ -0,0 +1,318 @@
+"""
+Admission Control
+Per-route concurrency limits, per-client rate limits and priority queues for expensive routes
+
+Each expensive route gets an AdmissionPolicy. A request to one of these routes must pass
+two checks before its view runs:
+- Rate: a token bucket per (client, route). An empty bucket gets an immediate 429 with a
+  Retry-After of when the next token arrives.
+- Concurrency: at most `max_concurrent` requests run at once. Up to `max_queue` more wait
+  in a priority queue (admin-token requests first, then normal ones, then requests sent
+  with `X-Request-Priority: low`; arrival order within a class). A full queue, or a wait
+  longer than `queue_timeout` seconds, gets a fast 503 with Retry-After.
+
+Routes without a policy (health, bid status, the other reads) are never queued, so a burst
+of workflow runs cannot starve them. Queued requests hold a server thread while they wait,
+which is why the queues are short and the timeouts are a few seconds at most.
+
+Queue depth, in-flight counts, admissions and rejections are exported on /metrics and
+summarized in /api/health. CORNERSTONE_ADMISSION=off disables all of it.
+"""
+
+import heapq
+import itertools
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+
+from flask import g, jsonify, request
+
+from metrics import METRICS
+from profiling import is_admin
+
+
+ENABLED = os.environ.get("CORNERSTONE_ADMISSION", "on").lower() not in ("0", "off", "false")
+# Behind a reverse proxy the client is the first X-Forwarded-For hop, not the proxy
+TRUST_PROXY = os.environ.get("CORNERSTONE_TRUST_PROXY", "0").lower() in ("1", "on", "true")
+MAX_TRACKED_CLIENTS = 10000
+
+PRIORITY_ADMIN, PRIORITY_NORMAL, PRIORITY_LOW = 0, 1, 2
+PRIORITY_NAMES = {PRIORITY_ADMIN: "admin", PRIORITY_NORMAL: "normal", PRIORITY_LOW: "low"}
+
+
+@dataclass(frozen=True)
+class AdmissionPolicy:
+    """Limits for one route."""
+
+    max_concurrent: int = 0      # 0: no concurrency limit
+    max_queue: int = 0           # Requests allowed to wait for a slot
+    queue_timeout: float = 1.0   # Seconds a queued request waits before a 503
+    rate: float = 0.0            # Tokens per second per client (0: no rate limit)
+    burst: int = 1               # Bucket size
+
+
+# Multi-agent workflows take seconds and hold a runner; optimization and simulation are CPU-bound
+ROUTE_POLICIES = {
+    "/api/complete-workflow-adk": AdmissionPolicy(max_concurrent=4, max_queue=8, queue_timeout=2.0, rate=0.2, burst=3),
+    "/api/complete-workflow-flask": AdmissionPolicy(max_concurrent=4, max_queue=8, queue_timeout=2.0, rate=0.2, burst=3),
+    "/api/workflow-jobs": AdmissionPolicy(rate=0.2, burst=3),   # Has its own bounded job queue
+    "/api/optimize-bids": AdmissionPolicy(max_concurrent=8, max_queue=32, queue_timeout=1.0, rate=5.0, burst=10),
+    "/api/size-orders": AdmissionPolicy(max_concurrent=4, max_queue=16, queue_timeout=1.0, rate=2.0, burst=5),
+    "/api/batch": AdmissionPolicy(max_concurrent=4, max_queue=16, queue_timeout=1.0, rate=2.0, burst=5),
+}
+
+
+class Rejected(Exception):
+    """A request was not admitted; carries the HTTP status and Retry-After seconds."""
+
+    def __init__(self, status, reason, retry_after, message):
+        super().__init__(message)
+        self.status = status
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class TokenBuckets:
+    """Token buckets keyed by client, least recently seen clients forgotten first."""
+
+    def __init__(self, rate, burst, max_clients=MAX_TRACKED_CLIENTS):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets = OrderedDict()   # client -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def take(self, client):
+        """Takes a token for `client`. Returns 0.0, or the seconds until a token is available."""
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.pop(client, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            wait = 0.0
+            if tokens >= 1:
+                tokens -= 1
+            else:
+                wait = (1 - tokens) / self.rate
+            self._buckets[client] = (tokens, now)
+            while len(self._buckets) > self.max_clients:
+                self._buckets.popitem(last=False)
+            return wait
+
+
+class ConcurrencyGate:
+    """Counting semaphore whose waiters are served by (priority, arrival order)."""
+
+    def __init__(self, max_concurrent, max_queue):
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self.in_flight = 0
+        self._waiting = []     # heap of (priority, seq)
+        self._abandoned = set()
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+
+    @property
+    def queued(self):
+        return len(self._waiting) - len(self._abandoned)
+
+    def _head(self):
+        # Caller holds the lock; skips waiters that timed out
+        while self._waiting and self._waiting[0] in self._abandoned:
+            self._abandoned.discard(heapq.heappop(self._waiting))
+        return self._waiting[0] if self._waiting else None
+
+    def acquire(self, priority, timeout):
+        """
+        Takes a slot, waiting up to `timeout` seconds behind higher-priority and earlier
+        waiters. Returns the seconds waited; raises Rejected when the queue is full or
+        the wait times out.
+        """
+        with self._cond:
+            if self.in_flight < self.max_concurrent and self._head() is None:
+                self.in_flight += 1
+                return 0.0
+            if self.queued >= self.max_queue:
+                raise Rejected(503, "queue_full", max(1, math.ceil(timeout)),
+                               f"Server busy: {self.in_flight} running and {self.queued} queued; try again shortly.")
+            entry = (priority, next(self._seq))
+            heapq.heappush(self._waiting, entry)
+            started = time.monotonic()
+            admitted = self._cond.wait_for(
+                lambda: self.in_flight < self.max_concurrent and self._head() == entry, timeout
+            )
+            if not admitted:
+                self._abandoned.add(entry)
+                self._cond.notify_all()
+                raise Rejected(503, "queue_timeout", max(1, math.ceil(timeout)),
+                               f"Server busy: no slot freed up within {timeout:g}s; try again shortly.")
+            heapq.heappop(self._waiting)
+            self.in_flight += 1
+            # The next waiter may be admitted too if more than one slot is free
+            self._cond.notify_all()
+            return time.monotonic() - started
+
+    def release(self):
+        with self._cond:
+            self.in_flight -= 1
+            self._cond.notify_all()
+
+
+class RouteAdmission:
+    """Admission state (buckets, gate, counters) for one route."""
+
+    def __init__(self, route, policy):
+        self.route = route
+        self.policy = policy
+        self.buckets = TokenBuckets(policy.rate, policy.burst) if policy.rate else None
+        self.gate = ConcurrencyGate(policy.max_concurrent, policy.max_queue) if policy.max_concurrent else None
+        self._lock = threading.Lock()
+        self.admitted = 0
+        self.queued_total = 0
+        self.queue_wait_seconds = 0.0
+        self.rejected = {}   # reason -> count
+
+    def admit(self, client, priority):
+        """
+        Admits one request or raises Rejected. On success returns a release callable,
+        which must be called once the request has finished.
+        """
+        try:
+            if self.buckets is not None and priority != PRIORITY_ADMIN:
+                wait = self.buckets.take(client)
+                if wait:
+                    raise Rejected(429, "rate_limited", max(1, math.ceil(wait)),
+                                   f"Rate limit for {self.route} exceeded ({self.policy.rate:g}/s, burst {self.policy.burst}).")
+            waited = self.gate.acquire(priority, self.policy.queue_timeout) if self.gate is not None else 0.0
+        except Rejected as e:
+            with self._lock:
+                self.rejected[e.reason] = self.rejected.get(e.reason, 0) + 1
+            raise
+        with self._lock:
+            self.admitted += 1
+            if waited:
+                self.queued_total += 1
+                self.queue_wait_seconds += waited
+        return self.gate.release if self.gate is not None else _noop
+
+    def stats(self):
+        with self._lock:
+            return {
+                "max_concurrent": self.policy.max_concurrent or None,
+                "max_queue": self.policy.max_queue,
+                "rate_per_second": self.policy.rate or None,
+                "burst": self.policy.burst,
+                "in_flight": self.gate.in_flight if self.gate is not None else None,
+                "queued": self.gate.queued if self.gate is not None else 0,
+                "admitted": self.admitted,
+                "admitted_after_queueing": self.queued_total,
+                "mean_queue_wait_ms": round(self.queue_wait_seconds / self.queued_total * 1000, 1) if self.queued_total else 0.0,
+                "rejected": dict(self.rejected)
+            }
+
+
+def _noop():
+    pass
+
+
+class AdmissionController:
+    """Admission state for every route with a policy."""
+
+    def __init__(self, policies):
+        self.routes = {route: RouteAdmission(route, policy) for route, policy in policies.items()}
+
+    def admit(self, route, client, priority=PRIORITY_NORMAL):
+        """Release callable for an admitted request (None for routes without a policy); raises Rejected."""
+        admission = self.routes.get(route)
+        return admission.admit(client, priority) if admission is not None else None
+
+    def stats(self):
+        return {"enabled": ENABLED, "routes": {route: admission.stats() for route, admission in self.routes.items()}}
+
+    def render(self):
+        """Prometheus exposition lines: queue depth and in-flight gauges, admission/rejection counters."""
+        routes = sorted(self.routes.items())
+        lines = [
+            "# HELP cornerstone_admission_queue_depth Requests waiting for a concurrency slot by route.",
+            "# TYPE cornerstone_admission_queue_depth gauge",
+        ]
+        lines += [f'cornerstone_admission_queue_depth{{route="{route}"}} {a.gate.queued}' for route, a in routes if a.gate is not None]
+        lines += [
+            "# HELP cornerstone_admission_in_flight Admitted requests currently running by route.",
+            "# TYPE cornerstone_admission_in_flight gauge",
+        ]
+        lines += [f'cornerstone_admission_in_flight{{route="{route}"}} {a.gate.in_flight}' for route, a in routes if a.gate is not None]
+        lines += [
+            "# HELP cornerstone_admission_admitted_total Requests admitted by route.",
+            "# TYPE cornerstone_admission_admitted_total counter",
+        ]
+        lines += [f'cornerstone_admission_admitted_total{{route="{route}"}} {a.admitted}' for route, a in routes]
+        lines += [
+            "# HELP cornerstone_admission_rejected_total Requests shed by route and reason (rate_limited, queue_full, queue_timeout).",
+            "# TYPE cornerstone_admission_rejected_total counter",
+        ]
+        for route, a in routes:
+            for reason, count in sorted(a.rejected.items()):
+                lines.append(f'cornerstone_admission_rejected_total{{route="{route}",reason="{reason}"}} {count}')
+        lines += [
+            "# HELP cornerstone_admission_queue_wait_seconds_total Time admitted requests spent queued by route.",
+            "# TYPE cornerstone_admission_queue_wait_seconds_total counter",
+        ]
+        lines += [f'cornerstone_admission_queue_wait_seconds_total{{route="{route}"}} {a.queue_wait_seconds:.6f}' for route, a in routes]
+        return lines
+
+
+ADMISSION = AdmissionController(ROUTE_POLICIES if ENABLED else {})
+METRICS.add_collector(ADMISSION.render)
+
+
+def client_key(remote_addr, forwarded_for=None):
+    """Identity rate limits are counted against."""
+    if TRUST_PROXY and forwarded_for:
+        return forwarded_for.split(",")[0].strip()
+    return remote_addr or "unknown"
+
+
+def request_priority(admin, priority_header):
+    if admin:
+        return PRIORITY_ADMIN
+    return PRIORITY_LOW if (priority_header or "").lower() == "low" else PRIORITY_NORMAL
+
+
+def rejection_body(e):
+    return {"status": "error", "error_message": str(e), "reason": e.reason, "retry_after_seconds": e.retry_after}
+
+
+# ============================================================================
+# FLASK INTEGRATION
+# ============================================================================
+
+def _before_request():
+    if request.url_rule is None or request.method == "OPTIONS":
+        return None
+    try:
+        release = ADMISSION.admit(
+            request.url_rule.rule,
+            client_key(request.remote_addr, request.headers.get("X-Forwarded-For")),
+            request_priority(is_admin(), request.headers.get("X-Request-Priority"))
+        )
+    except Rejected as e:
+        return jsonify(rejection_body(e)), e.status, {"Retry-After": str(e.retry_after)}
+    if release is not None:
+        g.admission_release = release
+    return None
+
+
+def _teardown_request(exc):
+    release = g.pop("admission_release", None)
+    if release is not None:
+        release()
+
+
+def install(app):
+    """Applies ROUTE_POLICIES to `app`'s routes."""
+    app.before_request(_before_request)
+    app.teardown_request(_teardown_request)
+    return app
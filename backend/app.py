@@ -4,27 +4,56 @@ Bridges frontend UI with ADK agents
 Supports both direct tool calls AND SequentialAgent orchestration
 """
 
-from flask import Flask, jsonify, request, render_template
+from flask import Flask, Response, jsonify, request, render_template
 from flask_cors import CORS
 import sys
 import os
 
-# Add parent directory to path to import agents
+# Add parent directory to path to import agents (and this directory for backend modules)
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
 # Import agent tools directly
-from demand_agent.agent import analyze_market_trends, get_product_recommendations, calculate_demand_forecast
-from bid_coordinator_agent.agent import create_bid_window, get_bid_status, close_bid_window, notify_winners
+from demand_agent.agent import analyze_market_trends, get_product_recommendations, calculate_demand_forecast, size_order_quantities, DEMAND_CACHE
+from demand_agent.signal_stream import refresh_signals
+from bid_coordinator_agent.agent import create_bid_window, get_bid_status, submit_bid, close_bid_window, notify_winners
 from cornerstone_agent.agent import optimize_bids, get_job_details, list_manufacturers
 from timeline_agent.agent import update_timeline, get_timeline_status, send_message_to_manufacturer
-from logistics_agent.agent import plan_logistics, optimize_shipping_costs, track_shipments, coordinate_consolidation
-
-# Import Master Orchestrator for sequential workflow
-from master_orchestrator_agent.agent import root_agent as master_orchestrator
-from google.adk.runners import Runner
+from logistics_agent.agent import plan_logistics, optimize_shipping_costs, track_shipments, record_tracking_event, coordinate_consolidation
+
+from agent_runtime.intent_router import get_router_stats
+from agent_runtime.agent_cache import get_agent_cache_stats
+from agent_runtime.tracing import TRACE_STORE, get_trace, otlp_payload
+from agent_runtime.read_model import DASHBOARD
+from agent_runtime.events import CHANGE_BUS, STREAM_SLOTS, TOPICS, TooManySubscribers, stream_changes
+from agent_runtime.offload import OFFLOAD_POOL
+from agent_runtime.shared_state import SHARED_STATE
+
+# Flask-orchestrated workflow (synchronous and background job variants)
+from workflows import run_flask_workflow, WorkflowError
+from workflow_jobs import submit_workflow_job, get_workflow_job, stream_job_events, JobQueueFull
+from batch import run_batch, BatchError
+from response_cache import cached_response, get_response_cache_stats
+
+# ADK Runner wrapper for the Master Orchestrator sequential workflow
+import adk_runtime
+from adk_runtime import run_workflow, workflow_response, RunnerPoolExhausted
+
+import metrics
+import profiling
+import admission
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for frontend requests
+metrics.install(app)  # Per-route latency/status/size metrics, served at /metrics
+admission.install(app)  # Concurrency/rate limits and priority queues for expensive routes (429/503 + Retry-After)
+profiling.install(app)  # Admin-gated / sampled request profiling, reports under /api/admin/profiles
+
+
+@app.before_request
+def sync_shared_state():
+    # Under a multi-worker server, apply other workers' tool changes before serving (no-op otherwise)
+    SHARED_STATE.sync()
 
 
 # ============================================================================
@@ -71,17 +100,25 @@ def api_analyze_demand():
     """Analyze market trends for products"""
     data = request.json or {}
     category = data.get('category', '')
+    try:
+        limit = int(data.get('limit', 20))
+    except (TypeError, ValueError):
+        limit = 20  # Like request.args.get(type=int): an unparseable limit gets the default
+    cursor = data.get('cursor', '')
     
-    result = analyze_market_trends(category)
+    result = analyze_market_trends(category, limit, cursor)
     return jsonify(result)
 
 
 @app.route('/api/recommendations', methods=['GET'])
+@cached_response(domains=('signals', 'forecasts', 'catalog'), before=refresh_signals)
 def api_get_recommendations():
     """Get product recommendations"""
-    min_score = float(request.args.get('min_score', 7.0))
+    min_score = request.args.get('min_score', 7.0, type=float)
+    limit = request.args.get('limit', 20, type=int)
+    cursor = request.args.get('cursor', '')
     
-    result = get_product_recommendations(min_score)
+    result = get_product_recommendations(min_score, limit, cursor)
     return jsonify(result)
 
 
@@ -96,6 +133,20 @@ def api_forecast():
     return jsonify(result)
 
 
+@app.route('/api/size-orders', methods=['POST'])
+def api_size_orders():
+    """Recommend order quantities from simulated demand"""
+    data = request.json or {}
+    
+    result = size_order_quantities(
+        product_ids=data.get('product_ids', ''),
+        timeframe=data.get('timeframe', '30_days'),
+        required_skill=data.get('required_skill', 'CNC'),
+        limit=int(data.get('limit', 10))
+    )
+    return jsonify(result)
+
+
 # ============================================================================
 # BID COORDINATION ENDPOINTS
 # ============================================================================
@@ -122,6 +173,20 @@ def api_bid_status(job_id):
     return jsonify(result)
 
 
+@app.route('/api/submit-bid', methods=['POST'])
+def api_submit_bid():
+    """Submit a manufacturer's bid on an open bid window"""
+    data = request.json or {}
+    
+    result = submit_bid(
+        job_id=data.get('job_id'),
+        maker_id=data.get('maker_id'),
+        price_per_unit=data.get('price_per_unit', 0),
+        quantity=data.get('quantity', 0)
+    )
+    return jsonify(result)
+
+
 @app.route('/api/close-bid', methods=['POST'])
 def api_close_bid():
     """Close a bid window"""
@@ -161,6 +226,7 @@ def api_optimize_bids():
 
 
 @app.route('/api/job-details', methods=['GET'])
+@cached_response()
 def api_job_details():
     """Get current job details"""
     result = get_job_details()
@@ -168,6 +234,7 @@ def api_job_details():
 
 
 @app.route('/api/manufacturers', methods=['GET'])
+@cached_response()
 def api_manufacturers():
     """List manufacturers"""
     skill = request.args.get('skill', '')
@@ -247,6 +314,20 @@ def api_track_shipments(job_id):
     return jsonify(result)
 
 
+@app.route('/api/tracking-events', methods=['POST'])
+def api_tracking_event():
+    """Record a carrier tracking event for one shipment"""
+    data = request.json or {}
+    
+    result = record_tracking_event(
+        job_id=data.get('job_id'),
+        maker_id=data.get('maker_id'),
+        status=data.get('status', ''),
+        location=data.get('location', '')
+    )
+    return jsonify(result)
+
+
 @app.route('/api/coordinate-consolidation', methods=['POST'])
 def api_coordinate_consolidation():
     """Coordinate consolidation"""
@@ -257,6 +338,66 @@ def api_coordinate_consolidation():
     return jsonify(result)
 
 
+# ============================================================================
+# DASHBOARD
+# ============================================================================
+
+@app.route('/api/dashboard', methods=['GET'])
+@cached_response(domains=('bids', 'timelines', 'logistics'))
+def api_dashboard():
+    """Summaries of every job (bids, timelines, logistics) plus totals, from the read model"""
+    return jsonify({'status': 'success', **DASHBOARD.snapshot()})
+
+
+@app.route('/api/dashboard/<job_id>', methods=['GET'])
+@cached_response(domains=('bids', 'timelines', 'logistics'))
+def api_dashboard_job(job_id):
+    """One job's dashboard summary"""
+    summary = DASHBOARD.get(job_id)
+    if summary is None:
+        return jsonify({'status': 'error', 'error_message': f'Job {job_id} not found'}), 404
+    return jsonify({'status': 'success', 'job': summary})
+
+
+@app.route('/api/events', methods=['GET'])
+def api_events():
+    """
+    Stream bid, timeline and tracking changes as Server-Sent Events
+    ?job_id=A,B and ?topics=bid,timeline,tracking narrow the stream (default: everything)
+    """
+    job_ids = [j for j in request.args.get('job_id', '').split(',') if j]
+    topics = [t for t in request.args.get('topics', '').split(',') if t]
+    unknown = set(topics) - set(TOPICS)
+    if unknown:
+        return jsonify({'status': 'error', 'error_message': f"Unknown topics: {', '.join(sorted(unknown))} (use {', '.join(TOPICS)})"}), 400
+    last_event_id = request.headers.get('Last-Event-ID') or request.args.get('last_event_id', '')
+    try:
+        stream = STREAM_SLOTS.hold(lambda: stream_changes(
+            CHANGE_BUS.subscribe(job_ids, topics, int(last_event_id) if last_event_id.isdigit() else None)
+        ))
+    except TooManySubscribers as e:
+        return jsonify({'status': 'error', 'error_message': str(e)}), 503, {'Retry-After': '5'}
+    
+    return Response(
+        stream,
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
+# ============================================================================
+# BATCH
+# ============================================================================
+
+@app.route('/api/batch', methods=['POST'])
+def api_batch():
+    """Run several tool calls in one request (independent calls concurrently)"""
+    try:
+        return jsonify(run_batch(request.get_json(silent=True)))
+    except BatchError as e:
+        return jsonify({'status': 'error', 'error_message': str(e)}), 400
+
+
 # ============================================================================
 # ORCHESTRATED WORKFLOWS
 # ============================================================================
@@ -269,79 +410,60 @@ def api_complete_workflow_flask():
     (Flask calls each tool sequentially)
     """
     try:
-        # Step 1: Analyze demand
-        demand_result = analyze_market_trends('')
-        if demand_result['status'] != 'success':
-            return jsonify({'error': 'Demand analysis failed'}), 500
-        
-        top_product = demand_result['report']['trending_products'][0]
-        
-        # Step 2: Create bid window
-        bid_result = create_bid_window(
-            job_id=f"JOB_{top_product['product_id']}",
-            product_name=top_product['name'],
-            required_qty=top_product['estimated_volume'],
-            required_skill='CNC',
-            duration_hours=96
-        )
-        
-        if bid_result['status'] != 'success':
-            return jsonify({'error': 'Bid creation failed'}), 500
-        
-        job_id = bid_result['report']['job_id']
-        
-        # Step 3: Close bid (simulate)
-        close_result = close_bid_window(job_id)
-        
-        # Step 4: Optimize bids
-        optimize_result = optimize_bids(
-            job_id=job_id,
-            required_qty=top_product['estimated_volume'],
-            required_skill='CNC'
-        )
-        
-        if optimize_result['status'] != 'success':
-            return jsonify({'error': 'Optimization failed'}), 500
-        
-        # Step 5: Plan logistics
-        winning_makers = ','.join([m['maker_id'] for m in optimize_result['report']['winning_makers']])
-        logistics_result = plan_logistics(job_id, winning_makers)
-        
-        # Compile complete workflow result
-        workflow = {
-            'status': 'success',
-            'orchestration_method': 'flask',
-            'workflow': {
-                'step_1_demand': {
-                    'product': top_product['name'],
-                    'demand_score': top_product['demand_score'],
-                    'estimated_volume': top_product['estimated_volume']
-                },
-                'step_2_bid': {
-                    'job_id': job_id,
-                    'status': 'CLOSED',
-                    'total_bids': 8
-                },
-                'step_3_optimization': {
-                    'total_cost': optimize_result['report']['total_cost'],
-                    'manufacturers': len(optimize_result['report']['winning_makers']),
-                    'lead_time': optimize_result['report']['total_lead_time_days']
-                },
-                'step_4_logistics': {
-                    'consolidation_center': logistics_result['report']['consolidation_center'],
-                    'shipping_cost': f"${logistics_result['report']['estimated_shipping_cost']:.2f}",
-                    'delivery_date': logistics_result['report']['final_delivery_date']
-                },
-                'summary': f"Complete workflow executed via Flask: {top_product['name']} manufacturing planned. Total cost: {optimize_result['report']['total_cost']}, Delivery: {logistics_result['report']['final_delivery_date']}"
-            }
-        }
-        
-        return jsonify(workflow)
-        
+        return jsonify(run_flask_workflow())
+    except WorkflowError as e:
+        return jsonify({'error': str(e)}), 500
     except Exception as e:
         return jsonify({'status': 'error', 'error_message': str(e)}), 500
 
 
+@app.route('/api/workflow-jobs', methods=['POST'])
+def api_submit_workflow_job():
+    """Start the Flask-orchestrated workflow as a background job"""
+    try:
+        job = submit_workflow_job()
+    except JobQueueFull as e:
+        return jsonify({'status': 'error', 'error_message': str(e)}), 503
+    
+    return jsonify({
+        'status': 'success',
+        'report': {
+            'job_id': job.job_id,
+            'job_status': job.status,
+            'status_url': f'/api/workflow-jobs/{job.job_id}',
+            'events_url': f'/api/workflow-jobs/{job.job_id}/events'
+        }
+    }), 202
+
+
+@app.route('/api/workflow-jobs/<job_id>', methods=['GET'])
+def api_workflow_job_status(job_id):
+    """Get a background workflow job's progress and result"""
+    job = get_workflow_job(job_id)
+    if not job:
+        return jsonify({'status': 'error', 'error_message': f'Workflow job {job_id} not found.'}), 404
+    
+    return jsonify({'status': 'success', 'report': job.snapshot()})
+
+
+@app.route('/api/workflow-jobs/<job_id>/events', methods=['GET'])
+def api_workflow_job_events(job_id):
+    """Stream a background workflow job's step results as Server-Sent Events"""
+    job = get_workflow_job(job_id)
+    if not job:
+        return jsonify({'status': 'error', 'error_message': f'Workflow job {job_id} not found.'}), 404
+    try:
+        stream = STREAM_SLOTS.hold(lambda: stream_job_events(job, request.headers.get('Last-Event-ID')))
+    except TooManySubscribers as e:
+        return jsonify({'status': 'error', 'error_message': str(e)}), 503, {'Retry-After': '5'}
+    
+    return Response(
+        stream,
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+
 @app.route('/api/complete-workflow-adk', methods=['POST'])
 def api_complete_workflow_adk():
     """
@@ -350,19 +472,13 @@ def api_complete_workflow_adk():
     (Master Orchestrator calls all 5 agents sequentially)
     """
     try:
-        # Use ADK Runner to execute SequentialAgent
-        runner = Runner(master_orchestrator)
+        # Use ADK Runner to execute SequentialAgent (blocks this thread; see asgi.py for the async mode)
+        result = run_workflow()
         
-        # Execute the workflow
-        result = runner.run("Execute the complete manufacturing workflow for the top trending product")
-        
-        return jsonify({
-            'status': 'success',
-            'orchestration_method': 'adk_sequential_agent',
-            'result': result.output,
-            'summary': 'Workflow executed via ADK SequentialAgent - all 5 agents orchestrated autonomously'
-        })
+        return jsonify(workflow_response(result))
         
+    except RunnerPoolExhausted as e:
+        return jsonify({'status': 'error', 'error_message': str(e)}), 503
     except Exception as e:
         return jsonify({'status': 'error', 'error_message': str(e)}), 500
 
@@ -373,23 +489,68 @@ def api_complete_workflow_adk():
 
 @app.route('/api/health', methods=['GET'])
 def health():
-    """Health check endpoint"""
+    """Health check endpoint with live request metrics"""
+    agents = adk_runtime.get_agent_inventory()
     return jsonify({
         'status': 'healthy',
-        'agents': {
-            'demand_agent': 'active',
-            'bid_coordinator': 'active',
-            'cornerstone_optimizer': 'active',
-            'timeline_manager': 'active',
-            'logistics_coordinator': 'active',
-            'master_orchestrator': 'active'
-        },
-        'total_agents': 6,
-        'total_tools': 17
+        'agents': agents,
+        'total_agents': len(agents),
+        'total_tools': sum(agent['tools'] for agent in agents.values()),
+        'requests': metrics.METRICS.summary(),
+        'change_events': CHANGE_BUS.stats(),
+        'event_streams': STREAM_SLOTS.stats(),
+        'admission': admission.ADMISSION.stats(),
+        'offload': OFFLOAD_POOL.stats(),
+        'shared_state': SHARED_STATE.stats(),
+        'worker_pid': os.getpid(),
+        'adk_loaded': adk_runtime.is_started(),
+        'adk_runner_pool': adk_runtime.get_pool_stats()
+    })
+
+
+@app.route('/api/cache-stats', methods=['GET'])
+def api_cache_stats():
+    """Tool result and agent answer cache hit/miss counters"""
+    return jsonify({
+        'status': 'success',
+        'caches': [DEMAND_CACHE.stats()],
+        'response_caches': get_response_cache_stats(),
+        'agent_cache': get_agent_cache_stats()
+    })
+
+
+@app.route('/api/router-stats', methods=['GET'])
+def api_router_stats():
+    """Intent router fast-path hit rates (chat turns answered without an LLM call)"""
+    return jsonify({
+        'status': 'success',
+        'intent_router': get_router_stats()
     })
 
 
+@app.route('/api/traces', methods=['GET'])
+def api_traces():
+    """Most recent traces (workflow runs and standalone tool calls)"""
+    limit = request.args.get('limit', 20, type=int)
+    return jsonify({
+        'status': 'success',
+        'traces': TRACE_STORE.recent(limit)
+    })
+
+
+@app.route('/api/traces/<trace_id>', methods=['GET'])
+def api_trace(trace_id):
+    """Span tree of one trace; ?format=otlp returns it as OTLP/JSON"""
+    tree = get_trace(trace_id)
+    if tree is None:
+        return jsonify({'status': 'error', 'error_message': f'Trace {trace_id} not found (unknown or evicted)'}), 404
+    if request.args.get('format') == 'otlp':
+        return jsonify(otlp_payload(trace_id))
+    return jsonify({'status': 'success', 'trace': tree})
+
+
 @app.route('/api/info', methods=['GET'])
+@cached_response()
 def api_info():
     """API documentation"""
     return jsonify({
@@ -397,12 +558,16 @@ def api_info():
         'version': '1.0.0',
         'description': 'Backend API for Cornerstone manufacturing network',
         'endpoints': {
-            'demand': ['/api/analyze-demand', '/api/recommendations', '/api/forecast'],
-            'bidding': ['/api/create-bid', '/api/bid-status/<job_id>', '/api/close-bid', '/api/notify-winners'],
+            'demand': ['/api/analyze-demand', '/api/recommendations', '/api/forecast', '/api/size-orders'],
+            'bidding': ['/api/create-bid', '/api/bid-status/<job_id>', '/api/submit-bid', '/api/close-bid', '/api/notify-winners'],
             'optimization': ['/api/optimize-bids', '/api/job-details', '/api/manufacturers'],
             'timeline': ['/api/update-timeline', '/api/timeline-status', '/api/send-message'],
-            'logistics': ['/api/plan-logistics', '/api/optimize-shipping', '/api/track-shipments/<job_id>', '/api/coordinate-consolidation'],
-            'workflows': ['/api/complete-workflow-flask', '/api/complete-workflow-adk']
+            'logistics': ['/api/plan-logistics', '/api/optimize-shipping', '/api/track-shipments/<job_id>', '/api/tracking-events', '/api/coordinate-consolidation'],
+            'dashboard': ['/api/dashboard', '/api/dashboard/<job_id>', '/api/events'],
+            'batch': ['/api/batch'],
+            'workflows': ['/api/complete-workflow-flask', '/api/complete-workflow-adk', '/api/workflow-jobs', '/api/workflow-jobs/<job_id>', '/api/workflow-jobs/<job_id>/events'],
+            'monitoring': ['/api/health', '/metrics', '/api/cache-stats', '/api/router-stats', '/api/traces', '/api/traces/<trace_id>'],
+            'admin': ['/api/admin/profiles', '/api/admin/profiles/<report_id>/<kind>']
         },
         'documentation': 'See README.md for usage examples'
     })
@@ -417,5 +582,12 @@ if __name__ == '__main__':
     print("Projects: http://localhost:5001/projects")
     print("API Info: http://localhost:5001/api/info")
     print("Health Check: http://localhost:5001/api/health")
+    print("Debug server; for production: ./start.sh prod")
     print("=" * 60)
+    # Warm the ADK runner pool and the solver offload workers before serving (skipped in the
+    # reloader's watcher process; the ADK pool is deferred to the first ADK request with
+    # CORNERSTONE_FAST_START=1)
+    if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        adk_runtime.start_at_boot()
+        OFFLOAD_POOL.start()
     app.run(debug=True, port=5001)
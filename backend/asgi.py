@@ -0,0 +1,239 @@
+"""
+Cornerstone ASGI Server
+Asyncio-native serving mode for the Flask backend
+
+- /api/complete-workflow-adk is served natively: the ADK runner is awaited on the event
+  loop, so an in-flight multi-agent LLM run holds no thread.
+- Every other route is the unchanged Flask view, dispatched through a small ASGI -> WSGI
+  bridge. CPU-heavy tool routes run on a dedicated executor sized to the CPU count so they
+  cannot starve the quick read routes, which use a separate I/O executor.
+
+Run with:
+    python backend/asgi.py
+or:
+    uvicorn asgi:app --app-dir backend --port 5001
+"""
+
+import asyncio
+import contextlib
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Mount, Route
+
+from app import app as flask_app
+import adk_runtime
+from adk_runtime import run_workflow_async, workflow_response, RunnerPoolExhausted
+from metrics import METRICS
+from admission import ADMISSION, Rejected, client_key, rejection_body, request_priority
+from profiling import admin_token_valid
+from agent_runtime.events import STREAM_SLOTS
+from agent_runtime.offload import OFFLOAD_POOL
+
+
+# Routes whose tools do real computation (optimization, simulation, full workflows)
+CPU_HEAVY_PATHS = {
+    '/api/optimize-bids',
+    '/api/size-orders',
+    '/api/complete-workflow-flask',
+    '/api/plan-logistics',
+    '/api/optimize-shipping',
+}
+
+CPU_EXECUTOR = ThreadPoolExecutor(max_workers=os.cpu_count() or 2, thread_name_prefix='cpu-tools')
+IO_WORKERS = 64
+IO_EXECUTOR = ThreadPoolExecutor(max_workers=IO_WORKERS, thread_name_prefix='flask-views')
+
+# Streaming responses wait for their next chunk on IO_EXECUTOR threads; keep half of them for the other routes
+if not STREAM_SLOTS.limit:
+    STREAM_SLOTS.limit = IO_WORKERS // 2
+
+
+# ============================================================================
+# NATIVE ASYNC ROUTES
+# ============================================================================
+
+async def api_complete_workflow_adk(request):
+    """Execute the ADK SequentialAgent workflow without blocking a worker thread"""
+    # Served outside Flask, so measured here rather than by the Flask request hooks
+    with METRICS.track('POST', '/api/complete-workflow-adk') as outcome:
+        # Admission waits (at most the route's queue timeout) on a thread, not the event loop
+        try:
+            release = await asyncio.to_thread(
+                ADMISSION.admit,
+                '/api/complete-workflow-adk',
+                client_key(request.client.host if request.client else '', request.headers.get('x-forwarded-for')),
+                request_priority(admin_token_valid(request.headers.get('x-admin-token')),
+                                 request.headers.get('x-request-priority'))
+            )
+        except Rejected as e:
+            response = JSONResponse(rejection_body(e), status_code=e.status, headers={'Retry-After': str(e.retry_after)})
+            outcome.status = response.status_code
+            outcome.size = len(response.body)
+            return response
+        try:
+            result = await run_workflow_async()
+            response = JSONResponse(workflow_response(result))
+        except RunnerPoolExhausted as e:
+            response = JSONResponse({'status': 'error', 'error_message': str(e)}, status_code=503)
+        except Exception as e:
+            response = JSONResponse({'status': 'error', 'error_message': str(e)}, status_code=500)
+        finally:
+            if release is not None:
+                release()
+        outcome.status = response.status_code
+        outcome.size = len(response.body)
+        return response
+
+
+# ============================================================================
+# FLASK BRIDGE
+# ============================================================================
+
+def _build_environ(scope, body):
+    """Translates an ASGI HTTP scope and request body into a WSGI environ."""
+    server = scope.get('server') or ('localhost', 80)
+    client = scope.get('client') or ('', 0)
+    environ = {
+        'REQUEST_METHOD': scope['method'],
+        'SCRIPT_NAME': scope.get('root_path', '').encode('utf8').decode('latin1'),
+        'PATH_INFO': scope['path'].encode('utf8').decode('latin1'),
+        'QUERY_STRING': scope['query_string'].decode('latin1'),
+        'SERVER_NAME': server[0],
+        'SERVER_PORT': str(server[1]),
+        'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+        'REMOTE_ADDR': client[0],
+        'REMOTE_PORT': str(client[1]),
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.version': (1, 0),
+        'wsgi.url_scheme': scope.get('scheme', 'http'),
+        'wsgi.input': _BytesInput(body),
+        'wsgi.errors': sys.stderr,
+        'wsgi.multithread': True,
+        'wsgi.multiprocess': False,
+        'wsgi.run_once': False,
+    }
+    for name, value in scope.get('headers', []):
+        key = name.decode('latin1').upper().replace('-', '_')
+        value = value.decode('latin1')
+        if key == 'CONTENT_TYPE':
+            environ['CONTENT_TYPE'] = value
+        elif key == 'CONTENT_LENGTH':
+            continue
+        else:
+            key = f'HTTP_{key}'
+            environ[key] = f"{environ[key]},{value}" if key in environ else value
+    return environ
+
+
+class _BytesInput:
+    """Minimal wsgi.input over an already-received request body."""
+
+    def __init__(self, body):
+        self._body = body
+        self._pos = 0
+
+    def read(self, size=-1):
+        end = len(self._body) if size is None or size < 0 else self._pos + size
+        chunk = self._body[self._pos:end]
+        self._pos += len(chunk)
+        return chunk
+
+    def readline(self, size=-1):
+        newline = self._body.find(b'\n', self._pos)
+        end = len(self._body) if newline < 0 else newline + 1
+        if size is not None and size >= 0:
+            end = min(end, self._pos + size)
+        chunk = self._body[self._pos:end]
+        self._pos += len(chunk)
+        return chunk
+
+    def __iter__(self):
+        while True:
+            line = self.readline()
+            if not line:
+                return
+            yield line
+
+
+class FlaskBridge:
+    """ASGI app that dispatches requests to a WSGI app on thread pool executors."""
+
+    def __init__(self, wsgi_app):
+        self.wsgi_app = wsgi_app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return
+
+        body = b''
+        more_body = True
+        while more_body:
+            message = await receive()
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+
+        loop = asyncio.get_running_loop()
+        executor = CPU_EXECUTOR if scope['path'] in CPU_HEAVY_PATHS else IO_EXECUTOR
+        response_start = {}
+
+        def start_response(status, headers, exc_info=None):
+            response_start['status'] = int(status.split(' ', 1)[0])
+            response_start['headers'] = [
+                (name.lower().encode('latin1'), value.encode('latin1')) for name, value in headers
+            ]
+
+        environ = _build_environ(scope, body)
+        iterable = await loop.run_in_executor(executor, self.wsgi_app, environ, start_response)
+
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': response_start['status'],
+                'headers': response_start['headers'],
+            })
+            # Pull chunks off the executor so streaming (generator) responses work too
+            iterator = iter(iterable)
+            while True:
+                chunk = await loop.run_in_executor(IO_EXECUTOR, next, iterator, None)
+                if chunk is None:
+                    break
+                if chunk:
+                    await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+            await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+        finally:
+            if hasattr(iterable, 'close'):
+                await loop.run_in_executor(IO_EXECUTOR, iterable.close)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    # Warm the ADK runner pool at process start, before accepting requests (unless fast start)
+    await asyncio.get_running_loop().run_in_executor(None, adk_runtime.start_at_boot)
+    await asyncio.get_running_loop().run_in_executor(None, OFFLOAD_POOL.start)
+    yield
+    OFFLOAD_POOL.shutdown()
+
+
+app = Starlette(lifespan=lifespan, routes=[
+    Route('/api/complete-workflow-adk', api_complete_workflow_adk, methods=['POST']),
+    Mount('/', app=FlaskBridge(flask_app.wsgi_app)),
+])
+
+
+if __name__ == '__main__':
+    import uvicorn
+
+    print("=" * 60)
+    print("CORNERSTONE BACKEND API SERVER (ASGI)")
+    print("=" * 60)
+    print("Frontend: http://localhost:5001")
+    print("API Info: http://localhost:5001/api/info")
+    print("=" * 60)
+    uvicorn.run(app, host='127.0.0.1', port=5001)
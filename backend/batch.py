@@ -0,0 +1,132 @@
+"""
+Batch Tool API
+Runs many tool invocations from one request, independent ones concurrently
+
+POST /api/batch takes a list of calls:
+
+    {"calls": [
+        {"id": "bids", "tool": "get_bid_status", "args": {"job_id": "KNICK_2025"}},
+        {"id": "timeline", "tool": "get_timeline_status"},
+        {"id": "close", "tool": "close_bid_window", "args": {"job_id": "JOB_1"}},
+        {"id": "optimize", "tool": "optimize_bids", "args": {...}, "depends_on": ["close"]}
+    ]}
+
+Calls are steps of a workflow DAG (agent_runtime/workflow_dag.py): a call starts as soon
+as the calls it depends on have finished, so calls without dependencies all run at once.
+Every call gets its own status, result and timing; one call failing never fails the
+batch, and calls depending on a failed call are skipped.
+"""
+
+import inspect
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+from agent_runtime.tracing import trace
+from agent_runtime.workflow_dag import Step, run_dag
+from demand_agent.agent import analyze_market_trends, get_product_recommendations, calculate_demand_forecast, size_order_quantities
+from bid_coordinator_agent.agent import create_bid_window, get_bid_status, submit_bid, close_bid_window, notify_winners
+from cornerstone_agent.agent import optimize_bids, get_job_details, list_manufacturers
+from timeline_agent.agent import update_timeline, get_timeline_status, send_message_to_manufacturer
+from logistics_agent.agent import plan_logistics, optimize_shipping_costs, track_shipments, record_tracking_event, coordinate_consolidation
+
+
+MAX_BATCH_CALLS = int(os.environ.get("CORNERSTONE_BATCH_MAX_CALLS", "50"))
+BATCH_WORKERS = int(os.environ.get("CORNERSTONE_BATCH_WORKERS", "16"))
+BATCH_EXECUTOR = ThreadPoolExecutor(max_workers=BATCH_WORKERS, thread_name_prefix="batch-call")
+
+BATCH_TOOLS = {
+    tool.__name__: tool for tool in (
+        analyze_market_trends, get_product_recommendations, calculate_demand_forecast, size_order_quantities,
+        create_bid_window, get_bid_status, submit_bid, close_bid_window, notify_winners,
+        optimize_bids, get_job_details, list_manufacturers,
+        update_timeline, get_timeline_status, send_message_to_manufacturer,
+        plan_logistics, optimize_shipping_costs, track_shipments, record_tracking_event, coordinate_consolidation,
+    )
+}
+
+
+class BatchError(Exception):
+    """The batch request itself is malformed (as opposed to one of its calls failing)."""
+
+
+def _parse_calls(body):
+    calls = body.get("calls") if isinstance(body, dict) else None
+    if not isinstance(calls, list) or not calls:
+        raise BatchError("Expected a JSON body with a non-empty 'calls' list")
+    if len(calls) > MAX_BATCH_CALLS:
+        raise BatchError(f"Too many calls in one batch ({len(calls)} > {MAX_BATCH_CALLS})")
+
+    parsed = []
+    for index, call in enumerate(calls):
+        if not isinstance(call, dict) or call.get("tool") not in BATCH_TOOLS:
+            raise BatchError(f"Call {index}: unknown or missing 'tool' (one of: {', '.join(sorted(BATCH_TOOLS))})")
+        args = call.get("args") or {}
+        depends_on = call.get("depends_on") or []
+        if not isinstance(args, dict) or not isinstance(depends_on, list):
+            raise BatchError(f"Call {index}: 'args' must be an object and 'depends_on' a list")
+        parsed.append({"id": str(call.get("id", index)), "tool": call["tool"], "args": args, "depends_on": [str(d) for d in depends_on]})
+    return parsed
+
+
+def _call_step(call):
+    tool = BATCH_TOOLS[call["tool"]]
+
+    def run(results):
+        failed = [dep for dep in call["depends_on"] if results[dep]["status"] != "success"]
+        if failed:
+            return {"status": "skipped", "error_message": f"Depends on failed call(s): {', '.join(failed)}"}
+        try:
+            inspect.signature(tool).bind(**call["args"])
+        except TypeError as e:
+            return {"status": "error", "error_message": f"Invalid arguments for {call['tool']}: {e}"}
+        try:
+            result = tool(**call["args"])
+        except Exception as e:
+            return {"status": "error", "error_message": f"{type(e).__name__}: {e}"}
+        status = result.get("status", "success") if isinstance(result, dict) else "success"
+        return {"status": "success" if status == "success" else "error", "result": result}
+
+    return Step(call["id"], run, deps=call["depends_on"])
+
+
+def run_batch(body):
+    """
+    Executes a batch request body.
+
+    Returns:
+        dict: per-call results in request order (id, tool, status, result or error
+              message, start_ms, duration_ms), batch totals and the trace_id
+
+    Raises:
+        BatchError: If the body is malformed (unknown tool, duplicate id, bad dependency)
+    """
+    calls = _parse_calls(body)
+    with trace("batch", calls=len(calls)) as root:
+        try:
+            run = run_dag([_call_step(call) for call in calls], executor=BATCH_EXECUTOR)
+        except ValueError as e:   # Duplicate ids or unknown dependencies
+            raise BatchError(str(e))
+
+    results = []
+    for call in calls:
+        # Calls on a dependency cycle never become ready
+        outcome = run.results.get(call["id"]) or {"status": "skipped", "error_message": "Not run: dependency cycle"}
+        timing = run.timings[call["id"]]
+        results.append({
+            "id": call["id"],
+            "tool": call["tool"],
+            **outcome,
+            "start_ms": timing["start_ms"],
+            "duration_ms": timing["duration_ms"]
+        })
+    statuses = [item["status"] for item in results]
+    return {
+        "status": "success",
+        "results": results,
+        "succeeded": statuses.count("success"),
+        "failed": statuses.count("error"),
+        "skipped": statuses.count("skipped"),
+        "total_ms": round(run.total_ms, 2),
+        "serial_ms": round(sum(item["duration_ms"] for item in results), 2),
+        "trace_id": root.trace_id
+    }
@@ -0,0 +1,119 @@
+"""
+Gunicorn Configuration
+Production serving for the Flask app: preloaded master, forked workers, graceful drain
+
+    gunicorn -c backend/gunicorn.conf.py        (or ./start.sh prod)
+
+The master imports the app once (preload_app), so the mock data, the catalog and read-model
+indexes, the compiled intent routers and (unless CORNERSTONE_FAST_START=1) the ADK agent
+tree are loaded before fork and shared copy-on-write by every worker. Anything that owns
+threads, sockets or processes starts in each worker after fork: the ADK event loop and
+runner pool, the solver offload pool and the shared-state sync thread.
+
+With more than one worker, the tools' module-level state (bid windows, timelines, logistics
+plans, shipments) is kept consistent through the change journal of
+agent_runtime/shared_state.py. The master starts the journal empty.
+
+Each open SSE stream (/api/events, /api/workflow-jobs/<id>/events) holds one of a worker's
+request threads for as long as it stays open. Streams are therefore capped per worker at
+CORNERSTONE_MAX_STREAMS, by default half the threads, and a stream over the cap gets a 503
+with Retry-After. The other half of the threads stays free for ordinary requests. A client
+that disconnects keeps its slot until a heartbeat write fails, within about 30 seconds.
+Serving many open dashboards takes more threads per worker (or more workers): for example
+64 threads and a cap of 48 holds 48 streams per worker.
+
+On SIGTERM a worker stops accepting connections and ends its change-event streams, so
+their clients reconnect to another worker. It then lets in-flight requests finish and
+drains background workflow jobs. Anything still running after CORNERSTONE_GRACEFUL_TIMEOUT
+is killed.
+
+Environment:
+    CORNERSTONE_BIND              Address to listen on (default 0.0.0.0:5001)
+    CORNERSTONE_WEB_WORKERS       Worker processes (default: number of CPUs, at least 2)
+    CORNERSTONE_WEB_THREADS       Request threads per worker (default 8)
+    CORNERSTONE_GRACEFUL_TIMEOUT  Seconds a stopping worker gets to drain (default 60)
+    CORNERSTONE_WORKER_TIMEOUT    Seconds of silence before a worker is restarted (default 120)
+    CORNERSTONE_MAX_STREAMS       Open SSE streams per worker (default: half of CORNERSTONE_WEB_THREADS;
+                                  must stay below it)
+"""
+
+import gc
+import os
+import signal
+import tempfile
+
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+
+wsgi_app = "app:app"
+pythonpath = BACKEND_DIR
+bind = os.environ.get("CORNERSTONE_BIND", "0.0.0.0:5001")
+worker_class = "gthread"
+workers = int(os.environ.get("CORNERSTONE_WEB_WORKERS", str(max(2, os.cpu_count() or 1))))
+threads = int(os.environ.get("CORNERSTONE_WEB_THREADS", "8"))
+timeout = int(os.environ.get("CORNERSTONE_WORKER_TIMEOUT", "120"))
+graceful_timeout = int(os.environ.get("CORNERSTONE_GRACEFUL_TIMEOUT", "60"))
+keepalive = 5
+preload_app = True
+
+# Read by the app's modules at import, i.e. when the master preloads them
+if workers > 1:
+    os.environ.setdefault(
+        "CORNERSTONE_SHARED_STATE", os.path.join(tempfile.gettempdir(), f"cornerstone-state-{os.getpid()}.sqlite3")
+    )
+# Open event streams each hold a thread: leave the rest of them to ordinary requests
+os.environ.setdefault("CORNERSTONE_MAX_STREAMS", str(max(1, threads // 2)))
+if int(os.environ["CORNERSTONE_MAX_STREAMS"]) >= threads:
+    raise RuntimeError("CORNERSTONE_MAX_STREAMS must be below CORNERSTONE_WEB_THREADS, or streams can take every thread")
+# Every worker has its own solver pool: split the CPUs between them
+os.environ.setdefault("CORNERSTONE_OFFLOAD_WORKERS", str(max(1, (os.cpu_count() or 1) // workers)))
+
+
+def on_starting(server):
+    from agent_runtime.shared_state import SHARED_STATE
+    SHARED_STATE.reset()
+
+
+def when_ready(server):
+    import adk_runtime
+    adk_runtime.preload()
+    # Move everything loaded so far out of the collector's reach: collections in the workers
+    # would otherwise touch (and so un-share) the preloaded objects' pages
+    gc.freeze()
+
+
+def post_worker_init(worker):
+    import adk_runtime
+    from agent_runtime.events import CHANGE_BUS
+    from agent_runtime.offload import OFFLOAD_POOL
+    from agent_runtime.shared_state import SHARED_STATE
+
+    SHARED_STATE.start()
+    adk_runtime.start_at_boot()
+    OFFLOAD_POOL.start()
+
+    # Event streams never finish on their own; end them as soon as shutdown begins
+    handle_exit = worker.handle_exit
+
+    def begin_drain(sig, frame):
+        CHANGE_BUS.close()
+        handle_exit(sig, frame)
+
+    signal.signal(signal.SIGTERM, begin_drain)
+
+
+def worker_exit(server, worker):
+    import workflow_jobs
+    from agent_runtime.offload import OFFLOAD_POOL
+    from agent_runtime.shared_state import SHARED_STATE
+
+    unfinished = workflow_jobs.drain(graceful_timeout)
+    if unfinished:
+        worker.log.warning("%d workflow jobs still running at shutdown", unfinished)
+    OFFLOAD_POOL.shutdown()
+    SHARED_STATE.stop()
+
+
+def on_exit(server):
+    from agent_runtime.shared_state import SHARED_STATE
+    SHARED_STATE.discard()
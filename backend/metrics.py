@@ -0,0 +1,248 @@
+"""
+Request Metrics
+Per-endpoint latency histograms, in-flight gauges, status counters and response sizes
+
+install(app) instruments every Flask route through request hooks; routes served outside
+Flask (the native ASGI workflow route) use METRICS.track(). Series are labelled by route
+rule ('/api/bid-status/<job_id>'), not by raw path, so cardinality stays bounded.
+
+The hot path is a bisect into fixed buckets and a few integer increments under one lock.
+GET /metrics renders everything in the Prometheus text exposition format (0.0.4).
+"""
+
+import bisect
+import contextlib
+import threading
+import time
+
+from flask import Response, g, request
+
+
+# Latency buckets in seconds (upper bounds); multi-agent workflows can take tens of seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+# Response size buckets in bytes
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576)
+
+UNMATCHED_ROUTE = "<unmatched>"
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+class Histogram:
+    """Cumulative-bucket histogram with sum and count (not thread-safe; the registry locks)."""
+
+    __slots__ = ("bounds", "counts", "sum", "count")
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * (len(bounds) + 1)   # last slot is +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.bounds, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def quantile(self, q):
+        """Approximate quantile: upper bound of the bucket holding the q-th observation."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, count in zip(self.bounds, self.counts):
+            seen += count
+            if seen >= rank:
+                return bound
+        return float("inf")
+
+    def cumulative(self):
+        total = 0
+        for bound, count in zip(self.bounds + (float("inf"),), self.counts):
+            total += count
+            yield bound, total
+
+
+class MetricsRegistry:
+    """All request series, keyed by (method, route)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.started_at = time.time()
+        self.latency = {}     # (method, route) -> Histogram (seconds)
+        self.sizes = {}       # (method, route) -> Histogram (bytes)
+        self.responses = {}   # (method, route, status) -> count
+        self.in_flight = {}   # (method, route) -> gauge
+        self._collectors = []  # callables returning extra exposition lines
+
+    def start(self, method, route):
+        with self._lock:
+            key = (method, route)
+            self.in_flight[key] = self.in_flight.get(key, 0) + 1
+
+    def finish(self, method, route, status, seconds, size=None):
+        key = (method, route)
+        with self._lock:
+            self.in_flight[key] = self.in_flight.get(key, 1) - 1
+            latency = self.latency.get(key)
+            if latency is None:
+                latency = self.latency[key] = Histogram(LATENCY_BUCKETS)
+            latency.observe(seconds)
+            status_key = (method, route, status)
+            self.responses[status_key] = self.responses.get(status_key, 0) + 1
+            if size is not None:
+                sizes = self.sizes.get(key)
+                if sizes is None:
+                    sizes = self.sizes[key] = Histogram(SIZE_BUCKETS)
+                sizes.observe(size)
+
+    def add_collector(self, collector):
+        """Registers `collector()`, returning exposition lines, to be rendered with the request series."""
+        self._collectors.append(collector)
+        return collector
+
+    @contextlib.contextmanager
+    def track(self, method, route):
+        """
+        Measures one request served outside Flask. Set `.status` (and optionally `.size`)
+        on the yielded object; an exception counts as a 500.
+        """
+        outcome = _Outcome()
+        self.start(method, route)
+        started = time.perf_counter()
+        try:
+            yield outcome
+        except BaseException:
+            outcome.status = 500
+            raise
+        finally:
+            self.finish(method, route, outcome.status, time.perf_counter() - started, outcome.size)
+
+    def summary(self, top=5):
+        """Compact JSON view for /api/health: totals plus the slowest routes by p95."""
+        with self._lock:
+            requests = sum(self.responses.values())
+            errors = sum(count for (_, _, status), count in self.responses.items() if status >= 500)
+            slowest = sorted(
+                (
+                    {
+                        "route": f"{method} {route}",
+                        "requests": histogram.count,
+                        "mean_ms": round(histogram.sum / histogram.count * 1000, 1),
+                        # Beyond the largest bucket there is no upper bound to report
+                        "p95_ms": histogram.quantile(0.95) * 1000 if histogram.quantile(0.95) != float("inf") else None
+                    }
+                    for (method, route), histogram in self.latency.items() if histogram.count
+                ),
+                key=lambda item: item["p95_ms"] if item["p95_ms"] is not None else float("inf"), reverse=True
+            )[:top]
+            return {
+                "uptime_seconds": round(time.time() - self.started_at, 1),
+                "requests": requests,
+                "server_errors": errors,
+                "error_rate": round(errors / requests, 4) if requests else 0.0,
+                "in_flight": sum(self.in_flight.values()),
+                "slowest_routes": slowest
+            }
+
+    def render(self):
+        """All series in the Prometheus text exposition format."""
+        with self._lock:
+            lines = [
+                "# HELP cornerstone_process_start_time_seconds Start time of the process (unix epoch).",
+                "# TYPE cornerstone_process_start_time_seconds gauge",
+                f"cornerstone_process_start_time_seconds {self.started_at:.3f}",
+            ]
+            lines += _render_histograms(
+                "cornerstone_http_request_duration_seconds", "HTTP request latency by route.", self.latency
+            )
+            lines += _render_histograms(
+                "cornerstone_http_response_size_bytes", "HTTP response body size by route.", self.sizes
+            )
+            lines += [
+                "# HELP cornerstone_http_responses_total HTTP responses by route and status code.",
+                "# TYPE cornerstone_http_responses_total counter",
+            ]
+            for (method, route, status), count in sorted(self.responses.items()):
+                lines.append(f'cornerstone_http_responses_total{{{_labels(method, route)},status="{status}"}} {count}')
+            lines += [
+                "# HELP cornerstone_http_requests_in_flight Requests currently being served by route.",
+                "# TYPE cornerstone_http_requests_in_flight gauge",
+            ]
+            for (method, route), value in sorted(self.in_flight.items()):
+                lines.append(f"cornerstone_http_requests_in_flight{{{_labels(method, route)}}} {value}")
+        for collector in self._collectors:
+            lines += collector()
+        return "\n".join(lines) + "\n"
+
+
+class _Outcome:
+    __slots__ = ("status", "size")
+
+    def __init__(self):
+        self.status = 200
+        self.size = None
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(method, route):
+    return f'method="{method}",route="{_escape(route)}"'
+
+
+def _render_histograms(name, help_text, histograms):
+    lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+    for (method, route), histogram in sorted(histograms.items()):
+        labels = _labels(method, route)
+        for bound, total in histogram.cumulative():
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{name}_bucket{{{labels},le="{le}"}} {total}')
+        lines.append(f"{name}_sum{{{labels}}} {histogram.sum:.6f}")
+        lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+METRICS = MetricsRegistry()
+
+
+# ============================================================================
+# FLASK INTEGRATION
+# ============================================================================
+
+def _route():
+    return request.url_rule.rule if request.url_rule is not None else UNMATCHED_ROUTE
+
+
+def _before_request():
+    g.metrics_route = _route()
+    g.metrics_started = time.perf_counter()
+    METRICS.start(request.method, g.metrics_route)
+
+
+def _after_request(response):
+    g.metrics_status = response.status_code
+    # Streamed responses (SSE) have no length up front and are not sized
+    g.metrics_size = None if response.is_streamed else response.calculate_content_length()
+    return response
+
+
+def _teardown_request(exc):
+    started = g.pop("metrics_started", None)
+    if started is None:
+        return
+    status = 500 if exc is not None else g.pop("metrics_status", 500)
+    METRICS.finish(request.method, g.metrics_route, status, time.perf_counter() - started, g.pop("metrics_size", None))
+
+
+def metrics_endpoint():
+    """Prometheus scrape endpoint"""
+    return Response(METRICS.render(), content_type=CONTENT_TYPE)
+
+
+def install(app, path="/metrics"):
+    """Instruments every route of `app` and serves the metrics at `path`."""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.add_url_rule(path, "metrics", metrics_endpoint, methods=["GET"])
+    return app
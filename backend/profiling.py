@@ -0,0 +1,255 @@
+"""
+Request Profiling
+Opt-in cProfile (and tracemalloc) runs of individual requests, stored as reports on disk
+
+A request is profiled when either:
+- it carries `?profile=cpu|memory` or an `X-Profile: cpu|memory` header AND a valid
+  `X-Admin-Token` (CORNERSTONE_ADMIN_TOKEN); without a configured token, profiling on
+  demand is disabled, or
+- it is sampled: CORNERSTONE_PROFILE_SAMPLE_RATE (0.0-1.0, default 0) of all API requests
+  are profiled (CPU only).
+
+'memory' adds tracemalloc: the report lists the top allocation sites that grew during the
+request (tracemalloc is process-wide, so concurrent requests show up too). Each profile
+is saved to CORNERSTONE_PROFILE_DIR (default .cache/profiles) as <id>.pstats (load with
+pstats / snakeviz), <id>.txt (top functions and allocations) and <id>.json (metadata);
+only the newest CORNERSTONE_PROFILE_MAX_REPORTS are kept. Profiled responses carry an
+X-Profile-Id header. Reports are listed and downloaded through the admin endpoints below.
+
+A profile covers the request thread and the threads its work is handed to: workflow DAG
+steps (agent_runtime/workflow_dag.py) and the ADK runner loop (backend/adk_runtime.py), merged
+into one report that lists the profiled threads (see agent_runtime/thread_profiles.py). Other
+ADK runs sharing the loop at the same time appear in it too, and on Python 3.12+ so does
+every other thread in the process. Solver kernels run in the offload processes
+(agent_runtime/offload.py) are not profiled; their time shows up as waiting for the pool.
+
+cProfile allows one active profiler per process on recent Pythons, so only one request is
+profiled at a time; a request that asks while another is being profiled is served
+normally with `X-Profile-Id: busy`.
+"""
+
+import hmac
+import io
+import json
+import os
+import random
+import re
+import threading
+import time
+import tracemalloc
+import uuid
+
+from flask import Blueprint, g, jsonify, request, send_file
+
+from agent_runtime.thread_profiles import ThreadProfiles, activate, deactivate
+
+
+ADMIN_TOKEN = os.environ.get("CORNERSTONE_ADMIN_TOKEN", "")
+SAMPLE_RATE = float(os.environ.get("CORNERSTONE_PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.environ.get(
+    "CORNERSTONE_PROFILE_DIR",
+    os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache", "profiles")
+)
+MAX_REPORTS = int(os.environ.get("CORNERSTONE_PROFILE_MAX_REPORTS", "50"))
+
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+MODES = {"1": "cpu", "cpu": "cpu", "memory": "memory"}
+REPORT_KINDS = {"pstats": "application/octet-stream", "txt": "text/plain", "json": "application/json"}
+
+_PROFILER_LOCK = threading.Lock()
+_REPORT_ID_RE = re.compile(r"^[0-9]{8}T[0-9]{6}\.[0-9]{6}-[0-9a-f]{4}$")
+
+profiling_api = Blueprint("profiling", __name__)
+
+
+def admin_token_valid(supplied):
+    """Whether `supplied` is the configured admin token (never, when none is configured)."""
+    return bool(ADMIN_TOKEN) and hmac.compare_digest(supplied or "", ADMIN_TOKEN)
+
+
+def is_admin():
+    """Whether the request carries the configured admin token."""
+    return admin_token_valid(request.headers.get("X-Admin-Token", ""))
+
+
+def _requested_mode():
+    flag = request.args.get("profile") or request.headers.get("X-Profile")
+    if flag:
+        return MODES.get(flag.lower()) if is_admin() else None
+    if SAMPLE_RATE and request.path.startswith("/api/") and random.random() < SAMPLE_RATE:
+        return "cpu"
+    return None
+
+
+# ============================================================================
+# REQUEST HOOKS
+# ============================================================================
+
+def _before_request():
+    mode = _requested_mode()
+    if mode is None:
+        return
+    if not _PROFILER_LOCK.acquire(blocking=False):
+        g.profile_busy = True
+        return
+    g.profile_mode = mode
+    g.profile_sampled = not (request.args.get("profile") or request.headers.get("X-Profile"))
+    if mode == "memory":
+        g.profile_started_tracemalloc = not tracemalloc.is_tracing()
+        if g.profile_started_tracemalloc:
+            tracemalloc.start(10)
+        g.profile_snapshot = tracemalloc.take_snapshot()
+    g.profile_started = time.perf_counter()
+    g.profiles = ThreadProfiles()
+    g.profiler = g.profiles.enable()
+    if g.profiler is None:
+        # Something else (a debugger, coverage) already profiles this thread
+        _stop_profiling()
+        g.profile_busy = True
+        return
+    g.profile_token = activate(g.profiles)
+
+
+def _stop_profiling():
+    profiler = g.pop("profiler", None)
+    if profiler is not None:
+        profiler.disable()
+        deactivate(g.pop("profile_token"))
+    if g.get("profile_started_tracemalloc"):
+        tracemalloc.stop()
+    _PROFILER_LOCK.release()
+
+
+def _after_request(response):
+    if g.pop("profile_busy", False):
+        response.headers["X-Profile-Id"] = "busy"
+    profiler = g.pop("profiler", None)
+    if profiler is None:
+        return response
+    try:
+        profiler.disable()
+        deactivate(g.pop("profile_token"))
+        duration_ms = (time.perf_counter() - g.profile_started) * 1000
+        allocations = None
+        if g.profile_mode == "memory":
+            allocations = tracemalloc.take_snapshot().compare_to(g.profile_snapshot, "lineno")[:TOP_ALLOCATIONS]
+            if g.profile_started_tracemalloc:
+                tracemalloc.stop()
+        report_id = _save_report(g.profiles, allocations, {
+            "method": request.method,
+            "path": request.full_path.rstrip("?"),
+            "route": request.url_rule.rule if request.url_rule is not None else None,
+            "status": response.status_code,
+            "mode": g.profile_mode,
+            "sampled": g.profile_sampled,
+            "duration_ms": round(duration_ms, 2),
+            "threads": sorted(g.profiles.threads)
+        })
+        response.headers["X-Profile-Id"] = report_id
+    finally:
+        _PROFILER_LOCK.release()
+    return response
+
+
+def _teardown_request(exc):
+    # The view raised before after_request could stop the profiler
+    if g.get("profiler") is not None:
+        _stop_profiling()
+
+
+# ============================================================================
+# REPORT STORAGE
+# ============================================================================
+
+def _save_report(profiles, allocations, metadata):
+    # Sortable by creation time (to the microsecond), which is what pruning relies on
+    now = time.time()
+    report_id = f"{time.strftime('%Y%m%dT%H%M%S', time.localtime(now))}.{int(now % 1 * 1e6):06d}-{uuid.uuid4().hex[:4]}"
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    base = os.path.join(PROFILE_DIR, report_id)
+
+    profiles.stats().dump_stats(f"{base}.pstats")
+    text = io.StringIO()
+    text.write(f"{metadata['method']} {metadata['path']} -> {metadata['status']} in {metadata['duration_ms']} ms\n")
+    text.write(f"Profiled threads: {', '.join(metadata['threads'])} (solver offload processes are not profiled)\n\n")
+    profiles.stats(stream=text).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    if allocations is not None:
+        text.write(f"\nTop {TOP_ALLOCATIONS} allocation sites by growth during the request:\n")
+        for stat in allocations:
+            text.write(f"{stat}\n")
+    with open(f"{base}.txt", "w") as f:
+        f.write(text.getvalue())
+
+    metadata = {"id": report_id, "created_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(now)), **metadata}
+    with open(f"{base}.json", "w") as f:
+        json.dump(metadata, f, indent=2)
+    _prune()
+    return report_id
+
+
+def _prune():
+    report_ids = sorted(name[:-5] for name in os.listdir(PROFILE_DIR) if name.endswith(".json"))
+    for report_id in report_ids[:-max(MAX_REPORTS, 1)]:
+        for kind in REPORT_KINDS:
+            try:
+                os.remove(os.path.join(PROFILE_DIR, f"{report_id}.{kind}"))
+            except FileNotFoundError:
+                pass
+
+
+def list_reports():
+    """Metadata of the stored reports, newest first."""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    reports = []
+    for name in sorted(os.listdir(PROFILE_DIR), reverse=True):
+        if name.endswith(".json"):
+            try:
+                with open(os.path.join(PROFILE_DIR, name)) as f:
+                    reports.append(json.load(f))
+            except (OSError, ValueError):
+                continue
+    return reports
+
+
+# ============================================================================
+# ADMIN ENDPOINTS
+# ============================================================================
+
+def _forbidden():
+    return jsonify({'status': 'error', 'error_message': 'Admin token required (X-Admin-Token)'}), 403
+
+
+@profiling_api.route('/api/admin/profiles', methods=['GET'])
+def api_list_profiles():
+    """Stored request profiles (admin only)"""
+    if not is_admin():
+        return _forbidden()
+    return jsonify({
+        'status': 'success',
+        'sample_rate': SAMPLE_RATE,
+        'max_reports': MAX_REPORTS,
+        'profiles': list_reports()
+    })
+
+
+@profiling_api.route('/api/admin/profiles/<report_id>/<kind>', methods=['GET'])
+def api_download_profile(report_id, kind):
+    """Download one report file: pstats, txt or json (admin only)"""
+    if not is_admin():
+        return _forbidden()
+    path = os.path.join(PROFILE_DIR, f"{report_id}.{kind}")
+    if kind not in REPORT_KINDS or not _REPORT_ID_RE.match(report_id) or not os.path.exists(path):
+        return jsonify({'status': 'error', 'error_message': f'Profile {report_id}.{kind} not found'}), 404
+    return send_file(path, mimetype=REPORT_KINDS[kind], as_attachment=kind == "pstats",
+                     download_name=f"{report_id}.{kind}")
+
+
+def install(app):
+    """Enables request profiling on `app` and registers the admin endpoints."""
+    app.before_request(_before_request)
+    app.after_request(_after_request)
+    app.teardown_request(_teardown_request)
+    app.register_blueprint(profiling_api)
+    return app
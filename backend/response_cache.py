@@ -0,0 +1,106 @@
+"""
+Response Cache
+Pre-serialized, pre-compressed responses for read-mostly GET routes, with ETags and 304s
+
+@cached_response(domains=...) wraps a Flask view. The first request for a given route,
+view arguments and query string runs the view. Its JSON body is stored as bytes, along
+with a gzip copy and a strong ETag (a hash of the body). Later requests are served from
+those bytes until a data-version bump on one of the route's domains clears the route's
+entries. A request whose If-None-Match already holds the ETag gets an empty 304.
+
+Responses carry `Cache-Control: no-cache`, so browsers keep the body but revalidate every
+time. The gzip variant has its own ETag ("<hash>-gz"), as strong validators must.
+"""
+
+import functools
+import gzip
+import hashlib
+
+from flask import Response, current_app, request
+
+from agent_runtime.cache import TTLCache
+from agent_runtime.data_versions import version_snapshot, on_version_bump
+
+
+MAX_ENTRIES_PER_ROUTE = 256
+TTL_SECONDS = 3600.0
+MIN_COMPRESS_BYTES = 512    # Smaller bodies are not worth a Content-Encoding
+GZIP_LEVEL = 6
+
+RESPONSE_CACHES = {}        # view name -> TTLCache of CachedResponse
+
+
+class CachedResponse:
+    """One stored response: body bytes, optional gzip bytes and their ETags."""
+
+    __slots__ = ("body", "gzipped", "etag", "status", "mimetype")
+
+    def __init__(self, body, status, mimetype):
+        self.body = body
+        self.status = status
+        self.mimetype = mimetype
+        self.etag = hashlib.sha256(body).hexdigest()[:32]
+        self.gzipped = gzip.compress(body, GZIP_LEVEL) if len(body) >= MIN_COMPRESS_BYTES else None
+
+    def to_response(self):
+        # Same route, same ETag: a conditional request needs no body at all
+        use_gzip = self.gzipped is not None and "gzip" in request.accept_encodings
+        etag = f"{self.etag}-gz" if use_gzip else self.etag
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(self.gzipped if use_gzip else self.body, status=self.status, mimetype=self.mimetype)
+            if use_gzip:
+                response.headers["Content-Encoding"] = "gzip"
+        response.set_etag(etag)
+        response.headers["Cache-Control"] = "no-cache"
+        if self.gzipped is not None:
+            response.vary.add("Accept-Encoding")
+        return response
+
+
+def cached_response(domains=(), before=None):
+    """
+    Decorator caching a GET view's serialized response per (view arguments, query string,
+    data versions of `domains`).
+
+    Args:
+        domains: Data domains the view reads; a version bump on any of them invalidates
+        before: Optional callable run before each lookup (e.g. to pull in fresh data,
+                which may itself bump a domain version)
+    """
+    watched = set(domains)
+
+    def decorator(view):
+        cache = RESPONSE_CACHES[view.__name__] = TTLCache(
+            max_entries=MAX_ENTRIES_PER_ROUTE, ttl_seconds=TTL_SECONDS, name=f"response:{view.__name__}"
+        )
+
+        @on_version_bump
+        def _invalidate(domain):
+            if domain in watched:
+                cache.clear()
+
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            if before is not None:
+                before()
+            key = (tuple(sorted(kwargs.items())), tuple(sorted(request.args.items(multi=True))), version_snapshot(domains))
+            entry = cache.get(key)
+            if entry is None:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.direct_passthrough:
+                    return response
+                entry = CachedResponse(response.get_data(), response.status_code, response.mimetype)
+                cache.set(key, entry)
+            return entry.to_response()
+
+        wrapper.cache = cache
+        return wrapper
+
+    return decorator
+
+
+def get_response_cache_stats():
+    """Hit/miss counters of every route's response cache."""
+    return [cache.stats() for cache in RESPONSE_CACHES.values()]
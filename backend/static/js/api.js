@@ -65,6 +65,15 @@ async function getBidStatus(jobId) {
     return await apiRequest(`/bid-status/${jobId}`, 'GET');
 }
 
+async function placeBid(jobId, makerId, pricePerUnit, quantity) {
+    return await apiRequest('/submit-bid', 'POST', {
+        job_id: jobId,
+        maker_id: makerId,
+        price_per_unit: pricePerUnit,
+        quantity: quantity
+    });
+}
+
 async function closeBidWindow(jobId) {
     return await apiRequest('/close-bid', 'POST', { job_id: jobId });
 }
@@ -138,10 +147,83 @@ async function trackShipments(jobId) {
     return await apiRequest(`/track-shipments/${jobId}`, 'GET');
 }
 
+async function recordTrackingEvent(jobId, makerId, status, location = '') {
+    return await apiRequest('/tracking-events', 'POST', {
+        job_id: jobId,
+        maker_id: makerId,
+        status: status,
+        location: location
+    });
+}
+
 async function coordinateConsolidation(jobId) {
     return await apiRequest('/coordinate-consolidation', 'POST', { job_id: jobId });
 }
 
+// ============================================================================
+// DASHBOARD
+// ============================================================================
+
+async function getDashboard(jobId = '') {
+    /**
+     * Dashboard summaries from the read model: one job's summary when jobId is given,
+     * otherwise every job plus totals (open bids, delays, shipments, shipping cost)
+     */
+    return await apiRequest(jobId ? `/dashboard/${jobId}` : '/dashboard', 'GET');
+}
+
+function subscribeToChanges(jobIds, onChange, topics = []) {
+    /**
+     * Live bid, timeline and tracking changes for the given jobs (Server-Sent Events)
+     * onChange(type, event) fires with type e.g. 'bid.submitted' and event {job_id, data, ...};
+     * 'resync' means changes were missed: reload getDashboard()
+     */
+    const params = new URLSearchParams();
+    if (jobIds.length) params.set('job_id', jobIds.join(','));
+    if (topics.length) params.set('topics', topics.join(','));
+    const source = new EventSource(`${API_BASE_URL}/events?${params}`);
+    ['bid.opened', 'bid.submitted', 'bid.closed', 'bid.winners', 'timeline.updated', 'tracking.updated'].forEach(type => {
+        source.addEventListener(type, (e) => onChange(type, JSON.parse(e.data)));
+    });
+    source.addEventListener('resync', () => onChange('resync', null));
+    // After 'dropped' the server ends the stream; EventSource reconnects with Last-Event-ID
+    return source;
+}
+
+// ============================================================================
+// BATCH
+// ============================================================================
+
+async function batchRequest(calls) {
+    /**
+     * Run several tool calls in one round trip
+     * calls: [{id, tool, args, depends_on}] - calls without depends_on run concurrently
+     * Returns the batch response; results are in request order, each with its own status
+     */
+    return await apiRequest('/batch', 'POST', { calls });
+}
+
+async function loadDashboardData(jobId) {
+    /**
+     * Everything the dashboard shows for a job, fetched in a single request
+     * Returns {bids, timeline, tracking, manufacturers} keyed tool results
+     */
+    const batch = await batchRequest([
+        { id: 'bids', tool: 'get_bid_status', args: { job_id: jobId } },
+        { id: 'timeline', tool: 'get_timeline_status' },
+        { id: 'tracking', tool: 'track_shipments', args: { job_id: jobId } },
+        { id: 'manufacturers', tool: 'list_manufacturers' }
+    ]);
+    if (batch.status !== 'success') {
+        return batch;
+    }
+    const data = {};
+    batch.results.forEach(item => {
+        data[item.id] = item.result || { status: item.status, error_message: item.error_message };
+    });
+    return data;
+}
+
 // ============================================================================
 // ORCHESTRATED WORKFLOWS
 // ============================================================================
@@ -162,6 +244,34 @@ async function executeCompleteWorkflowADK() {
     return await apiRequest('/complete-workflow-adk', 'POST', {});
 }
 
+async function submitWorkflowJob() {
+    /**
+     * Start the Flask-orchestrated workflow as a background job
+     * Returns immediately with job_id and an events_url to stream progress from
+     */
+    return await apiRequest('/workflow-jobs', 'POST', {});
+}
+
+function streamWorkflowJob(jobId, onStep, onComplete, onError) {
+    /**
+     * Subscribe to a workflow job's Server-Sent Events
+     * onStep(stepName, result) fires as each step finishes
+     */
+    const source = new EventSource(`${API_BASE_URL}/workflow-jobs/${jobId}/events`);
+    ['step_1_demand', 'step_2_bid', 'step_3_optimization', 'step_4_logistics'].forEach(step => {
+        source.addEventListener(step, (e) => onStep && onStep(step, JSON.parse(e.data)));
+    });
+    source.addEventListener('complete', (e) => {
+        source.close();
+        onComplete && onComplete(JSON.parse(e.data));
+    });
+    source.addEventListener('error', (e) => {
+        source.close();
+        onError && onError(e.data ? JSON.parse(e.data) : { error_message: 'Connection lost' });
+    });
+    return source;
+}
+
 // ============================================================================
 // HELPER FUNCTIONS FOR UI
 // ============================================================================
@@ -0,0 +1,210 @@
+"""
+Background Workflow Jobs
+Runs the Flask workflow on a bounded worker pool and streams step results over SSE
+
+Submitting a job returns immediately with a job id. Each finished step is appended to the
+job's event log; Server-Sent Events clients replay the log from the start (or from their
+Last-Event-ID) and then wait for new events until the job finishes.
+
+A job runs in the server worker that accepted it, but its record (status, event log,
+result) lives in WORKFLOW_JOBS, which is kept consistent across workers by the shared-state
+journal (agent_runtime/shared_state.py). Any worker can answer a status poll or stream a
+job's events; a worker that did not run the job sees each change within
+CORNERSTONE_SHARED_STATE_SYNC seconds. The queue limit and drain on shutdown are per worker.
+"""
+
+import json
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from agent_runtime.shared_state import SHARED_STATE, register_shared, commit_change
+from workflows import run_flask_workflow
+
+
+WORKFLOW_WORKERS = int(os.environ.get("CORNERSTONE_WORKFLOW_WORKERS", "4"))
+MAX_PENDING_JOBS = int(os.environ.get("CORNERSTONE_WORKFLOW_MAX_PENDING", "64"))
+MAX_RETAINED_JOBS = 500          # Finished jobs kept for status queries and late subscribers
+SSE_HEARTBEAT_SECONDS = 15.0
+
+
+class JobQueueFull(Exception):
+    """Raised when too many workflow jobs are already queued or running."""
+
+
+# job_id -> {"job_id", "status", "created_at", "finished_at", "events": [[event_name, payload], ...],
+# "result", "error_message"}, in submission order. A forgotten job is journaled as None.
+WORKFLOW_JOBS = {}
+_job_changes = threading.Condition()
+
+
+def _job_changed(job_id, record):
+    # Runs for this worker's own changes and for those replayed from other workers
+    if record is None:
+        WORKFLOW_JOBS.pop(job_id, None)
+    with _job_changes:
+        _job_changes.notify_all()
+
+
+register_shared("workflow_jobs", WORKFLOW_JOBS, "workflow_jobs", _job_changed)
+
+
+def _now():
+    return datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+
+def _record(job_id, event=None, **fields):
+    """Applies a change to a job's record (and appends `event` to its log), then journals it."""
+    with SHARED_STATE.mutation():
+        record = WORKFLOW_JOBS[job_id]
+        record.update(fields)
+        if event is not None:
+            record["events"].append(list(event))
+        commit_change("workflow_jobs", job_id)
+
+
+class WorkflowJob:
+    """A view of one background workflow run's shared record, from any worker."""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+
+    @property
+    def record(self):
+        return WORKFLOW_JOBS.get(self.job_id) or {}
+
+    @property
+    def status(self):
+        return self.record.get("status")
+
+    @property
+    def done(self):
+        # A job forgotten under the retention limit has nothing more to report
+        return self.status in ("SUCCEEDED", "FAILED", None)
+
+    @property
+    def events(self):
+        return [tuple(event) for event in self.record.get("events", ())]
+
+    def wait_for_events(self, after, timeout):
+        """Blocks until there are more than `after` events, the job ends, or timeout."""
+        with _job_changes:
+            _job_changes.wait_for(lambda: len(self.record.get("events", ())) > after or self.done, timeout)
+            return self.events[after:]
+
+    def snapshot(self):
+        record = self.record
+        return {
+            "job_id": self.job_id,
+            "status": record.get("status"),
+            "created_at": record.get("created_at"),
+            "finished_at": record.get("finished_at"),
+            "steps_completed": [{"step": name, "result": payload} for name, payload in self.events if name.startswith("step_")],
+            "result": record.get("result"),
+            "error_message": record.get("error_message")
+        }
+
+
+_executor = ThreadPoolExecutor(max_workers=WORKFLOW_WORKERS, thread_name_prefix="workflow-job")
+_jobs_lock = threading.Lock()
+_pending = 0
+_running = set()                 # Ids of the jobs queued or running in this worker
+_draining = False
+
+
+def _run_job(job_id):
+    global _pending
+    try:
+        _record(job_id, event=("started", {"job_id": job_id}), status="RUNNING")
+        try:
+            result = run_flask_workflow(on_step=lambda name, payload: _record(job_id, event=(name, payload)))
+            _record(job_id, event=("complete", result), status="SUCCEEDED", result=result, finished_at=_now())
+        except Exception as e:
+            _record(job_id, event=("error", {"error_message": str(e)}), status="FAILED",
+                    error_message=str(e), finished_at=_now())
+    finally:
+        with _jobs_lock:
+            _pending -= 1
+            _running.discard(job_id)
+        with _job_changes:
+            _job_changes.notify_all()
+
+
+def _forget_old_jobs():
+    # Forget the oldest finished jobs once over the retention limit (inside a mutation)
+    while len(WORKFLOW_JOBS) > MAX_RETAINED_JOBS:
+        oldest_id = next(iter(WORKFLOW_JOBS))
+        if not WorkflowJob(oldest_id).done:
+            break
+        WORKFLOW_JOBS[oldest_id] = None
+        commit_change("workflow_jobs", oldest_id)
+
+
+def submit_workflow_job():
+    """Queues a new workflow run. Raises JobQueueFull when the pool is saturated."""
+    global _pending
+    job_id = f"WF_{uuid.uuid4().hex[:12]}"
+    with _jobs_lock:
+        if _draining:
+            raise JobQueueFull("This server worker is shutting down; try again shortly.")
+        if _pending >= MAX_PENDING_JOBS:
+            raise JobQueueFull(f"{_pending} workflow jobs already queued or running; try again shortly.")
+        _pending += 1
+        _running.add(job_id)
+    with SHARED_STATE.mutation():
+        WORKFLOW_JOBS[job_id] = {
+            "job_id": job_id,
+            "status": "QUEUED",
+            "created_at": _now(),
+            "finished_at": None,
+            "events": [],
+            "result": None,
+            "error_message": None
+        }
+        commit_change("workflow_jobs", job_id)
+        _forget_old_jobs()
+    _executor.submit(_run_job, job_id)
+    return WorkflowJob(job_id)
+
+
+def drain(timeout):
+    """
+    Stops accepting jobs and waits up to `timeout` seconds for the ones queued or running in
+    this worker to finish (used when a server worker shuts down). Returns the number left unfinished.
+    """
+    global _draining
+    with _jobs_lock:
+        _draining = True
+    with _job_changes:
+        _job_changes.wait_for(lambda: not _running, timeout)
+    _executor.shutdown(wait=False, cancel_futures=True)
+    with _jobs_lock:
+        return len(_running)
+
+
+def get_workflow_job(job_id):
+    """Returns the job with this id (run by any worker), or None."""
+    return WorkflowJob(job_id) if WORKFLOW_JOBS.get(job_id) else None
+
+
+def stream_job_events(job, last_event_id=None):
+    """
+    Generator of Server-Sent Events for a job: replays past events after `last_event_id`,
+    then yields new ones as steps finish, with periodic heartbeats, until the job ends.
+    """
+    sent = int(last_event_id) + 1 if last_event_id and last_event_id.isdigit() else 0
+    yield "retry: 3000\n\n"
+    while True:
+        events = job.wait_for_events(sent, SSE_HEARTBEAT_SECONDS)
+        if not events:
+            if job.done and sent >= len(job.events):
+                return
+            yield ": heartbeat\n\n"
+            continue
+        for name, payload in events:
+            yield f"id: {sent}\nevent: {name}\ndata: {json.dumps(payload)}\n\n"
+            sent += 1
+            if name in ("complete", "error"):
+                return
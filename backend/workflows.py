@@ -0,0 +1,238 @@
+"""
+Flask Workflow Orchestration
+Demand → Bid → Close → Optimize → Logistics, as a DAG with independent steps run concurrently
+
+Alongside the main chain, context that does not depend on it (demand leaders per category,
+manufacturer listing, timeline status) runs in parallel from the start, and the shipping
+what-if analysis runs as soon as the logistics plan exists.
+
+Shared by the synchronous /api/complete-workflow-flask route and background workflow jobs.
+"""
+
+import os
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from agent_runtime.tracing import trace
+from agent_runtime.workflow_dag import Step, run_dag
+from demand_agent.agent import analyze_market_trends, size_order_quantities
+from demand_agent.catalog import CATALOG
+from bid_coordinator_agent.agent import create_bid_window, close_bid_window
+from cornerstone_agent.agent import optimize_bids, list_manufacturers
+from timeline_agent.agent import get_timeline_status
+from logistics_agent.agent import plan_logistics, optimize_shipping_costs
+
+
+STEP_WORKERS = int(os.environ.get("CORNERSTONE_WORKFLOW_STEP_WORKERS", "8"))
+STEP_EXECUTOR = ThreadPoolExecutor(max_workers=STEP_WORKERS, thread_name_prefix="workflow-step")
+
+
+class WorkflowError(Exception):
+    """A workflow step returned an error status."""
+
+
+def _require(result, message):
+    if result['status'] != 'success':
+        raise WorkflowError(message)
+    return result
+
+
+# ============================================================================
+# MAIN CHAIN
+# ============================================================================
+
+def _demand(results):
+    return _require(analyze_market_trends(''), 'Demand analysis failed')
+
+
+def _sizing(results):
+    top_product = results['demand']['report']['trending_products'][0]
+    # Size the order from simulated demand rather than the raw volume estimate
+    sizing_result = size_order_quantities(product_ids=top_product['product_id'], required_skill='CNC')
+    if sizing_result['status'] == 'success' and sizing_result['report']['recommendations'][0]['recommended_qty'] > 0:
+        return sizing_result['report']['recommendations'][0]['recommended_qty']
+    return top_product['estimated_volume']
+
+
+def _create_bid(run_id):
+    def step(results):
+        top_product = results['demand']['report']['trending_products'][0]
+        # One bid window per run (as on the ADK path), so repeated runs don't collide
+        return _require(create_bid_window(
+            job_id=f"JOB_{top_product['product_id']}_{run_id}",
+            product_name=top_product['name'],
+            required_qty=results['sizing'],
+            required_skill='CNC',
+            duration_hours=96
+        ), 'Bid creation failed')
+    return step
+
+
+def _close_bid(results):
+    # Close bid (simulate)
+    return close_bid_window(results['create_bid']['report']['job_id'])
+
+
+def _optimize(results):
+    return _require(optimize_bids(
+        job_id=results['create_bid']['report']['job_id'],
+        required_qty=results['sizing'],
+        required_skill='CNC'
+    ), 'Optimization failed')
+
+
+def _logistics(results):
+    winning_makers = ','.join([m['maker_id'] for m in results['optimize']['report']['winning_makers']])
+    return plan_logistics(results['create_bid']['report']['job_id'], winning_makers)
+
+
+# ============================================================================
+# INDEPENDENT CONTEXT
+# ============================================================================
+
+def _category_demand(category):
+    def step(results):
+        return analyze_market_trends(category, 1)
+    return step
+
+
+def _category_leaders(results):
+    leaders = {}
+    for name, result in results.items():
+        if name.startswith('demand:') and result['status'] == 'success' and result['report']['recommendation']:
+            top = result['report']['recommendation']
+            leaders[name.split(':', 1)[1]] = {'product': top['name'], 'demand_score': top['demand_score']}
+    return leaders
+
+
+def _manufacturers(results):
+    return list_manufacturers('CNC')
+
+
+def _timeline(results):
+    return get_timeline_status()
+
+
+def _shipping_what_if(results):
+    return optimize_shipping_costs(results['create_bid']['report']['job_id'])
+
+
+def build_workflow_steps(run_id):
+    """The workflow DAG for run `run_id`, with one demand-analysis step per catalog category."""
+    category_steps = [Step(f'demand:{c}', _category_demand(c)) for c in CATALOG.categories()]
+    return [
+        Step('demand', _demand),
+        Step('sizing', _sizing, deps=['demand']),
+        Step('create_bid', _create_bid(run_id), deps=['sizing']),
+        Step('close_bid', _close_bid, deps=['create_bid']),
+        Step('optimize', _optimize, deps=['close_bid']),
+        Step('logistics', _logistics, deps=['optimize']),
+        Step('shipping_what_if', _shipping_what_if, deps=['logistics']),
+        *category_steps,
+        Step('category_leaders', _category_leaders, deps=[s.name for s in category_steps]),
+        Step('manufacturers', _manufacturers),
+        Step('timeline', _timeline),
+    ]
+
+
+# ============================================================================
+# REPORTED STEPS
+# ============================================================================
+
+def _step_1(results):
+    top_product = results['demand']['report']['trending_products'][0]
+    return {
+        'product': top_product['name'],
+        'demand_score': top_product['demand_score'],
+        'estimated_volume': top_product['estimated_volume'],
+        'order_qty': results['sizing']
+    }
+
+
+def _step_2(results):
+    closed = results['close_bid']
+    return {
+        'job_id': results['create_bid']['report']['job_id'],
+        'status': 'CLOSED',
+        'total_bids': closed['report']['total_bids_received'] if closed['status'] == 'success' else 0
+    }
+
+
+def _step_3(results):
+    report = results['optimize']['report']
+    return {
+        'total_cost': report['total_cost'],
+        'manufacturers': len(report['winning_makers']),
+        'lead_time': report['total_lead_time_days']
+    }
+
+
+def _step_4(results):
+    report = results['logistics']['report']
+    return {
+        'consolidation_center': report['consolidation_center'],
+        'shipping_cost': f"${report['estimated_shipping_cost']:.2f}",
+        'delivery_date': report['final_delivery_date']
+    }
+
+
+# DAG step whose completion completes each reported workflow step
+REPORTED_STEPS = {
+    'sizing': ('step_1_demand', _step_1),
+    'close_bid': ('step_2_bid', _step_2),
+    'optimize': ('step_3_optimization', _step_3),
+    'logistics': ('step_4_logistics', _step_4),
+}
+
+
+def _context(results):
+    manufacturers = results['manufacturers']
+    timeline = results['timeline']
+    shipping = results['shipping_what_if']
+    return {
+        'category_leaders': results['category_leaders'],
+        'cnc_manufacturers_available': manufacturers['report']['total_manufacturers'] if manufacturers['status'] == 'success' else 0,
+        'delayed_manufacturers': timeline['report'].get('delayed_manufacturers', 0) if timeline['status'] == 'success' else 0,
+        'recommended_shipping': shipping['report']['recommended_method'] if shipping['status'] == 'success' else None
+    }
+
+
+def run_flask_workflow(on_step=None):
+    """
+    Runs the complete manufacturing workflow DAG.
+
+    Args:
+        on_step: Optional callable(step_name, step_result) invoked as each reported step finishes
+
+    Returns:
+        dict: The compiled workflow result, including a per-step timing breakdown and the
+              trace_id of the run's tool spans (see /api/traces/<trace_id>)
+
+    Raises:
+        WorkflowError: If a required step fails
+    """
+    def report(step_name, results):
+        if on_step is not None and step_name in REPORTED_STEPS:
+            name, build = REPORTED_STEPS[step_name]
+            on_step(name, build(results))
+
+    with trace("complete-workflow-flask") as root:
+        run = run_dag(build_workflow_steps(uuid.uuid4().hex[:6].upper()), executor=STEP_EXECUTOR, on_step=report)
+    results = run.results
+    top_product = results['demand']['report']['trending_products'][0]
+
+    # Compile complete workflow result
+    return {
+        'status': 'success',
+        'orchestration_method': 'flask',
+        'workflow': {
+            'step_1_demand': _step_1(results),
+            'step_2_bid': _step_2(results),
+            'step_3_optimization': _step_3(results),
+            'step_4_logistics': _step_4(results),
+            'context': _context(results),
+            'summary': f"Complete workflow executed via Flask: {top_product['name']} manufacturing planned. Total cost: {results['optimize']['report']['total_cost']}, Delivery: {results['logistics']['report']['final_delivery_date']}"
+        },
+        'timings': run.timing_report(),
+        'trace_id': root.trace_id
+    }
@@ -0,0 +1,90 @@
+"""
+ADK Workflow Benchmark
+Measures Master Orchestrator throughput and latency offline, using the local scripted model
+
+Runs the complete ADK workflow through the same warm runner pool that serves
+/api/complete-workflow-adk, with every Gemini call replaced by a ScriptedLlm step of fixed
+(optionally jittered, seeded) latency. Each run reports wall time split into simulated
+model time, tool time and the remainder (orchestration overhead).
+
+Usage:
+    python benchmarks/bench_adk_workflow.py --runs 50 --concurrency 8 --latency-ms 300
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+async def _run_all(adk_runtime, runs, concurrency):
+    gate = asyncio.Semaphore(concurrency)
+    results = []
+
+    async def one():
+        async with gate:
+            started = time.perf_counter()
+            result = await adk_runtime.run_workflow_async()
+            results.append(((time.perf_counter() - started) * 1000, result))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one() for _ in range(runs)))
+    return results, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=200.0, help="Simulated latency per model step")
+    parser.add_argument("--jitter-ms", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--pool-size", type=int, default=None, help="ADK runner pool size (default: concurrency)")
+    args = parser.parse_args()
+
+    # Must be set before the agents are imported
+    os.environ["CORNERSTONE_LLM_BACKEND"] = "local"
+    os.environ["CORNERSTONE_LOCAL_LLM_LATENCY_MS"] = str(args.latency_ms)
+    os.environ["CORNERSTONE_LOCAL_LLM_JITTER_MS"] = str(args.jitter_ms)
+    os.environ["CORNERSTONE_LOCAL_LLM_SEED"] = str(args.seed)
+
+    import adk_runtime
+    from agent_runtime.local_model import LOCAL_MODEL_STATS
+
+    adk_runtime.start(args.pool_size or args.concurrency)
+    LOCAL_MODEL_STATS.reset()
+    results, elapsed = asyncio.run(_run_all(adk_runtime, args.runs, args.concurrency))
+
+    walls = [wall for wall, _ in results]
+    tool_ms = [result["run_stats"]["tool_ms"] for _, result in results]
+    model = LOCAL_MODEL_STATS.snapshot()
+    model_ms_per_run = model["simulated_latency_ms"] / args.runs
+    completed = sum(1 for _, result in results if result["workflow_state"] and result["workflow_state"]["plan_id"])
+
+    print("=" * 60)
+    print(f"ADK WORKFLOW BENCHMARK  runs={args.runs} concurrency={args.concurrency} "
+          f"model_latency={args.latency_ms:.0f}±{args.jitter_ms:.0f}ms")
+    print("=" * 60)
+    print(f"Throughput:         {args.runs / elapsed:.2f} workflows/s ({elapsed:.2f}s total)")
+    print(f"Latency p50/p95/max: {_percentile(walls, 50):.0f} / {_percentile(walls, 95):.0f} / {max(walls):.0f} ms")
+    print(f"Completed plans:    {completed}/{args.runs}")
+    print(f"Model calls/run:    {model['model_calls'] / args.runs:.1f} "
+          f"(~{model['estimated_prompt_tokens'] / args.runs:,.0f} prompt tokens)")
+    print(f"Per run (mean):     model {model_ms_per_run:.0f} ms, tools {statistics.mean(tool_ms):.1f} ms, "
+          f"overhead {statistics.mean(walls) - model_ms_per_run - statistics.mean(tool_ms):.0f} ms")
+    print(f"Runner pool:        {adk_runtime.get_pool_stats()}")
+
+
+if __name__ == "__main__":
+    main()
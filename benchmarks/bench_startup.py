@@ -0,0 +1,83 @@
+"""
+Startup Benchmark
+Measures backend cold-start time in fresh interpreter processes
+
+Each run starts a new Python process and times, with the local scripted model so no
+credentials are needed:
+- import:    `import app` (what every worker pays at boot; ADK is not loaded)
+- eager:     import plus building the whole agent tree, i.e. the cost of loading ADK at
+             boot, as the backend did before agents were built lazily
+- first ADK: starting the ADK runtime (pool of --pool-size runners) after import, i.e.
+             what the first /api/complete-workflow-adk request pays in a fast-start worker
+
+Usage:
+    python benchmarks/bench_startup.py --runs 10
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(ROOT, "backend")
+
+_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+adk_after_import = any(name.startswith("google.adk") for name in sys.modules)
+if sys.argv[1] == "eager":
+    from master_orchestrator_agent.agent import root_agent
+elif sys.argv[1] == "first-adk":
+    import adk_runtime
+    adk_runtime.start(int(sys.argv[2]))
+finished = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "extra_ms": (finished - imported) * 1000,
+    "adk_after_import": adk_after_import,
+    "modules": len(sys.modules)
+}))
+"""
+
+
+def _probe(mode, pool_size):
+    env = dict(os.environ, CORNERSTONE_LLM_BACKEND="local", CORNERSTONE_CACHE_DIR="off")
+    output = subprocess.run(
+        [sys.executable, "-c", _PROBE, mode, str(pool_size)],
+        cwd=BACKEND, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def _describe(values):
+    return f"median {statistics.median(values):7.0f} ms   min {min(values):7.0f} ms"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--pool-size", type=int, default=4, help="Runner pool size for the first ADK request")
+    args = parser.parse_args()
+
+    samples = {mode: [_probe(mode, args.pool_size) for _ in range(args.runs)] for mode in ("import", "eager", "first-adk")}
+
+    print("=" * 60)
+    print(f"BACKEND STARTUP BENCHMARK  runs={args.runs}")
+    print("=" * 60)
+    imports = [s["import_ms"] for s in samples["import"]]
+    eager = [s["import_ms"] + s["extra_ms"] for s in samples["eager"]]
+    first_adk = [s["extra_ms"] for s in samples["first-adk"]]
+    print(f"import app (lazy):        {_describe(imports)}  "
+          f"[ADK loaded: {samples['import'][0]['adk_after_import']}, {samples['import'][0]['modules']} modules]")
+    print(f"import + agent tree:      {_describe(eager)}  [{samples['eager'][0]['modules']} modules]")
+    print(f"first ADK request extra:  {_describe(first_adk)}  (pool of {args.pool_size})")
+    print(f"Boot saving:              {statistics.median(eager) - statistics.median(imports):.0f} ms per worker")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,264 @@
+"""
+Load Test
+Drives the HTTP API with a weighted request mix at fixed concurrency over synthetic data
+
+By default starts the production server (backend/gunicorn.conf.py) on a synthetic network
+from synthetic_data.py, with the local scripted model. --url targets a server that is
+already running instead; pass the sizes it was started with so requests hit existing ids.
+
+Each of --concurrency client threads keeps one HTTP connection open and sends requests
+drawn from --mix (scenario=weight, see SCENARIOS) for --duration seconds, after --warmup
+seconds that are not measured. The report gives the overall throughput, and per scenario
+the request count, p50/p99/max latency, tool errors (HTTP 200 with status "error"),
+admission rejections (429/503) and other failures.
+
+Usage:
+    python benchmarks/load_test.py --makers 50000 --jobs 5000 --workers 4 --concurrency 32 --duration 60
+    python benchmarks/load_test.py --mix "dashboard=1,optimize-bids=1" --no-admission
+    python benchmarks/load_test.py --url http://localhost:5001 --makers 10000 --jobs 1000
+"""
+
+import argparse
+import http.client
+import json
+import os
+import random
+import signal
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import urllib.request
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_MIX = ("dashboard=4,job-dashboard=15,bid-status=20,recommendations=10,manufacturers=2,forecast=10,"
+               "timeline=10,tracking=8,submit-bid=12,update-timeline=5,optimize-bids=2,size-orders=2")
+STARTUP_TIMEOUT_SECONDS = 900
+
+
+def _job(rng, sizes):
+    return f"JOB_{rng.randrange(sizes['jobs']):06d}"
+
+
+def _maker(rng, sizes):
+    return f"MAKER_{rng.randrange(sizes['makers']):06d}"
+
+
+# Scenario name -> request factory (rng, sizes) -> (method, path, JSON body or None)
+SCENARIOS = {
+    "dashboard": lambda rng, sizes: ("GET", "/api/dashboard", None),
+    "job-dashboard": lambda rng, sizes: ("GET", f"/api/dashboard/{_job(rng, sizes)}", None),
+    "bid-status": lambda rng, sizes: ("GET", f"/api/bid-status/{_job(rng, sizes)}", None),
+    "recommendations": lambda rng, sizes: ("GET", f"/api/recommendations?min_score={rng.choice((6, 7, 8, 9))}", None),
+    "manufacturers": lambda rng, sizes: ("GET", f"/api/manufacturers?skill={rng.choice(('CNC', '3D'))}", None),
+    "forecast": lambda rng, sizes: ("POST", "/api/forecast", {
+        "product_id": f"PROD_{rng.randrange(sizes['products']):06d}",
+        "timeframe": rng.choice(("30_days", "60_days", "90_days"))
+    }),
+    "timeline": lambda rng, sizes: ("GET", f"/api/timeline-status?maker_id={_maker(rng, sizes)}", None),
+    "tracking": lambda rng, sizes: ("GET", f"/api/track-shipments/{_job(rng, sizes)}", None),
+    "submit-bid": lambda rng, sizes: ("POST", "/api/submit-bid", {
+        "job_id": _job(rng, sizes), "maker_id": _maker(rng, sizes),
+        "price_per_unit": round(rng.uniform(2.0, 3.5), 2), "quantity": rng.randrange(100, 3000, 50)
+    }),
+    "update-timeline": lambda rng, sizes: ("POST", "/api/update-timeline", {
+        "maker_id": _maker(rng, sizes), "new_completion_date": f"2025-12-{rng.randrange(1, 29):02d}", "reason": "load test"
+    }),
+    "optimize-bids": lambda rng, sizes: ("POST", "/api/optimize-bids", {}),
+    "size-orders": lambda rng, sizes: ("POST", "/api/size-orders", {"limit": 10}),
+    "workflow": lambda rng, sizes: ("POST", "/api/complete-workflow-flask", {}),
+}
+
+
+def _percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def parse_mix(spec):
+    """'dashboard=3,bid-status=1' -> (names, weights)."""
+    names, weights = [], []
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in SCENARIOS:
+            raise SystemExit(f"Unknown scenario '{name}'. Scenarios: {', '.join(SCENARIOS)}")
+        names.append(name)
+        weights.append(float(weight or 1))
+    return names, weights
+
+
+# ============================================================================
+# SERVER
+# ============================================================================
+
+def _healthy(url):
+    try:
+        with urllib.request.urlopen(f"{url}/api/health", timeout=5) as response:
+            return response.status == 200
+    except OSError:
+        return False
+
+
+def start_server(args, sizes):
+    """Starts gunicorn on the synthetic app and waits until it answers. Returns the process."""
+    env = dict(
+        os.environ,
+        CORNERSTONE_SYNTHETIC=",".join(f"{name}={value}" for name, value in sizes.items()),
+        CORNERSTONE_LLM_BACKEND="local",
+        CORNERSTONE_CACHE_DIR="off",
+        CORNERSTONE_FAST_START="1",
+        CORNERSTONE_BIND=f"127.0.0.1:{args.port}",
+        CORNERSTONE_WEB_WORKERS=str(args.workers),
+        CORNERSTONE_WEB_THREADS=str(args.threads),
+    )
+    if args.no_admission:
+        env["CORNERSTONE_ADMISSION"] = "off"
+    server = subprocess.Popen(
+        [sys.executable, "-m", "gunicorn", "-c", "backend/gunicorn.conf.py", "benchmarks.synthetic_data:create_app()"],
+        cwd=ROOT, env=env
+    )
+    url = f"http://127.0.0.1:{args.port}"
+    deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+    while not _healthy(url):
+        if server.poll() is not None or time.monotonic() > deadline:
+            server.kill()
+            raise SystemExit("Server did not start")
+        time.sleep(0.5)
+    return server, url
+
+
+def stop_server(server):
+    server.send_signal(signal.SIGTERM)
+    try:
+        server.wait(timeout=90)
+    except subprocess.TimeoutExpired:
+        server.kill()
+
+
+# ============================================================================
+# CLIENTS
+# ============================================================================
+
+def _client(url, names, weights, sizes, seed, measure_from, stop_at, results):
+    """One client thread: a keep-alive connection sending mix requests until `stop_at`."""
+    rng = random.Random(seed)
+    target = urllib.parse.urlsplit(url)
+    connection = None
+    while time.monotonic() < stop_at:
+        name = rng.choices(names, weights)[0]
+        method, path, body = SCENARIOS[name](rng, sizes)
+        payload = json.dumps(body).encode() if body is not None else None
+        started = time.monotonic()
+        try:
+            if connection is None:
+                connection = http.client.HTTPConnection(target.hostname, target.port, timeout=120)
+            connection.request(method, path, payload, {"Content-Type": "application/json"} if payload else {})
+            response = connection.getresponse()
+            data = response.read()
+            status = response.status
+        except (OSError, http.client.HTTPException):
+            connection = None
+            status, data = None, b""
+        if started >= measure_from:
+            tool_error = status == 200 and b'"status":"error"' in data
+            results.append((name, (time.monotonic() - started) * 1000, status, tool_error, len(data)))
+
+
+def run_load(url, names, weights, sizes, concurrency, warmup, duration, seed):
+    """Runs the clients; returns the measured (scenario, ms, status, tool_error, bytes) samples."""
+    results = []
+    measure_from = time.monotonic() + warmup
+    stop_at = measure_from + duration
+    threads = [
+        threading.Thread(target=_client, args=(url, names, weights, sizes, seed * 1000 + i, measure_from, stop_at, results))
+        for i in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def summarize(results, duration):
+    """Per-scenario and overall counts and latency percentiles."""
+    def stats(samples):
+        latencies = [ms for _, ms, _, _, _ in samples]
+        return {
+            "requests": len(samples),
+            "rps": round(len(samples) / duration, 1),
+            "p50_ms": round(_percentile(latencies, 50), 1) if latencies else None,
+            "p99_ms": round(_percentile(latencies, 99), 1) if latencies else None,
+            "max_ms": round(max(latencies), 1) if latencies else None,
+            "tool_errors": sum(1 for s in samples if s[3]),
+            "rejected": sum(1 for s in samples if s[2] in (429, 503)),
+            "failed": sum(1 for s in samples if s[2] is None or (s[2] >= 400 and s[2] not in (429, 503))),
+            "mean_kb": round(sum(s[4] for s in samples) / len(samples) / 1024, 1) if samples else 0
+        }
+
+    by_scenario = {}
+    for sample in results:
+        by_scenario.setdefault(sample[0], []).append(sample)
+    return {
+        "overall": stats(results),
+        "scenarios": {name: stats(samples) for name, samples in sorted(by_scenario.items())}
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--url", help="Load-test a running server instead of starting one")
+    parser.add_argument("--makers", type=int, default=10_000)
+    parser.add_argument("--jobs", type=int, default=1_000)
+    parser.add_argument("--bids-per-job", type=int, default=100)
+    parser.add_argument("--current-bids", type=int, default=2_000)
+    parser.add_argument("--products", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=2, help="Server worker processes")
+    parser.add_argument("--threads", type=int, default=8, help="Request threads per server worker")
+    parser.add_argument("--port", type=int, default=5091)
+    parser.add_argument("--no-admission", action="store_true", help="Start the server with admission control off")
+    parser.add_argument("--concurrency", type=int, default=16, help="Client threads")
+    parser.add_argument("--duration", type=float, default=30.0, help="Measured seconds")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Unmeasured seconds before measuring")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="scenario=weight,... (scenarios: %s)" % ", ".join(SCENARIOS))
+    parser.add_argument("--json", help="Also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    names, weights = parse_mix(args.mix)
+    sizes = {"makers": args.makers, "jobs": args.jobs, "bids_per_job": args.bids_per_job,
+             "current_bids": args.current_bids, "products": args.products, "seed": args.seed}
+
+    server, url = (None, args.url.rstrip("/")) if args.url else start_server(args, sizes)
+    try:
+        results = run_load(url, names, weights, sizes, args.concurrency, args.warmup, args.duration, args.seed)
+    finally:
+        if server is not None:
+            stop_server(server)
+    report = summarize(results, args.duration)
+
+    overall = report["overall"]
+    print("=" * 96)
+    print(f"LOAD TEST  {url}  concurrency={args.concurrency} duration={args.duration:.0f}s "
+          f"makers={args.makers:,} jobs={args.jobs:,} products={args.products:,}"
+          + (f"  workers={args.workers}x{args.threads}" if server else ""))
+    print("=" * 96)
+    print(f"Throughput:        {overall['rps']:.1f} req/s ({overall['requests']:,} requests)")
+    print(f"Latency p50/p99:   {overall['p50_ms']} / {overall['p99_ms']} ms (max {overall['max_ms']} ms)")
+    print(f"Tool errors:       {overall['tool_errors']:,}   rejected (429/503): {overall['rejected']:,}   "
+          f"failed: {overall['failed']:,}")
+    print("-" * 96)
+    print(f"{'scenario':<17}{'requests':>9}{'req/s':>8}{'p50 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+          f"{'tool err':>10}{'rejected':>10}{'failed':>8}{'mean KB':>9}")
+    for name, row in report["scenarios"].items():
+        print(f"{name:<17}{row['requests']:>9,}{row['rps']:>8.1f}{row['p50_ms']:>9}{row['p99_ms']:>9}{row['max_ms']:>9}"
+              f"{row['tool_errors']:>10,}{row['rejected']:>10,}{row['failed']:>8,}{row['mean_kb']:>9}")
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"settings": vars(args), "report": report}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
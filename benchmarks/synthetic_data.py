@@ -0,0 +1,416 @@
+"""
+Synthetic Data Generator
+Seeded, large-scale maker networks, bid books, catalogs and timelines for load testing
+
+Generates data in exactly the shapes of the mock literals (MOCK_MAKERS, MOCK_BIDS,
+TRENDING_PRODUCTS, DEMAND_FORECASTS, BID_WINDOWS, TIMELINES, LOGISTICS_PLANS,
+SHIPMENT_TRACKING), only much more of it:
+- makers:      clustered around US manufacturing metros with jittered coordinates, CNC or
+               3D, with rates, capacities and lead times drawn per skill
+- bid windows: one per job, each with its own bid book (`bids`, as submit_bid records
+               them) and stats; closed windows have cheapest-first winners
+- bids:        windows x bids per job, plus a --current-bids book for the demo job
+               (KNICK_2025) that optimize_bids and size_order_quantities solve over
+- timelines, logistics plans (nearest consolidation center, real distances) and
+  shipments for the closed jobs' winners
+- products with forecasts, across the mock categories and more
+
+Ids are numbered (MAKER_000042, JOB_000042, PROD_000042), so a load test can address the
+data knowing only the sizes. The same seed and sizes give the same data. install() adds a
+dataset to the running process's mock data alongside the demo entries, then rebuilds the
+indexes and read model. create_app() does the same for a server, with sizes from
+CORNERSTONE_SYNTHETIC:
+
+    CORNERSTONE_SYNTHETIC="makers=50000,jobs=20000,bids_per_job=100" \\
+        gunicorn -c backend/gunicorn.conf.py "benchmarks.synthetic_data:create_app()"
+
+Usage:
+    python benchmarks/synthetic_data.py --makers 100000 --jobs 20000 --bids-per-job 100
+    python benchmarks/synthetic_data.py --makers 1000 --jobs 50 --out /tmp/network.json
+"""
+
+import argparse
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+
+
+# (city, latitude, longitude, weight): where the network's makers cluster
+METROS = [
+    ("Columbus, OH", 39.9612, -82.9988, 4), ("Detroit, MI", 42.3314, -83.0458, 6),
+    ("Houston, TX", 29.7604, -95.3698, 6), ("Charlotte, NC", 35.2271, -80.8431, 4),
+    ("Portland, OR", 45.5152, -122.6784, 3), ("Phoenix, AZ", 33.4484, -112.0740, 4),
+    ("Boston, MA", 42.3601, -71.0589, 3), ("Denver, CO", 39.7392, -104.9903, 3),
+    ("Chicago, IL", 41.8781, -87.6298, 7), ("Atlanta, GA", 33.7490, -84.3880, 5),
+    ("Dallas, TX", 32.7767, -96.7970, 5), ("Los Angeles, CA", 34.0522, -118.2437, 7),
+    ("Milwaukee, WI", 43.0389, -87.9065, 3), ("Cleveland, OH", 41.4993, -81.6944, 3),
+    ("Pittsburgh, PA", 40.4406, -79.9959, 3), ("Minneapolis, MN", 44.9778, -93.2650, 3),
+    ("Nashville, TN", 36.1627, -86.7816, 3), ("Salt Lake City, UT", 40.7608, -111.8910, 2),
+    ("Seattle, WA", 47.6062, -122.3321, 3), ("San Jose, CA", 37.3382, -121.8863, 4),
+]
+METRO_JITTER_DEGREES = 0.35
+
+SKILLS = ("CNC", "3D")
+SKILL_SHARE = (0.65, 0.35)
+BASE_RATE = {"CNC": 2.60, "3D": 2.90}           # Median price per unit
+NAME_SUFFIXES = {
+    "CNC": ("Precision", "CNC Works", "Machining", "Fabrication", "Manufacturing Co", "Micro-Mfg"),
+    "3D": ("3D Prints", "Additive Lab", "3D Hub", "Print Foundry"),
+}
+
+CATEGORIES = (
+    "Electronics Components", "Mobile Accessories", "Office Supplies", "Computer Accessories",
+    "Home Organization", "Outdoor Gear", "Automotive Parts", "Kitchen Tools", "Medical Devices", "Toys & Hobbies",
+)
+PRODUCT_ADJECTIVES = ("Precision", "Adjustable", "Compact", "Modular", "Heavy-Duty", "Magnetic", "Foldable", "Custom")
+PRODUCT_NOUNS = ("Bracket", "Stand", "Clip", "Mount", "Hinge", "Housing", "Holder", "Enclosure", "Adapter", "Spacer")
+SIGNAL_SOURCES = ("Reddit mentions", "Amazon searches", "YouTube reviews", "TikTok videos", "Etsy searches",
+                  "Pinterest pins", "Google Trends", "Instagram posts")
+
+SHIPMENT_WEIGHT_LBS = 500    # Per maker, as plan_logistics assumes
+DEFAULT_START = "2025-10-01"
+
+
+def _miles(lat1, lng1, lat2, lng2):
+    """Great-circle distance in miles (arrays or scalars)."""
+    lat1, lng1, lat2, lng2 = map(np.radians, (lat1, lng1, lat2, lng2))
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 3958.8 * 2 * np.arcsin(np.sqrt(a))
+
+
+def _stamp(moment):
+    return moment.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def generate_makers(rng, count):
+    """`count` makers in MOCK_MAKERS shape, plus their columns as arrays for the bid generators."""
+    weights = np.array([metro[3] for metro in METROS], dtype=float)
+    metro = rng.choice(len(METROS), size=count, p=weights / weights.sum())
+    lat = np.array([m[1] for m in METROS])[metro] + rng.normal(0, METRO_JITTER_DEGREES, count)
+    lng = np.array([m[2] for m in METROS])[metro] + rng.normal(0, METRO_JITTER_DEGREES, count)
+    skill = rng.choice(len(SKILLS), size=count, p=SKILL_SHARE)
+    base_rate = np.round(np.array([BASE_RATE[s] for s in SKILLS])[skill] * rng.lognormal(0, 0.12, count), 2)
+    capacity = (np.round(rng.lognormal(math.log(1500), 0.5, count) / 100) * 100).clip(200, 20000).astype(np.int64)
+    lead_time = rng.integers(5, 21, count)
+    suffix_pick = rng.integers(0, 1 << 30, count)
+
+    makers = []
+    for i in range(count):
+        city = METROS[metro[i]][0]
+        skill_name = SKILLS[skill[i]]
+        suffixes = NAME_SUFFIXES[skill_name]
+        makers.append({
+            "id": f"MAKER_{i:06d}",
+            "name": f"{city.split(',')[0]} {suffixes[suffix_pick[i] % len(suffixes)]} #{i}",
+            "skill": skill_name,
+            "base_rate": float(base_rate[i]),
+            "max_capacity": int(capacity[i]),
+            "location": {"lat": round(float(lat[i]), 4), "lng": round(float(lng[i]), 4), "city": city},
+            "lead_time_days": int(lead_time[i])
+        })
+    columns = {"metro": metro, "skill": skill, "base_rate": base_rate, "capacity": capacity, "lat": lat, "lng": lng, "lead_time": lead_time}
+    return makers, columns
+
+
+def _bid_book(rng, columns, skill_index, size):
+    """Distinct bidding makers of one skill with their prices and quantities (as arrays)."""
+    pool = np.flatnonzero(columns["skill"] == skill_index)
+    makers = np.unique(pool[rng.integers(0, len(pool), min(size, len(pool)))])
+    prices = np.round(columns["base_rate"][makers] * rng.normal(1.0, 0.08, len(makers)).clip(0.7, 1.4), 2)
+    quantities = (columns["capacity"][makers] * rng.uniform(0.4, 1.0, len(makers))).astype(np.int64) // 50 * 50 + 50
+    return makers, prices, quantities
+
+
+def generate_current_bids(rng, columns, count, skill="CNC"):
+    """A bid book of about `count` bids (one per maker) in MOCK_BIDS shape for the demo job."""
+    makers, prices, quantities = _bid_book(rng, columns, SKILLS.index(skill), count)
+    return [
+        {"bid_id": f"BID_S{i:07d}", "maker_id": f"MAKER_{m:06d}", "bid_price_per_unit": float(p), "max_batch_size": int(q)}
+        for i, (m, p, q) in enumerate(zip(makers.tolist(), prices.tolist(), quantities.tolist()))
+    ]
+
+
+def generate_jobs(rng, columns, jobs, bids_per_job, start):
+    """
+    `jobs` bid windows (BID_WINDOWS shape, each with its bid book), and for the closed ones
+    with winners: timelines, logistics plans and shipment tracking.
+    """
+    from cornerstone_agent.allocation import greedy_allocation
+    from logistics_agent.shipping_data import CONSOLIDATION_CENTERS, calculate_shipping_cost
+
+    center_lat = np.array([c["lat"] for c in CONSOLIDATION_CENTERS])
+    center_lng = np.array([c["lng"] for c in CONSOLIDATION_CENTERS])
+    network_size = {s: int(np.count_nonzero(columns["skill"] == i)) for i, s in enumerate(SKILLS)}
+
+    windows, timelines, plans, shipments = {}, {}, {}, {}
+    for j in range(jobs):
+        job_id = f"JOB_{j:06d}"
+        skill_index = int(rng.choice(len(SKILLS), p=SKILL_SHARE))
+        skill = SKILLS[skill_index]
+        opened_at = start + timedelta(hours=int(rng.integers(0, 24 * 60)))
+        duration = int(rng.integers(48, 169))
+        closes_at = opened_at + timedelta(hours=duration)
+        makers, prices, quantities = _bid_book(rng, columns, skill_index, int(rng.poisson(bids_per_job)) + 1)
+        required_qty = int(max(500, round(quantities.sum() * rng.uniform(0.15, 0.6), -2)))
+        maker_ids = [f"MAKER_{m:06d}" for m in makers.tolist()]
+        submitted = [_stamp(opened_at + timedelta(minutes=int(offset)))
+                     for offset in np.sort(rng.integers(0, duration * 60, len(makers)))]
+
+        window = {
+            "job_id": job_id,
+            "product_name": f"{PRODUCT_ADJECTIVES[j % len(PRODUCT_ADJECTIVES)]} {PRODUCT_NOUNS[(j // 8) % len(PRODUCT_NOUNS)]} {j}",
+            "status": "OPEN" if rng.random() < 0.3 else "CLOSED",
+            "opened_at": _stamp(opened_at),
+            "closes_at": _stamp(closes_at),
+            "duration_hours": duration,
+            "required_qty": required_qty,
+            "required_skill": skill,
+            "total_bids": len(makers),
+            "participating_manufacturers": maker_ids,
+            "participation_rate": f"{len(makers) * 100 // max(1, network_size[skill])}%",
+            "lowest_bid": float(prices.min()),
+            "highest_bid": float(prices.max()),
+            "average_bid": round(float(prices.mean()), 4),
+            "bids": [
+                {"maker_id": maker_id, "price_per_unit": float(p), "quantity": int(q), "submitted_at": at}
+                for maker_id, p, q, at in zip(maker_ids, prices.tolist(), quantities.tolist(), submitted)
+            ]
+        }
+        windows[job_id] = window
+        if window["status"] == "OPEN":
+            continue
+
+        window["closed_at"] = window["closes_at"]
+        selected, assigned = greedy_allocation(prices, quantities, required_qty)
+        winners = [makers[i] for i in selected.tolist()]
+        window["winning_manufacturers"] = [f"MAKER_{m:06d}" for m in winners]
+        window["final_cost"] = f"${float((prices[selected] * assigned).sum()):,.0f}"
+
+        due = {}
+        for m, qty in zip(winners, assigned.tolist()):
+            original = closes_at + timedelta(days=int(columns["lead_time"][m]))
+            slip = int(rng.choice([0, 0, 0, 0, 1, 2, 3, 5, 7, -1, -2]))
+            due[m] = original + timedelta(days=slip)
+            timelines[f"MAKER_{m:06d}"] = {
+                "job_id": job_id,
+                "original_date": original.strftime("%Y-%m-%d"),
+                "current_date": due[m].strftime("%Y-%m-%d"),
+                "status": "delayed" if slip > 0 else "ahead_of_schedule" if slip < 0 else "on_track",
+                "quantity": int(qty)
+            }
+
+        if rng.random() < 0.5:
+            continue
+        winner_lat, winner_lng = columns["lat"][winners], columns["lng"][winners]
+        center_index = int(np.argmin([_miles(winner_lat, winner_lng, la, ln).sum() for la, ln in zip(center_lat, center_lng)]))
+        center = CONSOLIDATION_CENTERS[center_index]
+        distances = _miles(winner_lat, winner_lng, center["lat"], center["lng"]).round().astype(int)
+        last_pickup = max(due.values())
+        plans[job_id] = {
+            "job_id": job_id,
+            "status": "PLANNED",
+            "consolidation_center": center["name"],
+            "consolidation_point": {"lat": center["lat"], "lng": center["lng"]},
+            "pickup_schedule": {
+                f"MAKER_{m:06d}": {"date": due[m].strftime("%Y-%m-%d"), "location": METROS[columns["metro"][m]][0], "distance_miles": int(d)}
+                for m, d in zip(winners, distances.tolist())
+            },
+            "estimated_shipping_cost": calculate_shipping_cost(len(winners) * SHIPMENT_WEIGHT_LBS, "ground"),
+            "shipping_method": "ground",
+            "final_delivery_date": (last_pickup + timedelta(days=3)).strftime("%Y-%m-%d"),
+            "total_distance_miles": int(distances.sum()),
+            "estimated_delivery_days": len(winners) + 3,
+            "num_manufacturers": len(winners)
+        }
+        tracking = {}
+        for m in winners:
+            status = str(rng.choice(["PENDING_PICKUP", "IN_TRANSIT", "DELIVERED"], p=[0.5, 0.3, 0.2]))
+            entry = {"status": status, "current_location": METROS[columns["metro"][m]][0]}
+            if status == "PENDING_PICKUP":
+                entry["scheduled_pickup"] = _stamp(due[m] + timedelta(hours=9))
+            else:
+                entry["last_update"] = _stamp(due[m] + timedelta(hours=int(rng.integers(10, 48))))
+            if status == "DELIVERED":
+                entry["delivered_at"] = entry["last_update"]
+            tracking[f"MAKER_{m:06d}"] = entry
+        shipments[job_id] = tracking
+    return windows, timelines, plans, shipments
+
+
+def generate_products(rng, count):
+    """`count` products in TRENDING_PRODUCTS shape, with DEMAND_FORECASTS entries."""
+    score = np.round(rng.beta(5, 2, count) * 9 + 1, 1)
+    trend = rng.choice(["rising", "stable", "declining"], size=count, p=[0.4, 0.4, 0.2])
+    volume = (np.round(rng.lognormal(math.log(4000), 0.6, count) / 100) * 100).astype(np.int64) + 100
+    price = np.round(rng.lognormal(math.log(2.5), 0.5, count), 2)
+    growth = {"rising": 1.35, "stable": 1.05, "declining": 0.85}
+
+    products, forecasts = [], {}
+    for i in range(count):
+        product_id = f"PROD_{i:06d}"
+        sources = rng.choice(len(SIGNAL_SOURCES), size=int(rng.integers(1, 4)), replace=False)
+        change = rng.integers(-10, 50, len(sources))
+        products.append({
+            "product_id": product_id,
+            "name": f"{PRODUCT_ADJECTIVES[i % len(PRODUCT_ADJECTIVES)]} {PRODUCT_NOUNS[(i // 8) % len(PRODUCT_NOUNS)]} {i}",
+            "category": CATEGORIES[int(rng.integers(0, len(CATEGORIES)))],
+            "demand_score": float(score[i]),
+            "trend": str(trend[i]),
+            "estimated_volume": int(volume[i]),
+            "price_range": f"${price[i] * 0.85:.2f} - ${price[i] * 1.25:.2f}",
+            "signals": [f"{SIGNAL_SOURCES[s]} {c:+d}%" for s, c in zip(sources.tolist(), change.tolist())]
+        })
+        confidence = float(rng.uniform(0.8, 0.95))
+        factor = growth[str(trend[i])]
+        forecasts[product_id] = {
+            f"{days}_days": {"volume": int(volume[i] * factor ** step), "confidence": round(confidence - 0.06 * step, 2)}
+            for step, days in enumerate((30, 60, 90))
+        }
+    return products, forecasts
+
+
+def generate(makers=10_000, jobs=1_000, bids_per_job=100, current_bids=2_000, products=5_000, seed=7, start=DEFAULT_START):
+    """
+    A complete synthetic network (a dict of the mock data structures, plus its sizes).
+
+    Args:
+        makers: Manufacturers in the network
+        jobs: Bid windows, each with a bid book of about `bids_per_job` bids
+        bids_per_job: Mean bids per window
+        current_bids: Bids in the demo job's (KNICK_2025) book, i.e. MOCK_BIDS
+        products: Catalog size
+        seed: Random seed; the same seed and sizes give the same data
+        start: Date (YYYY-MM-DD) the generated windows open from
+    """
+    rng = np.random.default_rng(seed)
+    start = datetime.strptime(start, "%Y-%m-%d")
+    maker_list, columns = generate_makers(rng, makers)
+    windows, timelines, plans, shipments = generate_jobs(rng, columns, jobs, bids_per_job, start)
+    product_list, forecasts = generate_products(rng, products)
+    return {
+        "sizes": {"makers": makers, "jobs": jobs, "bids_per_job": bids_per_job, "current_bids": current_bids,
+                  "products": products, "seed": seed, "start": start.strftime("%Y-%m-%d")},
+        "makers": maker_list,
+        "current_bids": generate_current_bids(rng, columns, current_bids),
+        "bid_windows": windows,
+        "timelines": timelines,
+        "logistics_plans": plans,
+        "shipments": shipments,
+        "products": product_list,
+        "forecasts": forecasts
+    }
+
+
+def summarize(dataset):
+    """Counts of what a dataset holds."""
+    return {
+        "makers": len(dataset["makers"]),
+        "bid_windows": len(dataset["bid_windows"]),
+        "open_windows": sum(1 for w in dataset["bid_windows"].values() if w["status"] == "OPEN"),
+        "bids": sum(w["total_bids"] for w in dataset["bid_windows"].values()) + len(dataset["current_bids"]),
+        "current_job_bids": len(dataset["current_bids"]),
+        "timelines": len(dataset["timelines"]),
+        "logistics_plans": len(dataset["logistics_plans"]),
+        "shipments": sum(len(s) for s in dataset["shipments"].values()),
+        "products": len(dataset["products"])
+    }
+
+
+def install(dataset):
+    """
+    Adds a dataset to this process's mock data (next to the demo entries) and rebuilds what
+    is derived from it: the catalog indexes, the dashboard read model and the data versions.
+    """
+    from agent_runtime.data_versions import bump_version
+    from agent_runtime.read_model import DASHBOARD
+    from bid_coordinator_agent import agent as bid_agent, bid_windows
+    from cornerstone_agent.data_mocks import MOCK_MAKERS, MOCK_BIDS
+    from demand_agent.catalog import CATALOG
+    from demand_agent.trend_data import TRENDING_PRODUCTS, DEMAND_FORECASTS, MARKET_SIGNALS
+    from logistics_agent.shipping_data import LOGISTICS_PLANS, SHIPMENT_TRACKING
+    from timeline_agent.agent import TIMELINES
+
+    MOCK_MAKERS.extend(dataset["makers"])
+    MOCK_BIDS.extend(dataset["current_bids"])
+    # Participation rates are relative to the network's size
+    bid_windows.NETWORK_SIZE = bid_agent.NETWORK_SIZE = len(MOCK_MAKERS)
+
+    TRENDING_PRODUCTS.extend(dataset["products"])
+    DEMAND_FORECASTS.update(dataset["forecasts"])
+    for category in CATEGORIES:
+        MARKET_SIGNALS.setdefault(category, {"overall_trend": "stable", "consumer_sentiment": "neutral",
+                                             "competition_level": "medium", "profit_margin": "medium"})
+    CATALOG.load(TRENDING_PRODUCTS)
+
+    bid_windows.BID_WINDOWS.update(dataset["bid_windows"])
+    for window in dataset["bid_windows"].values():
+        DASHBOARD.apply_bid_window(window)
+    TIMELINES.update(dataset["timelines"])
+    for maker_id, timeline in dataset["timelines"].items():
+        DASHBOARD.apply_timeline(maker_id, timeline)
+    LOGISTICS_PLANS.update(dataset["logistics_plans"])
+    for plan in dataset["logistics_plans"].values():
+        DASHBOARD.apply_logistics_plan(plan)
+    SHIPMENT_TRACKING.update(dataset["shipments"])
+    for job_id, tracking in dataset["shipments"].items():
+        DASHBOARD.apply_shipments(job_id, tracking)
+
+    for domain in ("bids", "timelines", "logistics", "forecasts", "signals"):
+        bump_version(domain)
+
+
+def parse_sizes(spec):
+    """'makers=50000,jobs=2000' -> generate() keyword arguments."""
+    sizes = {}
+    for part in filter(None, (p.strip() for p in spec.split(","))):
+        name, value = part.split("=", 1)
+        sizes[name.strip()] = value.strip() if name.strip() == "start" else int(value)
+    return sizes
+
+
+def create_app():
+    """The backend's Flask app with a synthetic dataset (sizes from CORNERSTONE_SYNTHETIC) installed."""
+    import app as backend
+
+    started = time.perf_counter()
+    dataset = generate(**parse_sizes(os.environ.get("CORNERSTONE_SYNTHETIC", "")))
+    install(dataset)
+    backend.app.logger.warning("Synthetic data installed in %.1fs: %s", time.perf_counter() - started, summarize(dataset))
+    return backend.app
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[1])
+    parser.add_argument("--makers", type=int, default=10_000)
+    parser.add_argument("--jobs", type=int, default=1_000)
+    parser.add_argument("--bids-per-job", type=int, default=100)
+    parser.add_argument("--current-bids", type=int, default=2_000)
+    parser.add_argument("--products", type=int, default=5_000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--start", default=DEFAULT_START)
+    parser.add_argument("--out", help="Write the dataset as JSON to this file")
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    dataset = generate(args.makers, args.jobs, args.bids_per_job, args.current_bids, args.products, args.seed, args.start)
+    elapsed = time.perf_counter() - started
+    print(f"Generated in {elapsed:.1f}s (seed {args.seed}):")
+    for name, count in summarize(dataset).items():
+        print(f"  {name:<18} {count:>12,}")
+    if args.out:
+        with open(args.out, "w") as f:
+            json.dump(dataset, f)
+        print(f"Written to {args.out} ({os.path.getsize(args.out) / 1e6:.1f} MB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,11 +5,40 @@ Manages bid lifecycle from opening to closing and winner notification
 Following ADK pattern: https://google.github.io/adk-docs/get-started/quickstart/
 """
 
-from google.adk.agents import Agent
+import math
 from datetime import datetime, timedelta
-from .bid_windows import BID_WINDOWS, NOTIFICATIONS, get_bid_window, calculate_time_remaining
+from .bid_windows import BID_WINDOWS, NETWORK_SIZE, NOTIFICATIONS, get_bid_window, calculate_time_remaining
+from agent_runtime.read_model import DASHBOARD
+from agent_runtime.shared_state import register_shared, commit_change, mutates_shared_state
+from agent_runtime.agent_cache import AgentCache
+from agent_runtime.compact import compact_tool
+from agent_runtime.lazy import lazy_module_attrs
+from agent_runtime.tracing import traced
+from agent_runtime.workflow_state import shares_workflow_state
+from agent_runtime.intent_router import Intent, IntentRouter, JOB_PATTERN, MAKER_PATTERN, job_id, maker_ids
 
+# Seeds the dashboard read model; the tools below keep it (and other server workers) current
+register_shared("bid_windows", BID_WINDOWS, "bids", lambda _, window: DASHBOARD.apply_bid_window(window))
 
+
+def _record_bid_window(state, arguments, result):
+    state.job_id = arguments["job_id"]
+    state.product_name = arguments["product_name"]
+    state.required_qty = arguments["required_qty"]
+    state.required_skill = arguments["required_skill"]
+    state.bid_status = result["report"]["bid_window_status"]
+
+
+def _record_bid_closed(state, arguments, result):
+    state.bid_status = result["report"]["window_status"]
+
+
+@traced
+@shares_workflow_state(
+    reads={"job_id": "proposed_job_id", "product_name": "product_name", "required_qty": "order_qty", "required_skill": "required_skill"},
+    record=_record_bid_window
+)
+@mutates_shared_state
 def create_bid_window(job_id: str, product_name: str, required_qty: int, required_skill: str, duration_hours: int = 96) -> dict:
     """
     Creates and opens a new bid window for manufacturers to submit bids.
@@ -54,6 +83,8 @@ def create_bid_window(job_id: str, product_name: str, required_qty: int, require
     
     # Store in database (mock)
     BID_WINDOWS[job_id] = new_window
+    commit_change("bid_windows", job_id, "bid.opened", product_name=product_name, required_qty=required_qty,
+                  required_skill=required_skill, closes_at=new_window["closes_at"])
     
     # Prepare notification
     notification = NOTIFICATIONS["bid_opened"]["message"].format(
@@ -79,6 +110,8 @@ def create_bid_window(job_id: str, product_name: str, required_qty: int, require
     }
 
 
+@traced
+@shares_workflow_state(reads={"job_id": "job_id"})
 def get_bid_status(job_id: str) -> dict:
     """
     Retrieves current status of a bid window including participation and competition stats.
@@ -126,6 +159,92 @@ def get_bid_status(job_id: str) -> dict:
     }
 
 
+@traced
+@mutates_shared_state
+def submit_bid(job_id: str, maker_id: str, price_per_unit: float, quantity: int) -> dict:
+    """
+    Records a manufacturer's bid on an open bid window and updates its competition stats.
+    
+    Args:
+        job_id: The job identifier to bid on
+        maker_id: The bidding manufacturer's ID (e.g., 'MAKER_A')
+        price_per_unit: Offered price per unit in dollars
+        quantity: Number of units the manufacturer can produce
+    
+    Returns:
+        dict: Confirmation of the bid with the window's updated participation stats
+    """
+    
+    window = get_bid_window(job_id)
+    
+    if not window:
+        return {
+            "status": "error",
+            "error_message": f"Bid window {job_id} not found."
+        }
+    
+    if window["status"] != "OPEN":
+        return {
+            "status": "error",
+            "error_message": f"Bid window {job_id} is {window['status']}; bids are no longer accepted."
+        }
+    
+    # JSON clients may send numbers as strings ("2.50")
+    try:
+        price_per_unit = float(price_per_unit)
+        quantity = int(quantity)
+    except (TypeError, ValueError):
+        return {
+            "status": "error",
+            "error_message": "Price per unit must be a number and quantity a whole number."
+        }
+    
+    if not math.isfinite(price_per_unit) or price_per_unit <= 0 or quantity <= 0:
+        return {
+            "status": "error",
+            "error_message": "Price per unit and quantity must both be positive."
+        }
+    
+    if maker_id in window["participating_manufacturers"]:
+        return {
+            "status": "error",
+            "error_message": f"{maker_id} has already submitted a bid for {job_id}."
+        }
+    
+    # Update competition stats incrementally (earlier bids are only known by their stats)
+    previous_bids = window["total_bids"]
+    window["lowest_bid"] = min(window.get("lowest_bid", price_per_unit), price_per_unit)
+    window["highest_bid"] = max(window.get("highest_bid", price_per_unit), price_per_unit)
+    window["average_bid"] = round((window.get("average_bid", 0) * previous_bids + price_per_unit) / (previous_bids + 1), 4)
+    window["total_bids"] = previous_bids + 1
+    window["participating_manufacturers"].append(maker_id)
+    window["participation_rate"] = f"{len(window['participating_manufacturers']) * 100 // NETWORK_SIZE}%"
+    
+    bid = {
+        "maker_id": maker_id,
+        "price_per_unit": price_per_unit,
+        "quantity": quantity,
+        "submitted_at": datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    }
+    window.setdefault("bids", []).append(bid)
+    commit_change("bid_windows", job_id, "bid.submitted", **bid, total_bids=window["total_bids"],
+                  lowest_bid=window["lowest_bid"], average_bid=window["average_bid"])
+    
+    return {
+        "status": "success",
+        "report": {
+            "job_id": job_id,
+            **bid,
+            "total_bids_received": window["total_bids"],
+            "participation_rate": window["participation_rate"],
+            "summary": f"✓ Bid from {maker_id} recorded for {job_id}: {quantity} units at ${price_per_unit:.2f}/unit. {window['total_bids']} bids received so far."
+        }
+    }
+
+
+@traced
+@shares_workflow_state(reads={"job_id": "job_id"}, record=_record_bid_closed)
+@mutates_shared_state
 def close_bid_window(job_id: str) -> dict:
     """
     Closes a bid window and prepares for optimization.
@@ -155,6 +274,7 @@ def close_bid_window(job_id: str) -> dict:
     closed_at = datetime.now()
     window["status"] = "CLOSED"
     window["closed_at"] = closed_at.strftime("%Y-%m-%d %H:%M:%S")
+    commit_change("bid_windows", job_id, "bid.closed", closed_at=window["closed_at"], total_bids=window["total_bids"])
     
     return {
         "status": "success",
@@ -170,6 +290,9 @@ def close_bid_window(job_id: str) -> dict:
     }
 
 
+@traced
+@shares_workflow_state(reads={"job_id": "job_id", "winning_maker_ids": "winning_makers"})
+@mutates_shared_state
 def notify_winners(job_id: str, winning_maker_ids: str) -> dict:
     """
     Sends notifications to winning manufacturers.
@@ -212,6 +335,7 @@ def notify_winners(job_id: str, winning_maker_ids: str) -> dict:
     
     # Update window with winners
     window["winning_manufacturers"] = maker_ids
+    commit_change("bid_windows", job_id, "bid.winners", winners=maker_ids)
     
     return {
         "status": "success",
@@ -224,37 +348,90 @@ def notify_winners(job_id: str, winning_maker_ids: str) -> dict:
     }
 
 
+def _job_params(text):
+    job = job_id(text)
+    return {"job_id": job} if job else None
+
+
+def _notify_params(text):
+    job, makers = job_id(text), maker_ids(text)
+    if not job or not makers:
+        return None
+    return {"job_id": job, "winning_maker_ids": ",".join(dict.fromkeys(makers))}
+
+
+# Common requests that map directly onto one tool call (answered without the LLM)
+INTENT_ROUTER = IntentRouter("bid_coordinator", [
+    Intent("bid_status", get_bid_status, [
+        rf"how many bids (?:do we have |have we (?:got|received) )?(?:for|on) {JOB_PATTERN}(?: so far)?",
+        rf"(?:what(?:'s| is) the )?(?:bid(?:ding)? )?status (?:of|for) (?:the )?(?:bids? (?:window )?(?:for )?)?{JOB_PATTERN}",
+        rf"(?:check|show(?: me)?|get) (?:the )?bids? (?:status )?(?:for|on) {JOB_PATTERN}",
+    ], params=_job_params),
+    Intent("close_bid", close_bid_window, [
+        rf"close (?:the )?bid(?:ding)?(?: window)? (?:for|on) {JOB_PATTERN}",
+    ], params=_job_params),
+    Intent("notify_winners", notify_winners, [
+        rf"notify (?:the )?winners (?:for|of) {JOB_PATTERN}:? {MAKER_PATTERN}(?:(?:,| and|, and) {MAKER_PATTERN})*",
+    ], params=_notify_params),
+])
+
+
+TOOLS = [
+    # Compact variants: rendered notification texts and repeated messages dropped
+    compact_tool(create_bid_window, drop=("notification_sent",)),
+    compact_tool(get_bid_status),
+    compact_tool(submit_bid),
+    compact_tool(close_bid_window, drop=("message",)),
+    compact_tool(notify_winners, drop=("notification",)),
+]
+
+
+# Answers and read-only tool results are replayed until the data they depend on changes
+AGENT_CACHE = AgentCache("bid_coordinator", read_only_tools=("get_bid_status",))
+
+
 # Create the Bid Coordinator Agent (root_agent)
-root_agent = Agent(
-    name="bid_coordinator",
-    model="gemini-2.0-flash",
-    description=(
-        "Bid lifecycle manager for Cornerstone's manufacturing network. "
-        "Opens bid windows, tracks participation, closes bids, and notifies winners. "
-        "Coordinates the transition from bidding to production."
-    ),
-    instruction=(
-        "You are the Cornerstone Bid Coordinator, responsible for managing the entire bid process.\n\n"
-        "Your primary responsibilities:\n"
-        "1. When asked to create or open a bid, call create_bid_window() with job details\n"
-        "2. When asked about bid status or participation, call get_bid_status() for current stats\n"
-        "3. When it's time to close bidding, call close_bid_window() to seal bids\n"
-        "4. After optimization is complete, call notify_winners() to inform selected manufacturers\n\n"
-        "Key behaviors:\n"
-        "- Always confirm when bid windows are opened/closed\n"
-        "- Report participation rates and competition stats\n"
-        "- Explain the next steps after each action\n"
-        "- Be encouraging to manufacturers about future opportunities\n\n"
-        "Workflow:\n"
-        "1. Demand Analyzer identifies product → You open bid window\n"
-        "2. Manufacturers submit bids → You track participation\n"
-        "3. Window closes → You trigger Cornerstone Orchestrator for optimization\n"
-        "4. Winners selected → You notify manufacturers\n\n"
-        "Example interactions:\n"
-        "User: 'Open a bid for Widget Bracket, 5000 units, CNC skill'\n"
-        "You: Call create_bid_window(job_id='KNICK_2025', product_name='Widget Bracket', required_qty=5000, required_skill='CNC'), then confirm opening.\n\n"
-        "User: 'How many bids do we have for KNICK_2025?'\n"
-        "You: Call get_bid_status(job_id='KNICK_2025'), then report participation stats."
-    ),
-    tools=[create_bid_window, get_bid_status, close_bid_window, notify_winners],
-)
+def _build_root_agent():
+    """Creates the ADK agent. Deferred (see agent_runtime/lazy.py) so importing the tools does not load ADK."""
+    from google.adk.agents import Agent
+    from agent_runtime.local_model import resolve_model
+
+    return Agent(
+        name="bid_coordinator",
+        model=resolve_model("gemini-2.0-flash"),
+        description=(
+            "Bid lifecycle manager for Cornerstone's manufacturing network. "
+            "Opens bid windows, tracks participation, closes bids, and notifies winners. "
+            "Coordinates the transition from bidding to production."
+        ),
+        instruction=(
+            "You are the Cornerstone Bid Coordinator, responsible for managing the entire bid process.\n\n"
+            "Your primary responsibilities:\n"
+            "1. When asked to create or open a bid, call create_bid_window() with job details\n"
+            "2. When asked about bid status or participation, call get_bid_status() for current stats; record a manufacturer's bid with submit_bid()\n"
+            "3. When it's time to close bidding, call close_bid_window() to seal bids\n"
+            "4. After optimization is complete, call notify_winners() to inform selected manufacturers\n\n"
+            "Key behaviors:\n"
+            "- Always confirm when bid windows are opened/closed\n"
+            "- Report participation rates and competition stats\n"
+            "- Explain the next steps after each action\n"
+            "- Be encouraging to manufacturers about future opportunities\n"
+            "- In the orchestrated workflow, omit arguments that earlier agents already established (job_id, product, quantity, skill, winning makers); the tools read them from the shared workflow state\n\n"
+            "Workflow:\n"
+            "1. Demand Analyzer identifies product → You open bid window\n"
+            "2. Manufacturers submit bids → You track participation\n"
+            "3. Window closes → You trigger Cornerstone Orchestrator for optimization\n"
+            "4. Winners selected → You notify manufacturers\n\n"
+            "Example interactions:\n"
+            "User: 'Open a bid for Widget Bracket, 5000 units, CNC skill'\n"
+            "You: Call create_bid_window(job_id='KNICK_2025', product_name='Widget Bracket', required_qty=5000, required_skill='CNC'), then confirm opening.\n\n"
+            "User: 'How many bids do we have for KNICK_2025?'\n"
+            "You: Call get_bid_status(job_id='KNICK_2025'), then report participation stats."
+        ),
+        tools=TOOLS,
+        before_model_callback=INTENT_ROUTER.before_model_callback,
+        **AGENT_CACHE.callbacks()
+    )
+
+
+__getattr__ = lazy_module_attrs(globals(), root_agent=_build_root_agent)
@@ -41,6 +41,9 @@ BID_WINDOWS = {
     }
 }
 
+# Manufacturers in the network (every one is notified when a bid window opens)
+NETWORK_SIZE = 10
+
 # Notification Templates
 NOTIFICATIONS = {
     "bid_opened": {
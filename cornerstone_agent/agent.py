@@ -5,10 +5,31 @@ ADK Agent for optimizing manufacturer bid selection
 Following ADK pattern: https://google.github.io/adk-docs/get-started/quickstart/
 """
 
-from google.adk.agents import Agent
+import numpy as np
+
+from .allocation import greedy_allocation
 from .data_mocks import MOCK_MAKERS, MOCK_BIDS, CURRENT_JOB, get_maker_by_id
+from agent_runtime.offload import offload, OffloadTimeout
+from agent_runtime.agent_cache import AgentCache
+from agent_runtime.compact import compact_tool
+from agent_runtime.lazy import lazy_module_attrs
+from agent_runtime.tracing import traced
+from agent_runtime.workflow_state import shares_workflow_state
+from agent_runtime.intent_router import Intent, IntentRouter, JOB_PATTERN, job_id, quantity, skill
+
 
+def _record_optimization(state, arguments, result):
+    report = result["report"]
+    state.winning_makers = [m["maker_id"] for m in report["winning_makers"]]
+    state.total_cost = float(report["total_cost"].lstrip("$").replace(",", ""))
+    state.lead_time_days = report["total_lead_time_days"]
 
+
+@traced
+@shares_workflow_state(
+    reads={"job_id": "job_id", "required_qty": "required_qty", "required_skill": "required_skill"},
+    record=_record_optimization
+)
 def optimize_bids(job_id: str, required_qty: int, required_skill: str) -> dict:
     """
     Optimizes manufacturer bid selection to fulfill a job order at the lowest total cost.
@@ -23,12 +44,14 @@ def optimize_bids(job_id: str, required_qty: int, required_skill: str) -> dict:
         dict: Supply chain optimization result with status, total_cost, lead_time, and winning_makers
     """
     
-    # Step 1: Filter bids by required skill
+    # Step 1: Filter bids by required skill (keeping each bid's maker for the report)
     filtered_bids = []
+    bid_makers = []
     for bid in MOCK_BIDS:
         maker = get_maker_by_id(bid["maker_id"])
         if maker and maker["skill"] == required_skill:
             filtered_bids.append(bid)
+            bid_makers.append(maker)
     
     if not filtered_bids:
         return {
@@ -36,26 +59,27 @@ def optimize_bids(job_id: str, required_qty: int, required_skill: str) -> dict:
             "error_message": f"No manufacturers found with skill '{required_skill}'"
         }
     
-    # Step 2: Sort bids by price per unit (ascending - cheapest first)
-    sorted_bids = sorted(filtered_bids, key=lambda x: x["bid_price_per_unit"])
+    # Step 2: Greedy algorithm - cheapest bids first until quantity is fulfilled
+    # (large bid books are solved in an offload worker; see agent_runtime/offload.py)
+    prices = np.array([bid["bid_price_per_unit"] for bid in filtered_bids], dtype=float)
+    capacities = np.array([bid["max_batch_size"] for bid in filtered_bids], dtype=np.int64)
+    try:
+        selected, assigned = offload(greedy_allocation, prices, capacities, required_qty, work=len(filtered_bids))
+    except OffloadTimeout as e:
+        return {
+            "status": "error",
+            "error_message": f"Bid optimization timed out: {e}"
+        }
     
-    # Step 3: Greedy algorithm - select bids until quantity is fulfilled
+    # Step 3: Build the winning makers from the allocation
     remaining_qty = required_qty
     winning_makers = []
     total_cost = 0.0
     max_lead_time = 0
     
-    for bid in sorted_bids:
-        if remaining_qty <= 0:
-            break
-        
-        # Get maker details
-        maker = get_maker_by_id(bid["maker_id"])
-        if not maker:
-            continue
-        
-        # Determine how much this maker will produce
-        qty_from_maker = min(remaining_qty, bid["max_batch_size"])
+    for index, qty_from_maker in zip(selected.tolist(), assigned.tolist()):
+        bid = filtered_bids[index]
+        maker = bid_makers[index]
         
         # Calculate cost for this maker's portion
         cost_from_maker = qty_from_maker * bid["bid_price_per_unit"]
@@ -98,6 +122,7 @@ def optimize_bids(job_id: str, required_qty: int, required_skill: str) -> dict:
     return result
 
 
+@traced
 def get_job_details() -> dict:
     """
     Retrieves details about the current high-demand manufacturing job KNICK_2025.
@@ -111,6 +136,7 @@ def get_job_details() -> dict:
     }
 
 
+@traced
 def list_manufacturers(skill: str = "") -> dict:
     """
     Lists all registered manufacturers in the Cornerstone network.
@@ -149,30 +175,97 @@ def list_manufacturers(skill: str = "") -> dict:
     }
 
 
+def _optimize_params(text):
+    job = job_id(text) or CURRENT_JOB["job_id"]
+    qty, required_skill = quantity(text), skill(text)
+    if job == CURRENT_JOB["job_id"]:
+        qty = qty or CURRENT_JOB["required_qty"]
+        required_skill = required_skill or CURRENT_JOB["required_skill"]
+    if qty is None or required_skill is None:
+        return None
+    return {"job_id": job, "required_qty": qty, "required_skill": required_skill}
+
+
+# Routed answers format the compact (agent-facing) tool results
+def _describe_job(result):
+    job = result["report"]
+    low, high = job["estimated_price_range"]
+    return (f"{job['job_id']}: {job['required_qty']} {job['required_skill']} units of {job['product_name']}, "
+            f"due in {job['deadline_days']} days (${low:.2f} - ${high:.2f} per unit)")
+
+
+def _describe_manufacturers(result):
+    report = result["report"]
+    names = ", ".join(f"{m['name']} ({m['skill']}, ${m['base_rate']:.2f}/unit)" for m in report["manufacturers"])
+    return f"{report['total_manufacturers']} manufacturers: {names}"
+
+
+# Common requests that map directly onto one tool call (answered without the LLM)
+INTENT_ROUTER = IntentRouter("cornerstone_orchestrator", [
+    Intent("optimize_bids", optimize_bids, [
+        r"(?:what(?:'s| is) the )?cheapest way to (?:produce|make|manufacture|fulfill) [\d,]+ (?:cnc|3d) (?:units|parts|pieces)",
+        rf"(?:optimi[sz]e|run optimization for) (?:the )?(?:bids for )?(?:{JOB_PATTERN}|the current job)(?: with [\d,]+ (?:cnc|3d) units)?",
+    ], params=_optimize_params),
+    Intent("job_details", get_job_details, [
+        r"(?:what(?:'s| is) the |show(?: me)? (?:the )?|get (?:the )?)?current job(?: details)?",
+        r"(?:what|which) jobs? (?:is|are) (?:available|open)",
+        r"(?:show(?: me)? |get )?(?:the )?job details(?: for knick_2025)?",
+        r"tell me about (?:the current job|knick_2025)",
+    ], respond=_describe_job),
+    Intent("list_manufacturers", list_manufacturers, [
+        r"(?:list|show)(?: me)?(?: all)?(?: the)?(?: (?:cnc|3d))? (?:manufacturers|makers)(?: in the network)?",
+        r"(?:which|what) (?:(?:cnc|3d) )?(?:manufacturers|makers) (?:are (?:there|available)|do we have)(?: in the network)?",
+    ], params=lambda text: {"skill": skill(text) or ""}, respond=_describe_manufacturers),
+])
+
+
+TOOLS = [
+    # Compact variants: numeric prices and costs (every winning maker is kept for logistics)
+    compact_tool(optimize_bids),
+    compact_tool(get_job_details),
+    compact_tool(list_manufacturers),
+]
+
+
+# Answers and read-only tool results are replayed until the data they depend on changes
+AGENT_CACHE = AgentCache("cornerstone_orchestrator", read_only_tools=("optimize_bids", "get_job_details", "list_manufacturers"))
+
+
 # Create the Supply Chain Orchestrator Agent (root_agent)
 # Following ADK pattern from: https://google.github.io/adk-docs/get-started/quickstart/#agentpy
-root_agent = Agent(
-    name="cornerstone_orchestrator",
-    model="gemini-2.0-flash",
-    description=(
-        "Expert supply chain optimizer for Cornerstone's decentralized micro-manufacturing network. "
-        "Analyzes bids from US-based manufacturers and selects the optimal combination to fulfill orders "
-        "at the lowest cost while meeting quality and timeline requirements."
-    ),
-    instruction=(
-        "You are the Cornerstone Supply Chain Orchestrator, an expert at optimizing manufacturing bids.\n\n"
-        "Your primary responsibilities:\n"
-        "1. When asked about job opportunities or current jobs, call get_job_details() to retrieve specifications\n"
-        "2. When asked to optimize, find cheapest manufacturers, or fulfill an order, call optimize_bids() with the job requirements\n"
-        "3. When asked about manufacturers or the network, call list_manufacturers() (optionally filtered by skill)\n\n"
-        "Key behaviors:\n"
-        "- Always prioritize cost efficiency while ensuring quality and meeting deadlines\n"
-        "- When presenting optimization results, clearly explain: total cost, lead time, number of manufacturers, and which specific makers were selected\n"
-        "- Translate technical data into business-friendly language for distributors\n"
-        "- If asked about job KNICK_2025 specifically, use: job_id='KNICK_2025', required_qty=5000, required_skill='CNC'\n\n"
-        "Example interaction:\n"
-        "User: 'What's the cheapest way to produce 5000 CNC units?'\n"
-        "You: Call optimize_bids(job_id='KNICK_2025', required_qty=5000, required_skill='CNC'), then summarize the results in natural language."
-    ),
-    tools=[optimize_bids, get_job_details, list_manufacturers],
-)
+def _build_root_agent():
+    """Creates the ADK agent. Deferred (see agent_runtime/lazy.py) so importing the tools does not load ADK."""
+    from google.adk.agents import Agent
+    from agent_runtime.local_model import resolve_model
+
+    return Agent(
+        name="cornerstone_orchestrator",
+        model=resolve_model("gemini-2.0-flash"),
+        description=(
+            "Expert supply chain optimizer for Cornerstone's decentralized micro-manufacturing network. "
+            "Analyzes bids from US-based manufacturers and selects the optimal combination to fulfill orders "
+            "at the lowest cost while meeting quality and timeline requirements."
+        ),
+        instruction=(
+            "You are the Cornerstone Supply Chain Orchestrator, an expert at optimizing manufacturing bids.\n\n"
+            "Your primary responsibilities:\n"
+            "1. When asked about job opportunities or current jobs, call get_job_details() to retrieve specifications\n"
+            "2. When asked to optimize, find cheapest manufacturers, or fulfill an order, call optimize_bids() with the job requirements\n"
+            "3. When asked about manufacturers or the network, call list_manufacturers() (optionally filtered by skill)\n\n"
+            "Key behaviors:\n"
+            "- Always prioritize cost efficiency while ensuring quality and meeting deadlines\n"
+            "- When presenting optimization results, clearly explain: total cost, lead time, number of manufacturers, and which specific makers were selected\n"
+            "- Translate technical data into business-friendly language for distributors\n"
+            "- In the orchestrated workflow, omit arguments that earlier agents already established (job_id, quantity, skill); the tools read them from the shared workflow state\n"
+            "- If asked about job KNICK_2025 specifically, use: job_id='KNICK_2025', required_qty=5000, required_skill='CNC'\n\n"
+            "Example interaction:\n"
+            "User: 'What's the cheapest way to produce 5000 CNC units?'\n"
+            "You: Call optimize_bids(job_id='KNICK_2025', required_qty=5000, required_skill='CNC'), then summarize the results in natural language."
+        ),
+        tools=TOOLS,
+        before_model_callback=INTENT_ROUTER.before_model_callback,
+        **AGENT_CACHE.callbacks()
+    )
+
+
+__getattr__ = lazy_module_attrs(globals(), root_agent=_build_root_agent)
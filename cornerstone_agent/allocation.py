@@ -0,0 +1,31 @@
+"""
+Bid Allocation Kernel
+Greedy cheapest-first allocation of a required quantity across bids, on flat arrays
+
+Kept free of the agent's dict-shaped data so it can run in an offload worker process
+(agent_runtime/offload.py): optimize_bids passes price and capacity arrays in and gets
+index and quantity arrays back.
+"""
+
+import numpy as np
+
+
+def greedy_allocation(prices, capacities, required_qty):
+    """
+    Fills `required_qty` from the cheapest bids first, each up to its capacity.
+
+    Args:
+        prices: Price per unit of each bid (float array)
+        capacities: Maximum batch size of each bid (int array)
+        required_qty: Total quantity to allocate
+
+    Returns:
+        tuple: (indices of the selected bids in fill order, quantity assigned to each)
+    """
+    # Stable sort, so equally priced bids keep their original order
+    order = np.argsort(prices, kind="stable")
+    sizes = capacities[order]
+    filled_before = np.cumsum(sizes) - sizes
+    assigned = np.clip(required_qty - filled_before, 0, sizes)
+    selected = assigned > 0
+    return order[selected], assigned[selected]
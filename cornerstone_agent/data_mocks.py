@@ -161,9 +161,16 @@ CURRENT_JOB = {
 }
 
 
+# id -> maker, with the MOCK_MAKERS length it was built at (makers are only ever appended)
+_maker_index = (0, {})
+
+
 def get_maker_by_id(maker_id: str):
-    """Helper function to retrieve maker details from MOCK_MAKERS by ID"""
-    for maker in MOCK_MAKERS:
-        if maker["id"] == maker_id:
-            return maker
-    return None
+    """Helper function to retrieve maker details from MOCK_MAKERS by ID (O(1) via an id index)"""
+    global _maker_index
+    size, index = _maker_index
+    if size != len(MOCK_MAKERS):
+        # The first maker wins a repeated id, as with a scan; the new index replaces the old whole
+        index = {maker["id"]: maker for maker in reversed(MOCK_MAKERS)}
+        _maker_index = (len(MOCK_MAKERS), index)
+    return index.get(maker_id)
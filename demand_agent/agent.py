@@ -5,30 +5,77 @@ Analyzes market trends and identifies high-demand products for manufacturing
 Following ADK pattern: https://google.github.io/adk-docs/get-started/quickstart/
 """
 
-from google.adk.agents import Agent
-from .trend_data import TRENDING_PRODUCTS, MARKET_SIGNALS, DEMAND_FORECASTS, get_product_by_id
+import re
 
+from .trend_data import MARKET_SIGNALS, DEMAND_FORECASTS, get_product_by_id
+from .signal_stream import refresh_signals
+from .catalog import CATALOG
+from .sizing import get_order_sizing, TIMEFRAME_DAYS
+from agent_runtime.cache import TTLCache, memoize_tool
+from agent_runtime.offload import OffloadTimeout
+from agent_runtime.agent_cache import AgentCache
+from agent_runtime.compact import compact_tool
+from agent_runtime.lazy import lazy_module_attrs
+from agent_runtime.tracing import traced
+from agent_runtime.workflow_state import shares_workflow_state
+from agent_runtime.intent_router import Intent, IntentRouter, PRODUCT_PATTERN, product_id, timeframe
 
-def analyze_market_trends(product_category: str = "") -> dict:
+
+# Demand results only change when signals, forecasts or the catalog change:
+# cache them per data version, pulling in new signal events before each lookup
+DEMAND_CACHE = TTLCache(max_entries=512, ttl_seconds=300, name="demand_tools")
+demand_cached = memoize_tool(DEMAND_CACHE, domains=("signals", "forecasts", "catalog"), before=refresh_signals)
+
+
+def _record_pick(state, product):
+    if product:
+        state.product_id = product["product_id"]
+        state.product_name = product["name"]
+        state.demand_score = product["demand_score"]
+
+
+def _record_trends(state, arguments, result):
+    _record_pick(state, result["report"]["recommendation"])
+
+
+def _record_recommendations(state, arguments, result):
+    _record_pick(state, result["report"]["top_pick"])
+
+
+def _record_sizing(state, arguments, result):
+    recommendations = result["report"]["recommendations"]
+    picked = [r for r in recommendations if r["product_id"] == state.product_id] or recommendations[:1]
+    if picked:
+        state.product_id = picked[0]["product_id"]
+        state.product_name = picked[0]["product_name"]
+        state.order_qty = picked[0]["recommended_qty"]
+        state.required_skill = arguments["required_skill"]
+
+
+@traced
+@shares_workflow_state(record=_record_trends)
+@demand_cached
+def analyze_market_trends(product_category: str = "", limit: int = 20, cursor: str = "") -> dict:
     """
     Analyzes market trends to identify high-demand products in a category.
     
     Args:
         product_category: Optional category filter (e.g., 'Electronics Components', 'Mobile Accessories').
                          Leave empty to see all trending products.
+        limit: Maximum number of products to return, highest demand first. Default is 20.
+        cursor: Pagination cursor from a previous call's next_cursor. Leave empty for the first page.
     
     Returns:
         dict: Market analysis with trending products, demand scores, and signals
     """
     
-    products = TRENDING_PRODUCTS
-    
-    # Filter by category if specified
-    if product_category:
-        products = [p for p in TRENDING_PRODUCTS if p["category"].lower() == product_category.lower()]
+    # Page through the score index (category filter is case-insensitive)
+    products_page, next_cursor = CATALOG.top_k(limit, category=product_category, cursor=cursor)
+    total = CATALOG.count(category=product_category)
     
-    # Sort by demand score (descending)
-    products_sorted = sorted(products, key=lambda x: x["demand_score"], reverse=True)
+    # Top pick is always the first item overall, regardless of page
+    top_products = products_page if not cursor else CATALOG.top_k(1, category=product_category)[0]
+    top_product = top_products[0] if top_products else None
     
     # Get category signals if specified
     category_signal = None
@@ -38,45 +85,56 @@ def analyze_market_trends(product_category: str = "") -> dict:
     return {
         "status": "success",
         "report": {
-            "total_products_analyzed": len(products_sorted),
+            "total_products_analyzed": total,
             "category_filter": product_category if product_category else "All Categories",
-            "trending_products": products_sorted,
+            "trending_products": products_page,
+            "next_cursor": next_cursor,
             "category_insights": category_signal,
-            "recommendation": products_sorted[0] if products_sorted else None,
-            "summary": f"Analyzed {len(products_sorted)} products. Top recommendation: {products_sorted[0]['name'] if products_sorted else 'None'} with demand score {products_sorted[0]['demand_score'] if products_sorted else 0}"
+            "recommendation": top_product,
+            "summary": f"Analyzed {total} products. Top recommendation: {top_product['name'] if top_product else 'None'} with demand score {top_product['demand_score'] if top_product else 0}"
         }
     }
 
 
-def get_product_recommendations(min_demand_score: float = 7.0) -> dict:
+@traced
+@shares_workflow_state(record=_record_recommendations)
+@demand_cached
+def get_product_recommendations(min_demand_score: float = 7.0, limit: int = 20, cursor: str = "") -> dict:
     """
     Gets product recommendations based on minimum demand threshold.
     
     Args:
         min_demand_score: Minimum demand score (0-10). Default is 7.0.
+        limit: Maximum number of products to return, highest demand first. Default is 20.
+        cursor: Pagination cursor from a previous call's next_cursor. Leave empty for the first page.
     
     Returns:
         dict: List of recommended products above the threshold
     """
     
-    # Filter products above threshold
-    recommended = [p for p in TRENDING_PRODUCTS if p["demand_score"] >= min_demand_score]
+    # Threshold is a bisect on the score index; the page is a slice
+    recommended, next_cursor = CATALOG.top_k(limit, min_score=min_demand_score, cursor=cursor)
+    total = CATALOG.count(min_score=min_demand_score)
     
-    # Sort by demand score
-    recommended_sorted = sorted(recommended, key=lambda x: x["demand_score"], reverse=True)
+    top_picks = recommended if not cursor else CATALOG.top_k(1, min_score=min_demand_score)[0]
+    top_pick = top_picks[0] if top_picks else None
     
     return {
         "status": "success",
         "report": {
             "threshold": min_demand_score,
-            "total_recommendations": len(recommended_sorted),
-            "products": recommended_sorted,
-            "top_pick": recommended_sorted[0] if recommended_sorted else None,
-            "summary": f"Found {len(recommended_sorted)} products above demand score {min_demand_score}. Top pick: {recommended_sorted[0]['name'] if recommended_sorted else 'None'}"
+            "total_recommendations": total,
+            "products": recommended,
+            "next_cursor": next_cursor,
+            "top_pick": top_pick,
+            "summary": f"Found {total} products above demand score {min_demand_score}. Top pick: {top_pick['name'] if top_pick else 'None'}"
         }
     }
 
 
+@traced
+@shares_workflow_state(reads={"product_id": "product_id"})
+@demand_cached
 def calculate_demand_forecast(product_id: str, timeframe: str = "30_days") -> dict:
     """
     Calculates demand forecast for a specific product over a timeframe.
@@ -132,32 +190,174 @@ def calculate_demand_forecast(product_id: str, timeframe: str = "30_days") -> di
     }
 
 
-# Create the Demand Analyzer Agent (root_agent)
-root_agent = Agent(
-    name="demand_analyzer",
-    model="gemini-2.0-flash",
-    description=(
-        "Market trend analyzer for Cornerstone's manufacturing network. "
-        "Analyzes social media signals, search trends, and consumer behavior to identify "
-        "high-demand products worth manufacturing. Provides demand forecasts and recommendations."
-    ),
-    instruction=(
-        "You are the Cornerstone Demand Analyzer, an expert at identifying market opportunities.\n\n"
-        "Your primary responsibilities:\n"
-        "1. When asked about market trends or what to manufacture, call analyze_market_trends() to show trending products\n"
-        "2. When asked for recommendations, call get_product_recommendations() with appropriate threshold\n"
-        "3. When asked about future demand or forecasts, call calculate_demand_forecast() for specific products\n\n"
-        "Key behaviors:\n"
-        "- Always explain demand scores (0-10 scale, higher is better)\n"
-        "- Highlight market signals (social media mentions, search trends)\n"
-        "- Recommend products with demand score > 8.0 for immediate manufacturing\n"
-        "- Explain confidence levels in forecasts\n"
-        "- Translate data into actionable business recommendations\n\n"
-        "Example interactions:\n"
-        "User: 'What products are trending right now?'\n"
-        "You: Call analyze_market_trends(), then summarize top 3 products with their demand scores and signals.\n\n"
-        "User: 'Should we manufacture the Widget Bracket?'\n"
-        "You: Call calculate_demand_forecast(product_id='PROD_001', timeframe='30_days'), then provide recommendation based on forecast."
-    ),
-    tools=[analyze_market_trends, get_product_recommendations, calculate_demand_forecast],
+@traced
+@shares_workflow_state(reads={"product_ids": "product_id"}, record=_record_sizing)
+def size_order_quantities(product_ids: str = "", timeframe: str = "30_days", required_skill: str = "CNC", limit: int = 10) -> dict:
+    """
+    Recommends how many units to order for each product by simulating demand scenarios
+    from its forecast and maximizing expected margin against the bid cost curve.
+    
+    Args:
+        product_ids: Optional comma-separated product IDs (e.g., 'PROD_001,PROD_003'). Leave empty for the whole catalog.
+        timeframe: Forecast period - '30_days', '60_days', or '90_days'. Default is '30_days'.
+        required_skill: Manufacturing skill whose bids set the cost curve ('CNC' or '3D'). Default is 'CNC'.
+        limit: Maximum number of products to return, highest expected margin first. Default is 10.
+    
+    Returns:
+        dict: Recommended order quantities with expected margin and stockout risk per product
+    """
+    
+    if timeframe not in TIMEFRAME_DAYS:
+        return {
+            "status": "error",
+            "error_message": f"Invalid timeframe. Use '30_days', '60_days', or '90_days'."
+        }
+    
+    try:
+        sizing, cached = get_order_sizing(timeframe, required_skill)
+    except OffloadTimeout as e:
+        return {
+            "status": "error",
+            "error_message": f"Order sizing timed out: {e}"
+        }
+    
+    if not sizing:
+        return {
+            "status": "error",
+            "error_message": f"No bids found for skill '{required_skill}' to build a cost curve."
+        }
+    
+    # Select requested products (or the whole catalog)
+    if product_ids:
+        requested = [p.strip() for p in product_ids.split(',')]
+        missing = [p for p in requested if p not in sizing]
+        if missing:
+            return {
+                "status": "error",
+                "error_message": f"Product(s) not found in trend database: {', '.join(missing)}"
+            }
+        results = [sizing[p] for p in requested]
+    else:
+        results = list(sizing.values())
+    
+    results_sorted = sorted(results, key=lambda x: x["expected_margin"], reverse=True)[:limit]
+    top = results_sorted[0] if results_sorted else None
+    
+    return {
+        "status": "success",
+        "report": {
+            "timeframe": timeframe,
+            "required_skill": required_skill,
+            "products_sized": len(results),
+            "from_cache": cached,
+            "recommendations": results_sorted,
+            "summary": f"Sized {len(results)} products over {timeframe.replace('_', ' ')}. Best opportunity: {top['product_name']} - order {top['recommended_qty']} units for expected margin ${top['expected_margin']:,.2f}" if top else "No products sized."
+        }
+    }
+
+
+def _category_params(text):
+    lowered = text.lower()
+    matches = [c for c in CATALOG.categories() if c.lower() in lowered]
+    return {"product_category": matches[0] if matches else ""}
+
+
+def _recommendation_params(text):
+    threshold = re.search(r"(?:above|over|at least|>=?)\s*(?:a\s+)?(?:demand\s+)?(?:score\s+)?(?:of\s+)?(\d+(?:\.\d+)?)", text)
+    return {"min_demand_score": float(threshold.group(1))} if threshold else {}
+
+
+def _forecast_params(text):
+    product = product_id(text)
+    if product is None:
+        return None
+    return {"product_id": product, "timeframe": timeframe(text) or "30_days"}
+
+
+def _sizing_params(text):
+    product = product_id(text)
+    return {"product_ids": product or "", "timeframe": timeframe(text) or "30_days"}
+
+
+# Common requests that map directly onto one tool call (answered without the LLM)
+INTENT_ROUTER = IntentRouter("demand_analyzer", [
+    Intent("market_trends", analyze_market_trends, [
+        r"(?:what|which) (?:products|items) are trending(?: right now| now| today)?",
+        r"(?:show|list|get)(?: me)? (?:the )?trending products",
+        r"(?:analy[sz]e|show(?: me)?) (?:the )?market trends(?: for [a-z ]+)?",
+        r"what(?:'s| is) trending(?: (?:in|for) [a-z ]+)?",
+    ], params=_category_params),
+    Intent("recommendations", get_product_recommendations, [
+        r"what should (?:we|i) (?:manufacture|make|produce)(?: next)?",
+        r"(?:give me |show(?: me)? |get )?(?:product )?recommendations(?: (?:above|over) (?:a )?(?:demand )?score(?: of)? \d+(?:\.\d+)?)?",
+        r"recommend(?: some)? products(?: to (?:manufacture|make))?(?: with (?:a )?(?:demand )?score (?:above|over|of at least) \d+(?:\.\d+)?)?",
+    ], params=_recommendation_params),
+    Intent("demand_forecast", calculate_demand_forecast, [
+        rf"(?:what(?:'s| is) the )?(?:demand )?forecast (?:for|of) {PRODUCT_PATTERN}(?: (?:over|for) (?:the next )?(?:30|60|90)[ _]days)?",
+        rf"forecast (?:the )?demand (?:for|of) {PRODUCT_PATTERN}(?: (?:over|for) (?:the next )?(?:30|60|90)[ _]days)?",
+    ], params=_forecast_params),
+    Intent("size_orders", size_order_quantities, [
+        rf"how many (?:units )?(?:of )?{PRODUCT_PATTERN} should (?:we|i) (?:order|make|produce)(?: (?:over|for) (?:the next )?(?:30|60|90)[ _]days)?",
+        rf"size (?:the )?orders?(?: for {PRODUCT_PATTERN})?",
+    ], params=_sizing_params),
+])
+
+
+TOOLS = [
+    # Compact variants: ranked lists cut to the top 5, duplicated top picks dropped
+    compact_tool(analyze_market_trends, drop=("recommendation",), top_k=5),
+    compact_tool(get_product_recommendations, drop=("top_pick",), top_k=5),
+    compact_tool(calculate_demand_forecast),
+    compact_tool(size_order_quantities, drop=("from_cache",), top_k=5),
+]
+
+
+# Answers and read-only tool results are replayed until the data they depend on changes
+AGENT_CACHE = AgentCache(
+    "demand_analyzer",
+    read_only_tools=("analyze_market_trends", "get_product_recommendations", "calculate_demand_forecast", "size_order_quantities"),
+    refresh=refresh_signals
 )
+
+
+# Create the Demand Analyzer Agent (root_agent)
+def _build_root_agent():
+    """Creates the ADK agent. Deferred (see agent_runtime/lazy.py) so importing the tools does not load ADK."""
+    from google.adk.agents import Agent
+    from agent_runtime.local_model import resolve_model
+
+    return Agent(
+        name="demand_analyzer",
+        model=resolve_model("gemini-2.0-flash"),
+        description=(
+            "Market trend analyzer for Cornerstone's manufacturing network. "
+            "Analyzes social media signals, search trends, and consumer behavior to identify "
+            "high-demand products worth manufacturing. Provides demand forecasts and recommendations."
+        ),
+        instruction=(
+            "You are the Cornerstone Demand Analyzer, an expert at identifying market opportunities.\n\n"
+            "Your primary responsibilities:\n"
+            "1. When asked about market trends or what to manufacture, call analyze_market_trends() to show trending products\n"
+            "2. When asked for recommendations, call get_product_recommendations() with appropriate threshold\n"
+            "3. When asked about future demand or forecasts, call calculate_demand_forecast() for specific products\n"
+            "4. When asked how many units to order or produce, call size_order_quantities() for the products in question\n\n"
+            "Key behaviors:\n"
+            "- Always explain demand scores (0-10 scale, higher is better)\n"
+            "- Highlight market signals (social media mentions, search trends)\n"
+            "- Recommend products with demand score > 8.0 for immediate manufacturing\n"
+            "- Explain confidence levels in forecasts\n"
+            "- Translate data into actionable business recommendations\n"
+            "- In the orchestrated workflow, omit arguments that earlier agents already established (the product being sized or forecast); the tools read them from the shared workflow state\n\n"
+            "Example interactions:\n"
+            "User: 'What products are trending right now?'\n"
+            "You: Call analyze_market_trends(), then summarize top 3 products with their demand scores and signals.\n\n"
+            "User: 'Should we manufacture the Widget Bracket?'\n"
+            "You: Call calculate_demand_forecast(product_id='PROD_001', timeframe='30_days'), then provide recommendation based on forecast."
+        ),
+        tools=TOOLS,
+        before_model_callback=INTENT_ROUTER.before_model_callback,
+        **AGENT_CACHE.callbacks()
+    )
+
+
+__getattr__ = lazy_module_attrs(globals(), root_agent=_build_root_agent)
@@ -0,0 +1,174 @@
+"""
+Product Catalog Index
+Indexed view over TRENDING_PRODUCTS for fast lookups, threshold queries and top-k ranking
+
+- id hash index: O(1) product lookup
+- case-insensitive category index: category -> product ids
+- score order: list of (-demand_score, product_id) kept sorted, so threshold queries
+  and cursor pages are a bisect plus a slice
+- category top-k: heap selection over the category's products only
+
+Cursors are opaque strings encoding the (score, product_id) of the last item returned.
+"""
+
+import base64
+import heapq
+import threading
+from bisect import bisect_right, insort
+
+from agent_runtime.data_versions import bump_version
+from .trend_data import TRENDING_PRODUCTS
+
+
+def _score_key(product):
+    """Sort key: highest demand score first, ties broken by product id."""
+    return (-product["demand_score"], product["product_id"])
+
+
+def encode_cursor(key):
+    """Encodes a score key as an opaque pagination cursor."""
+    raw = f"{-key[0]!r}|{key[1]}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    """Decodes a pagination cursor back into a score key. Returns None if invalid."""
+    if not cursor:
+        return None
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        score, product_id = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        return (-float(score), product_id)
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+
+class ProductCatalog:
+    """Id, category and score indexes over a list of product dicts."""
+
+    def __init__(self, products=()):
+        self._lock = threading.RLock()
+        self.load(products)
+
+    def load(self, products):
+        """Rebuilds every index from `products`."""
+        with self._lock:
+            self._by_id = {}
+            self._by_category = {}
+            self._category_names = {}
+            self._keys = {}
+            for product in products:
+                self._by_id[product["product_id"]] = product
+                self._by_category.setdefault(product["category"].lower(), set()).add(product["product_id"])
+                self._category_names.setdefault(product["category"].lower(), product["category"])
+                self._keys[product["product_id"]] = _score_key(product)
+            self._order = sorted(self._keys.values())
+        bump_version("catalog")
+
+    def add(self, product):
+        """Adds or replaces a single product."""
+        with self._lock:
+            self.remove(product["product_id"])
+            self._by_id[product["product_id"]] = product
+            self._by_category.setdefault(product["category"].lower(), set()).add(product["product_id"])
+            self._category_names.setdefault(product["category"].lower(), product["category"])
+            key = _score_key(product)
+            self._keys[product["product_id"]] = key
+            insort(self._order, key)
+        bump_version("catalog")
+
+    def remove(self, product_id):
+        """Drops a product from every index."""
+        with self._lock:
+            product = self._by_id.pop(product_id, None)
+            if not product:
+                return
+            self._by_category.get(product["category"].lower(), set()).discard(product_id)
+            self._discard_key(self._keys.pop(product_id))
+        bump_version("catalog")
+
+    def reindex(self, product):
+        """Repositions a product whose demand_score changed in place."""
+        with self._lock:
+            old_key = self._keys.get(product["product_id"])
+            new_key = _score_key(product)
+            if old_key == new_key:
+                return
+            if old_key is not None:
+                self._discard_key(old_key)
+            self._keys[product["product_id"]] = new_key
+            insort(self._order, new_key)
+
+    def _discard_key(self, key):
+        i = bisect_right(self._order, key) - 1
+        if i >= 0 and self._order[i] == key:
+            del self._order[i]
+
+    # ------------------------------------------------------------------
+    # Queries
+    # ------------------------------------------------------------------
+
+    def get(self, product_id):
+        """O(1) lookup by product id."""
+        return self._by_id.get(product_id)
+
+    def __len__(self):
+        return len(self._by_id)
+
+    def categories(self):
+        """Category names (as first seen) that currently have products."""
+        with self._lock:
+            return sorted(self._category_names[c] for c, ids in self._by_category.items() if ids)
+
+    def count(self, category="", min_score=None):
+        """Number of products in a category (or all) and/or at or above a score threshold."""
+        with self._lock:
+            if category:
+                ids = self._by_category.get(category.lower(), ())
+                if min_score is None:
+                    return len(ids)
+                return sum(1 for pid in ids if self._by_id[pid]["demand_score"] >= min_score)
+            if min_score is None:
+                return len(self._order)
+            return bisect_right(self._order, -min_score, key=lambda k: k[0])
+
+    def top_k(self, k, category="", min_score=None, cursor=""):
+        """
+        Returns up to `k` products ordered by demand score (descending), starting after `cursor`.
+        `k` below 1 is treated as 1.
+
+        Returns:
+            tuple: (products, next_cursor) where next_cursor is "" on the last page
+        """
+        k = max(1, k)
+        after = decode_cursor(cursor)
+        with self._lock:
+            if category:
+                keys = self._category_page(category, k, min_score, after)
+                has_more = len(keys) > k
+            else:
+                start = bisect_right(self._order, after) if after else 0
+                end = len(self._order)
+                if min_score is not None:
+                    end = bisect_right(self._order, -min_score, key=lambda key: key[0])
+                keys = self._order[start:min(start + k + 1, end)]
+                has_more = len(keys) > k
+
+            keys = keys[:k]
+            products = [self._by_id[key[1]] for key in keys]
+            next_cursor = encode_cursor(keys[-1]) if has_more and keys else ""
+            return products, next_cursor
+
+    def _category_page(self, category, k, min_score, after):
+        ids = self._by_category.get(category.lower(), ())
+        candidates = (self._keys[pid] for pid in ids)
+        if min_score is not None:
+            candidates = (key for key in candidates if -key[0] >= min_score)
+        if after:
+            candidates = (key for key in candidates if key > after)
+        # One extra item tells us whether another page exists
+        return heapq.nsmallest(k + 1, candidates)
+
+
+# Shared catalog over the mock product data
+CATALOG = ProductCatalog(TRENDING_PRODUCTS)
@@ -0,0 +1,301 @@
+"""
+Demand Signal Stream
+Windowed aggregation of raw market signal events into live demand scores
+
+Signal events are read from NDJSON files in a local feed directory, one event per line:
+    {"ts": "2025-10-19T14:03:00", "product_id": "PROD_001", "source": "reddit", "value": 3}
+
+`ts` may be an ISO timestamp or epoch seconds; `value` defaults to 1 (one mention). Events
+with an unknown product, no source, a bad timestamp or a value that is not a finite,
+non-negative number are counted in `events_dropped`.
+Each (product, source) pair keeps a ring buffer of per-minute buckets covering the
+current and previous window, with running sums, so every event is an O(1) update and
+a product's `demand_score`, `trend` and `signals` are rescored from its own sources only.
+"""
+
+import json
+import math
+import os
+import threading
+import time
+from datetime import datetime
+
+from agent_runtime.data_versions import bump_version
+from .trend_data import TRENDING_PRODUCTS, get_product_by_id
+from .catalog import CATALOG
+
+
+# Feed configuration
+SIGNAL_FEED_DIR = os.environ.get(
+    "CORNERSTONE_SIGNAL_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "signals")
+)
+BUCKET_SECONDS = 60          # 1-minute buckets
+WINDOW_BUCKETS = 60          # 1-hour sliding window (compared against the hour before it)
+POLL_INTERVAL_SECONDS = 5.0  # How often reads are allowed to check the feed for new lines
+
+# Scoring configuration
+RISING_GROWTH = 1.10
+DECLINING_GROWTH = 0.90
+GROWTH_WEIGHT = 2.0          # Score points per doubling of signal volume
+SMOOTHING = 10.0             # Pseudo-events added to both windows so sparse sources don't swing scores
+
+
+class RingWindow:
+    """Ring buffer of bucket counts with running sums for the current and previous window."""
+
+    __slots__ = ("window", "size", "counts", "head", "current", "previous")
+
+    def __init__(self, window_buckets=WINDOW_BUCKETS):
+        self.window = window_buckets
+        self.size = 2 * window_buckets
+        self.counts = [0.0] * self.size
+        self.head = None      # Latest bucket id seen
+        self.current = 0.0    # Sum of buckets (head - window, head]
+        self.previous = 0.0   # Sum of buckets (head - 2*window, head - window]
+
+    def advance(self, bucket):
+        """Slide the window forward so `bucket` is the head, expiring old buckets."""
+        if self.head is None:
+            self.head = bucket
+            return
+        steps = bucket - self.head
+        if steps <= 0:
+            return
+        if steps >= self.size:
+            self.counts = [0.0] * self.size
+            self.current = self.previous = 0.0
+            self.head = bucket
+            return
+        for b in range(self.head + 1, bucket + 1):
+            # Bucket b - window leaves the current window and joins the previous one
+            moving = self.counts[(b - self.window) % self.size]
+            self.current -= moving
+            self.previous += moving
+            # Bucket b - 2*window expires; its slot is reused for bucket b
+            slot = b % self.size
+            self.previous -= self.counts[slot]
+            self.counts[slot] = 0.0
+        self.head = bucket
+        self.current = max(0.0, self.current)
+        self.previous = max(0.0, self.previous)
+
+    def add(self, bucket, value):
+        """Add `value` to `bucket`. Returns False if the event is too old to count."""
+        if self.head is None or bucket > self.head:
+            self.advance(bucket)
+        age = self.head - bucket
+        if age >= self.size:
+            return False
+        self.counts[bucket % self.size] += value
+        if age < self.window:
+            self.current += value
+        else:
+            self.previous += value
+        return True
+
+    @property
+    def growth(self):
+        """Current window volume relative to the previous window (smoothed)."""
+        return (self.current + SMOOTHING) / (self.previous + SMOOTHING)
+
+
+class SignalAggregator:
+    """Maintains per-product, per-source windows and keeps TRENDING_PRODUCTS scores live."""
+
+    def __init__(self, products, window_buckets=WINDOW_BUCKETS, bucket_seconds=BUCKET_SECONDS):
+        self.window_buckets = window_buckets
+        self.bucket_seconds = bucket_seconds
+        self.windows = {}  # product_id -> {source: RingWindow}
+        self.baseline_scores = {p["product_id"]: p["demand_score"] for p in products}
+        self.events_ingested = 0
+        self.events_dropped = 0
+        self.version = 0   # Bumped whenever a product's live score changes
+        self._file_offsets = {}  # path -> (inode, byte offset)
+        self._last_poll = 0.0
+        self._last_tick = None
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Ingestion
+    # ------------------------------------------------------------------
+
+    def ingest_event(self, event):
+        """Applies a single signal event and rescores its product."""
+        with self._lock:
+            version = self.version
+            self._ingest(event)
+            changed = self.version != version
+        if changed:
+            bump_version("signals")
+
+    def _ingest(self, event):
+        product_id = event.get("product_id")
+        source = event.get("source")
+        product = get_product_by_id(product_id)
+        ts = _parse_timestamp(event.get("ts"))
+        value = _parse_value(event.get("value", 1))
+        if not product or not source or ts is None or value is None:
+            self.events_dropped += 1
+            return
+
+        sources = self.windows.setdefault(product_id, {})
+        window = sources.get(source)
+        if window is None:
+            window = sources[source] = RingWindow(self.window_buckets)
+            # New sources start aligned with the product's other windows
+            head = max((w.head for w in sources.values() if w.head is not None), default=None)
+            if head is not None:
+                window.head = head
+
+        bucket = int(ts // self.bucket_seconds)
+        if not window.add(bucket, value):
+            self.events_dropped += 1
+            return
+
+        for other in sources.values():
+            other.advance(bucket)
+
+        self.events_ingested += 1
+        self._rescore(product, sources)
+
+    def poll(self, feed_dir=SIGNAL_FEED_DIR, force=False):
+        """
+        Reads lines appended to the feed's NDJSON files since the last poll.
+        Throttled to POLL_INTERVAL_SECONDS unless `force` is set.
+        """
+        now = time.time()
+        with self._lock:
+            if not force and now - self._last_poll < POLL_INTERVAL_SECONDS:
+                return 0
+            self._last_poll = now
+            version = self.version
+
+            ingested = 0
+            if os.path.isdir(feed_dir):
+                for entry in sorted(os.scandir(feed_dir), key=lambda e: e.name):
+                    if entry.is_file() and entry.name.endswith(".ndjson"):
+                        ingested += self._read_new_lines(entry)
+
+            self._tick(now)
+            changed = self.version != version
+
+        # One 'signals' bump per poll, however many events it folded in
+        if changed:
+            bump_version("signals")
+        return ingested
+
+    def _read_new_lines(self, entry):
+        stat = entry.stat()
+        inode, offset = self._file_offsets.get(entry.path, (stat.st_ino, 0))
+        if inode != stat.st_ino or stat.st_size < offset:
+            offset = 0  # File was rotated or truncated
+        if stat.st_size == offset:
+            return 0
+
+        count = 0
+        with open(entry.path, "rb") as f:
+            f.seek(offset)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    break  # Partial line still being written; pick it up next poll
+                offset += len(raw)
+                line = raw.strip()
+                if not line:
+                    continue
+                try:
+                    self._ingest(json.loads(line))
+                    count += 1
+                except (ValueError, TypeError, AttributeError):
+                    self.events_dropped += 1
+
+        self._file_offsets[entry.path] = (stat.st_ino, offset)
+        return count
+
+    def _tick(self, now):
+        """Slides every window to the current bucket so quiet products decay."""
+        bucket = int(now // self.bucket_seconds)
+        if bucket == self._last_tick:
+            return
+        self._last_tick = bucket
+        for product_id, sources in self.windows.items():
+            for window in sources.values():
+                window.advance(bucket)
+            product = get_product_by_id(product_id)
+            if product:
+                self._rescore(product, sources)
+
+    # ------------------------------------------------------------------
+    # Scoring
+    # ------------------------------------------------------------------
+
+    def _rescore(self, product, sources):
+        current = sum(w.current for w in sources.values())
+        previous = sum(w.previous for w in sources.values())
+        growth = (current + SMOOTHING) / (previous + SMOOTHING)
+
+        baseline = self.baseline_scores.get(product["product_id"], product["demand_score"])
+        score = round(min(10.0, max(0.0, baseline + GROWTH_WEIGHT * math.log2(growth))), 1)
+
+        if growth >= RISING_GROWTH:
+            trend = "rising"
+        elif growth <= DECLINING_GROWTH:
+            trend = "declining"
+        else:
+            trend = "stable"
+
+        signals = [
+            f"{source.replace('_', ' ').title()} mentions {(w.growth - 1) * 100:+.0f}%"
+            for source, w in sorted(sources.items(), key=lambda kv: kv[1].current, reverse=True)
+            if w.current or w.previous
+        ]
+
+        if (score, trend, signals) != (product["demand_score"], product["trend"], product["signals"]):
+            product["demand_score"] = score
+            product["trend"] = trend
+            product["signals"] = signals
+            CATALOG.reindex(product)
+            self.version += 1
+
+    def get_stats(self):
+        """Returns ingestion counters for monitoring."""
+        return {
+            "feed_dir": SIGNAL_FEED_DIR,
+            "events_ingested": self.events_ingested,
+            "events_dropped": self.events_dropped,
+            "products_tracked": len(self.windows),
+            "files_tracked": len(self._file_offsets),
+            "version": self.version
+        }
+
+
+def _parse_timestamp(value):
+    """Accepts epoch seconds or an ISO-8601 string; returns epoch seconds or None."""
+    if isinstance(value, (int, float)):
+        return float(value) if math.isfinite(value) else None
+    if isinstance(value, str):
+        try:
+            return datetime.fromisoformat(value).timestamp()
+        except ValueError:
+            return None
+    return None
+
+
+def _parse_value(value):
+    """Returns the event's signal count as a finite, non-negative float, or None."""
+    try:
+        value = float(value)
+    except (TypeError, ValueError):
+        return None
+    if not math.isfinite(value) or value < 0:
+        return None
+    return value
+
+
+# Shared aggregator over the mock product catalog
+SIGNAL_AGGREGATOR = SignalAggregator(TRENDING_PRODUCTS)
+
+
+def refresh_signals(force=False):
+    """Pulls any new signal events into the live scores (cheap no-op between polls)."""
+    return SIGNAL_AGGREGATOR.poll(force=force)
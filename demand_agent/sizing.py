@@ -0,0 +1,207 @@
+"""
+Order Quantity Sizing
+Vectorized Monte Carlo forecast-to-quantity sizing across the whole catalog
+
+Each product's demand over a timeframe is modelled as lognormal around its forecast
+volume, with spread widening as forecast confidence drops. Units are bought along the
+bid cost curve (cheapest bids first, as in optimize_bids) and sold at the top of the
+product's price range; unsold units are written off. For every product we evaluate a
+grid of candidate order quantities and pick the one with the highest expected margin.
+
+All draws x products x candidates are evaluated in a handful of NumPy array operations:
+draws share one sorted standard-normal sample, so "how many draws fall below Q" is a
+single searchsorted over every (product, candidate) pair at once. The solve itself
+(order_sizing_kernel) only sees flat per-product arrays, so large catalogs can run it
+in an offload worker process.
+"""
+
+import re
+import threading
+
+import numpy as np
+
+from cornerstone_agent.data_mocks import MOCK_BIDS, get_maker_by_id
+from agent_runtime.data_versions import version_snapshot
+from agent_runtime.offload import offload
+from .trend_data import TRENDING_PRODUCTS, DEMAND_FORECASTS
+
+
+DEFAULT_DRAWS = 2000
+GRID_POINTS = 101            # Candidate quantities per product, from 0 to the upper bound
+MAX_MULTIPLE_OF_FORECAST = 2.0
+DEFAULT_CONFIDENCE = 0.70    # Used for products with no forecast on record
+CV_FLOOR = 0.05              # Minimum coefficient of variation, even at 100% confidence
+RANDOM_SEED = 2025
+
+TIMEFRAME_DAYS = {"30_days": 30, "60_days": 60, "90_days": 90}
+
+# Cache of full-catalog sizing runs, keyed by forecast/catalog version and parameters
+_SIZING_CACHE = {}
+_SIZING_CACHE_LOCK = threading.Lock()
+_MAX_CACHED_RUNS = 16
+
+
+def _parse_price_range(price_range):
+    """'$2.20 - $3.20' -> (2.20, 3.20)"""
+    prices = [float(p) for p in re.findall(r"\d+(?:\.\d+)?", price_range or "")]
+    if not prices:
+        return None, None
+    return min(prices), max(prices)
+
+
+def build_cost_curve(required_skill):
+    """
+    Builds the cumulative bid cost curve for a skill: cheapest bids fill first.
+
+    Returns:
+        tuple: (cumulative_qty, cumulative_cost, cheapest_price) arrays starting at 0,
+               or None if no bids match the skill
+    """
+    ladder = []
+    for bid in MOCK_BIDS:
+        maker = get_maker_by_id(bid["maker_id"])
+        if maker and maker["skill"] == required_skill:
+            ladder.append((bid["bid_price_per_unit"], bid["max_batch_size"]))
+    if not ladder:
+        return None
+
+    ladder.sort()
+    prices = np.array([price for price, _ in ladder])
+    sizes = np.array([size for _, size in ladder], dtype=float)
+    cumulative_qty = np.concatenate(([0.0], np.cumsum(sizes)))
+    cumulative_cost = np.concatenate(([0.0], np.cumsum(prices * sizes)))
+    return cumulative_qty, cumulative_cost, prices[0]
+
+
+def _forecast_inputs(products, timeframe):
+    """Per-product (mean volume, confidence) arrays for a timeframe."""
+    days = TIMEFRAME_DAYS[timeframe]
+    means = np.empty(len(products))
+    confidences = np.empty(len(products))
+    for i, product in enumerate(products):
+        forecast = DEMAND_FORECASTS.get(product["product_id"], {}).get(timeframe)
+        if forecast:
+            means[i] = forecast["volume"]
+            confidences[i] = forecast["confidence"]
+        else:
+            # Fall back to the 30-day estimate, scaled to the timeframe
+            means[i] = product.get("estimated_volume", 0) * days / 30
+            confidences[i] = DEFAULT_CONFIDENCE
+    return means, confidences
+
+
+def _standard_normal_sorted(num_draws):
+    rng = np.random.default_rng(RANDOM_SEED)
+    return np.sort(rng.standard_normal(num_draws))
+
+
+def order_sizing_kernel(means, confidences, cost_scale, sale_price, cumulative_qty, cumulative_cost, num_draws):
+    """
+    The Monte Carlo solve on flat per-product arrays (runs inline or in an offload worker).
+
+    Returns:
+        tuple: per-product arrays (recommended_qty, expected_margin, expected_units_sold,
+               stockout_probability, forecast_qty_margin)
+    """
+    num_products = len(means)
+    capacity = cumulative_qty[-1]
+
+    # Lognormal demand: D = exp(mu + sigma * Z), matching the forecast mean
+    cv = np.maximum(1.0 - confidences, 0.0) + CV_FLOOR
+    sigma = np.sqrt(np.log1p(cv ** 2))
+    mu = np.log(np.maximum(means, 1.0)) - sigma ** 2 / 2
+
+    z = _standard_normal_sorted(num_draws)                        # (N,)
+    demand = np.exp(mu[:, None] + sigma[:, None] * z[None, :])    # (P, N), sorted per row
+    demand_cumsum = np.concatenate(
+        (np.zeros((num_products, 1)), np.cumsum(demand, axis=1)), axis=1
+    )                                                             # (P, N + 1)
+
+    # Candidate order quantities per product
+    upper = np.minimum(np.maximum(means, 1.0) * MAX_MULTIPLE_OF_FORECAST, capacity)
+    grid = np.linspace(0.0, 1.0, GRID_POINTS)[None, :] * upper[:, None]   # (P, G)
+    grid = np.floor(grid)
+
+    def evaluate(quantities):
+        # Number of draws with demand below each candidate quantity, for all pairs at once
+        with np.errstate(divide="ignore"):
+            thresholds = (np.log(quantities) - mu[:, None]) / sigma[:, None]
+        below = np.searchsorted(z, thresholds.ravel()).reshape(quantities.shape)
+        rows = np.arange(num_products)[:, None]
+        units_sold = (demand_cumsum[rows, below] + quantities * (num_draws - below)) / num_draws
+        cost = cost_scale[:, None] * np.interp(quantities, cumulative_qty, cumulative_cost)
+        margin = sale_price[:, None] * units_sold - cost
+        stockout = 1.0 - below / num_draws
+        return margin, units_sold, stockout
+
+    margin, units_sold, stockout = evaluate(grid)
+    best = np.argmax(margin, axis=1)
+    rows = np.arange(num_products)
+
+    # Baseline: order exactly the point forecast (capped at network capacity)
+    naive_qty = np.minimum(np.floor(means), capacity)[:, None]
+    naive_margin, _, _ = evaluate(naive_qty)
+
+    return grid[rows, best], margin[rows, best], units_sold[rows, best], stockout[rows, best], naive_margin[:, 0]
+
+
+def simulate_order_sizing(products, timeframe="30_days", required_skill="CNC", num_draws=DEFAULT_DRAWS):
+    """
+    Picks the expected-margin-maximizing order quantity for every product in one pass.
+    Large catalogs are solved in an offload worker process.
+
+    Returns:
+        dict: product_id -> sizing result
+
+    Raises:
+        OffloadTimeout: If the offloaded solve overran its timeout
+    """
+    curve = build_cost_curve(required_skill)
+    if curve is None or not products:
+        return {}
+    cumulative_qty, cumulative_cost, cheapest_price = curve
+
+    means, confidences = _forecast_inputs(products, timeframe)
+    price_ranges = [_parse_price_range(p.get("price_range")) for p in products]
+    cost_low = np.array([low if low is not None else cheapest_price for low, _ in price_ranges])
+    sale_price = np.array([high if high is not None else cheapest_price for _, high in price_ranges])
+    # Each product's cost curve is the skill's bid ladder scaled to its own price floor
+    cost_scale = cost_low / cheapest_price
+
+    qty, margin, units_sold, stockout, naive_margin = offload(
+        order_sizing_kernel, means, confidences, cost_scale, sale_price, cumulative_qty, cumulative_cost, num_draws,
+        work=len(products) * num_draws
+    )
+
+    results = {}
+    for i, product in enumerate(products):
+        results[product["product_id"]] = {
+            "product_id": product["product_id"],
+            "product_name": product["name"],
+            "forecast_volume": int(means[i]),
+            "forecast_confidence": float(confidences[i]),
+            "recommended_qty": int(qty[i]),
+            "expected_margin": round(float(margin[i]), 2),
+            "expected_units_sold": round(float(units_sold[i]), 1),
+            "stockout_probability": round(float(stockout[i]), 3),
+            "forecast_qty_margin": round(float(naive_margin[i]), 2),
+            "sale_price_per_unit": float(sale_price[i])
+        }
+    return results
+
+
+def get_order_sizing(timeframe="30_days", required_skill="CNC", num_draws=DEFAULT_DRAWS):
+    """Full-catalog sizing, cached per forecast/catalog version and parameters."""
+    key = (version_snapshot(("forecasts", "catalog")), timeframe, required_skill, num_draws)
+    with _SIZING_CACHE_LOCK:
+        cached = _SIZING_CACHE.get(key)
+    if cached is not None:
+        return cached, True
+
+    results = simulate_order_sizing(list(TRENDING_PRODUCTS), timeframe, required_skill, num_draws)
+
+    with _SIZING_CACHE_LOCK:
+        if len(_SIZING_CACHE) >= _MAX_CACHED_RUNS:
+            _SIZING_CACHE.pop(next(iter(_SIZING_CACHE)))
+        _SIZING_CACHE[key] = results
+    return results, False
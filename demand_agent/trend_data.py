@@ -3,6 +3,8 @@ Demand Analyzer Mock Data
 Market trend signals and demand forecasts
 """
 
+from agent_runtime.data_versions import bump_version, get_version
+
 # Trending Products from Market Analysis
 TRENDING_PRODUCTS = [
     {
@@ -98,9 +100,16 @@ DEMAND_FORECASTS = {
     }
 }
 
+def update_demand_forecast(product_id, timeframe, volume, confidence):
+    """Records a new forecast for a product/timeframe and bumps the 'forecasts' data version"""
+    DEMAND_FORECASTS.setdefault(product_id, {})[timeframe] = {"volume": volume, "confidence": confidence}
+    return bump_version("forecasts")
+
+def get_forecast_version():
+    """Current forecast data version"""
+    return get_version("forecasts")
+
 def get_product_by_id(product_id):
-    """Helper to retrieve product by ID"""
-    for product in TRENDING_PRODUCTS:
-        if product["product_id"] == product_id:
-            return product
-    return None
+    """Helper to retrieve product by ID (O(1) via the catalog's id index)"""
+    from .catalog import CATALOG
+    return CATALOG.get(product_id)
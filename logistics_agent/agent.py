@@ -5,15 +5,34 @@ Plans shipping, consolidation, and delivery for manufactured products
 Following ADK pattern: https://google.github.io/adk-docs/get-started/quickstart/
 """
 
-from google.adk.agents import Agent
 from datetime import datetime, timedelta
 from .shipping_data import (
     CONSOLIDATION_CENTERS, SHIPPING_RATES, LOGISTICS_PLANS, 
-    SHIPMENT_TRACKING, get_logistics_plan, calculate_shipping_cost, 
+    SHIPMENT_TRACKING, SHIPMENT_STATUSES, get_logistics_plan, calculate_shipping_cost, 
     find_nearest_consolidation_center
 )
+from agent_runtime.read_model import DASHBOARD
+from agent_runtime.shared_state import register_shared, commit_change, mutates_shared_state
+from agent_runtime.agent_cache import AgentCache
+from agent_runtime.compact import compact_tool
+from agent_runtime.lazy import lazy_module_attrs
+from agent_runtime.tracing import traced
+from agent_runtime.workflow_state import shares_workflow_state
+from agent_runtime.intent_router import Intent, IntentRouter, JOB_PATTERN, MAKER_PATTERN, job_id, maker_ids
 
+# Seeds the dashboard read model; the tools below keep it (and other server workers) current
+register_shared("logistics_plans", LOGISTICS_PLANS, "logistics", lambda _, plan: DASHBOARD.apply_logistics_plan(plan))
+register_shared("shipments", SHIPMENT_TRACKING, "logistics", DASHBOARD.apply_shipments)
 
+
+def _record_plan(state, arguments, result):
+    state.plan_id = result["report"]["job_id"]
+    state.final_delivery_date = result["report"]["final_delivery_date"]
+
+
+@traced
+@shares_workflow_state(reads={"job_id": "job_id", "winning_makers": "winning_makers"}, record=_record_plan)
+@mutates_shared_state
 def plan_logistics(job_id: str, winning_makers: str) -> dict:
     """
     Creates a comprehensive shipping and consolidation plan for a manufacturing job.
@@ -91,6 +110,7 @@ def plan_logistics(job_id: str, winning_makers: str) -> dict:
     
     # Store plan
     LOGISTICS_PLANS[job_id] = plan
+    commit_change("logistics_plans", job_id)
     
     return {
         "status": "success",
@@ -101,6 +121,8 @@ def plan_logistics(job_id: str, winning_makers: str) -> dict:
     }
 
 
+@traced
+@shares_workflow_state(reads={"job_id": "plan_id"})
 def optimize_shipping_costs(job_id: str) -> dict:
     """
     Analyzes and optimizes shipping costs for a logistics plan.
@@ -151,6 +173,8 @@ def optimize_shipping_costs(job_id: str) -> dict:
     }
 
 
+@traced
+@shares_workflow_state(reads={"job_id": "plan_id"})
 def track_shipments(job_id: str) -> dict:
     """
     Provides real-time tracking information for all shipments in a job.
@@ -189,6 +213,63 @@ def track_shipments(job_id: str) -> dict:
     }
 
 
+@traced
+@mutates_shared_state
+def record_tracking_event(job_id: str, maker_id: str, status: str, location: str = "") -> dict:
+    """
+    Records a carrier tracking event for one manufacturer's shipment.
+    
+    Args:
+        job_id: The job identifier
+        maker_id: The manufacturer whose shipment moved (e.g., 'MAKER_A')
+        status: New shipment status ('PENDING_PICKUP', 'IN_TRANSIT' or 'DELIVERED')
+        location: Optional current location of the shipment (e.g., 'Indianapolis, IN')
+    
+    Returns:
+        dict: The updated shipment and the job's shipment counts
+    """
+    
+    status = status.upper()
+    if status not in SHIPMENT_STATUSES:
+        return {
+            "status": "error",
+            "error_message": f"Unknown shipment status {status}. Use one of: {', '.join(SHIPMENT_STATUSES)}"
+        }
+    
+    if job_id not in SHIPMENT_TRACKING and not get_logistics_plan(job_id):
+        return {
+            "status": "error",
+            "error_message": f"No logistics plan found for {job_id}."
+        }
+    
+    now = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    tracking_data = SHIPMENT_TRACKING.setdefault(job_id, {})
+    shipment = tracking_data.setdefault(maker_id, {})
+    shipment["status"] = status
+    if location:
+        shipment["current_location"] = location
+    shipment["last_update"] = now
+    if status == "DELIVERED":
+        shipment["delivered_at"] = now
+    
+    commit_change("shipments", job_id, "tracking.updated", maker_id=maker_id, **shipment)
+    
+    delivered = sum(1 for t in tracking_data.values() if t["status"] == "DELIVERED")
+    return {
+        "status": "success",
+        "report": {
+            "job_id": job_id,
+            "maker_id": maker_id,
+            "shipment": shipment,
+            "total_shipments": len(tracking_data),
+            "delivered": delivered,
+            "summary": f"✓ {maker_id} shipment for {job_id} is {status}{f' at {location}' if location else ''}. {delivered} of {len(tracking_data)} shipments delivered."
+        }
+    }
+
+
+@traced
+@shares_workflow_state(reads={"job_id": "plan_id"})
 def coordinate_consolidation(job_id: str) -> dict:
     """
     Coordinates the consolidation of parts from multiple manufacturers.
@@ -234,36 +315,92 @@ def coordinate_consolidation(job_id: str) -> dict:
     }
 
 
+def _job_params(text):
+    job = job_id(text)
+    return {"job_id": job} if job else None
+
+
+def _plan_params(text):
+    job, makers = job_id(text), maker_ids(text)
+    if not job or not makers:
+        return None
+    return {"job_id": job, "winning_makers": ",".join(dict.fromkeys(makers))}
+
+
+# Common requests that map directly onto one tool call (answered without the LLM)
+INTENT_ROUTER = IntentRouter("logistics_coordinator", [
+    Intent("track_shipments", track_shipments, [
+        rf"(?:where are|track) (?:the )?shipments (?:for|of) {JOB_PATTERN}",
+        rf"(?:what(?:'s| is) the )?(?:shipment|shipping|tracking) status (?:for|of) {JOB_PATTERN}",
+    ], params=_job_params),
+    Intent("optimize_shipping", optimize_shipping_costs, [
+        rf"(?:what(?:'s| is) the )?cheapest shipping(?: option| method)? for {JOB_PATTERN}",
+        rf"(?:optimi[sz]e|reduce) (?:the )?shipping(?: costs?)? (?:for|of) {JOB_PATTERN}",
+    ], params=_job_params),
+    Intent("coordinate_consolidation", coordinate_consolidation, [
+        rf"coordinate (?:the )?consolidation (?:for|of) {JOB_PATTERN}",
+    ], params=_job_params),
+    Intent("plan_logistics", plan_logistics, [
+        rf"plan (?:the )?(?:logistics|shipping) for {JOB_PATTERN} (?:with|using|from) {MAKER_PATTERN}(?:(?:,| and|, and) ?{MAKER_PATTERN})*",
+    ], params=_plan_params),
+])
+
+
+TOOLS = [
+    # Compact variants: map coordinates dropped, numeric costs
+    compact_tool(plan_logistics, drop=("consolidation_point",)),
+    compact_tool(optimize_shipping_costs),
+    compact_tool(track_shipments),
+    compact_tool(record_tracking_event),
+    compact_tool(coordinate_consolidation),
+]
+
+
+# Answers and read-only tool results are replayed until the data they depend on changes
+AGENT_CACHE = AgentCache("logistics_coordinator", read_only_tools=("optimize_shipping_costs", "track_shipments", "coordinate_consolidation"))
+
+
 # Create the Logistics Coordinator Agent (root_agent)
-root_agent = Agent(
-    name="logistics_coordinator",
-    model="gemini-2.0-flash",
-    description=(
-        "Logistics and shipping coordinator for Cornerstone's manufacturing network. "
-        "Plans optimal shipping routes, manages consolidation, tracks shipments, and "
-        "optimizes delivery costs across the United States."
-    ),
-    instruction=(
-        "You are the Cornerstone Logistics Coordinator, responsible for efficient product delivery.\n\n"
-        "Your primary responsibilities:\n"
-        "1. When manufacturers are selected, call plan_logistics() to create shipping plan\n"
-        "2. When asked about costs, call optimize_shipping_costs() to find savings\n"
-        "3. When asked about shipment status, call track_shipments() for real-time updates\n"
-        "4. When coordinating arrivals, call coordinate_consolidation() to manage timing\n\n"
-        "Key behaviors:\n"
-        "- Always prioritize cost-effective shipping methods\n"
-        "- Explain consolidation benefits (saves money, simplifies delivery)\n"
-        "- Provide clear timelines and ETAs\n"
-        "- Alert about delays or issues proactively\n\n"
-        "Workflow:\n"
-        "1. Bid optimization completes → You create logistics plan\n"
-        "2. Manufacturers produce → You track shipments\n"
-        "3. Parts arrive at consolidation center → You coordinate final delivery\n\n"
-        "Example interactions:\n"
-        "User: 'Plan shipping for KNICK_2025 with MAKER_A, MAKER_C, MAKER_J'\n"
-        "You: Call plan_logistics(job_id='KNICK_2025', winning_makers='MAKER_A,MAKER_C,MAKER_J'), then explain the consolidation plan.\n\n"
-        "User: 'Where are the shipments for KNICK_2025?'\n"
-        "You: Call track_shipments(job_id='KNICK_2025'), then report status of each shipment."
-    ),
-    tools=[plan_logistics, optimize_shipping_costs, track_shipments, coordinate_consolidation],
-)
+def _build_root_agent():
+    """Creates the ADK agent. Deferred (see agent_runtime/lazy.py) so importing the tools does not load ADK."""
+    from google.adk.agents import Agent
+    from agent_runtime.local_model import resolve_model
+
+    return Agent(
+        name="logistics_coordinator",
+        model=resolve_model("gemini-2.0-flash"),
+        description=(
+            "Logistics and shipping coordinator for Cornerstone's manufacturing network. "
+            "Plans optimal shipping routes, manages consolidation, tracks shipments, and "
+            "optimizes delivery costs across the United States."
+        ),
+        instruction=(
+            "You are the Cornerstone Logistics Coordinator, responsible for efficient product delivery.\n\n"
+            "Your primary responsibilities:\n"
+            "1. When manufacturers are selected, call plan_logistics() to create shipping plan\n"
+            "2. When asked about costs, call optimize_shipping_costs() to find savings\n"
+            "3. When asked about shipment status, call track_shipments() for real-time updates; record carrier updates with record_tracking_event()\n"
+            "4. When coordinating arrivals, call coordinate_consolidation() to manage timing\n\n"
+            "Key behaviors:\n"
+            "- Always prioritize cost-effective shipping methods\n"
+            "- Explain consolidation benefits (saves money, simplifies delivery)\n"
+            "- Provide clear timelines and ETAs\n"
+            "- Alert about delays or issues proactively\n"
+            "- In the orchestrated workflow, omit arguments that earlier agents already established (job_id, winning makers); the tools read them from the shared workflow state\n\n"
+            "Workflow:\n"
+            "1. Bid optimization completes → You create logistics plan\n"
+            "2. Manufacturers produce → You track shipments\n"
+            "3. Parts arrive at consolidation center → You coordinate final delivery\n\n"
+            "Example interactions:\n"
+            "User: 'Plan shipping for KNICK_2025 with MAKER_A, MAKER_C, MAKER_J'\n"
+            "You: Call plan_logistics(job_id='KNICK_2025', winning_makers='MAKER_A,MAKER_C,MAKER_J'), then explain the consolidation plan.\n\n"
+            "User: 'Where are the shipments for KNICK_2025?'\n"
+            "You: Call track_shipments(job_id='KNICK_2025'), then report status of each shipment."
+        ),
+        tools=TOOLS,
+        before_model_callback=INTENT_ROUTER.before_model_callback,
+        **AGENT_CACHE.callbacks()
+    )
+
+
+__getattr__ = lazy_module_attrs(globals(), root_agent=_build_root_agent)
@@ -38,6 +38,9 @@ LOGISTICS_PLANS = {
     }
 }
 
+# Shipment statuses, in the order a shipment goes through them
+SHIPMENT_STATUSES = ("PENDING_PICKUP", "IN_TRANSIT", "DELIVERED")
+
 # Shipment Tracking (mock)
 SHIPMENT_TRACKING = {
     "KNICK_2025": {
@@ -3,32 +3,53 @@ Master Orchestrator Agent
 Uses ADK SequentialAgent to orchestrate the complete manufacturing workflow
 
 Following ADK pattern: https://google.github.io/adk-docs/agents/workflow-agents/sequential-agents/
+
+The agent tree is built on first access to `root_agent` (see agent_runtime/lazy.py), so
+importing this module does not load ADK or build the sub-agents.
 """
 
-from google.adk.agents import SequentialAgent, LlmAgent
-
-# Import all sub-agents
-from demand_agent.agent import root_agent as demand_agent
-from bid_coordinator_agent.agent import root_agent as bid_coordinator_agent
-from cornerstone_agent.agent import root_agent as cornerstone_agent
-from timeline_agent.agent import root_agent as timeline_agent
-from logistics_agent.agent import root_agent as logistics_agent
-
-
-# Create the Master Orchestrator using SequentialAgent
-# This will execute agents in order: Demand → Bid Coordinator → Cornerstone → Timeline → Logistics
-root_agent = SequentialAgent(
-    name="master_orchestrator",
-    sub_agents=[
-        demand_agent,
-        bid_coordinator_agent,
-        cornerstone_agent,
-        timeline_agent,
-        logistics_agent
-    ],
-    description=(
-        "Master workflow orchestrator for Cornerstone's manufacturing process. "
-        "Executes the complete workflow sequentially: demand analysis → bid coordination → "
-        "optimization → timeline management → logistics planning."
+from agent_runtime.lazy import lazy_module_attrs
+
+
+# Sub-agents share a typed WorkflowState (agent_runtime/workflow_state.py) in session
+# state: tools fill in job ids, quantities and winning makers set by earlier agents.
+def _build_root_agent():
+    from google.adk.agents import SequentialAgent, ParallelAgent
+
+    # Import all sub-agents
+    from demand_agent.agent import root_agent as demand_agent
+    from bid_coordinator_agent.agent import root_agent as bid_coordinator_agent
+    from cornerstone_agent.agent import root_agent as cornerstone_agent
+    from timeline_agent.agent import root_agent as timeline_agent
+    from logistics_agent.agent import root_agent as logistics_agent
+
+    # Timeline tracking and logistics planning both only need the optimized allocation,
+    # so they run concurrently once the Cornerstone agent has finished
+    fulfillment_agent = ParallelAgent(
+        name="fulfillment_planning",
+        sub_agents=[
+            timeline_agent,
+            logistics_agent
+        ],
+        description="Runs timeline management and logistics planning concurrently."
     )
-)
+
+    # Create the Master Orchestrator using SequentialAgent
+    # This will execute agents in order: Demand → Bid Coordinator → Cornerstone → (Timeline ‖ Logistics)
+    return SequentialAgent(
+        name="master_orchestrator",
+        sub_agents=[
+            demand_agent,
+            bid_coordinator_agent,
+            cornerstone_agent,
+            fulfillment_agent
+        ],
+        description=(
+            "Master workflow orchestrator for Cornerstone's manufacturing process. "
+            "Executes the complete workflow: demand analysis → bid coordination → "
+            "optimization → timeline management and logistics planning in parallel."
+        )
+    )
+
+
+__getattr__ = lazy_module_attrs(globals(), root_agent=_build_root_agent)
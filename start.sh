@@ -1,5 +1,10 @@
 #!/bin/bash
 cd /Users/capeie/devfest
 source .venv/bin/activate
+if [ "$1" = "prod" ]; then
+    # Preloaded multi-worker server with graceful drain (see backend/gunicorn.conf.py)
+    echo "Starting Cornerstone (production) on http://localhost:5001"
+    exec gunicorn -c backend/gunicorn.conf.py
+fi
 echo "Starting Cornerstone on http://localhost:5001"
 python backend/app.py
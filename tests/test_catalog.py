@@ -0,0 +1,45 @@
+"""
+Catalog Tests
+Page sizes given to the catalog and to the demand routes
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+os.environ.setdefault("CORNERSTONE_LLM_BACKEND", "local")
+os.environ.setdefault("CORNERSTONE_CACHE_DIR", "off")
+os.environ.setdefault("CORNERSTONE_FAST_START", "1")
+
+from app import app  # noqa: E402
+from demand_agent.catalog import CATALOG  # noqa: E402
+
+
+def test_top_k_returns_at_least_one_product():
+    for k in (0, -1, -50):
+        products, _ = CATALOG.top_k(k)
+        assert len(products) == 1
+        assert products[0] == CATALOG.top_k(1)[0][0]
+
+
+def test_recommendations_limit_that_is_not_a_number_gets_the_default():
+    response = app.test_client().get("/api/recommendations?limit=abc")
+
+    assert response.status_code == 200
+    assert response.get_json()["status"] == "success"
+
+
+def test_negative_limit_still_names_a_top_pick():
+    client = app.test_client()
+
+    recommendations = client.get("/api/recommendations?limit=-1&min_score=0").get_json()
+    trends = client.post("/api/analyze-demand", json={"limit": -1}).get_json()
+    fallback = client.post("/api/analyze-demand", json={"limit": "abc"})
+
+    assert recommendations["report"]["top_pick"] is not None
+    assert trends["report"]["recommendation"] is not None
+    assert fallback.status_code == 200
@@ -0,0 +1,60 @@
+"""
+Change Event Tests
+Last-Event-ID replay on reconnect, and unsubscribing streams that never started
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from agent_runtime.events import ChangeBus, stream_changes  # noqa: E402
+
+
+def _buffered(subscription):
+    return [event.event_id for event in subscription.next_events(0)]
+
+
+def test_gap_larger_than_the_buffer_asks_for_a_resync():
+    bus = ChangeBus()
+    for _ in range(500):
+        bus.publish("bid.submitted", "JOB_A")
+
+    subscription = bus.subscribe(last_event_id=100)
+
+    assert subscription.resync
+    assert _buffered(subscription) == []
+
+
+def test_replay_filters_before_limiting_to_the_buffer():
+    bus = ChangeBus()
+    for i in range(600):
+        bus.publish("bid.submitted", "JOB_A" if i % 3 == 0 else "JOB_B")
+
+    subscription = bus.subscribe(job_ids=["JOB_A"], last_event_id=0)
+
+    assert not subscription.resync
+    assert _buffered(subscription) == list(range(1, 601, 3))
+
+
+def test_retained_gap_is_replayed_in_full():
+    bus = ChangeBus()
+    for _ in range(300):
+        bus.publish("timeline.updated", "JOB_A")
+
+    subscription = bus.subscribe(last_event_id=100)
+
+    assert not subscription.resync
+    assert _buffered(subscription) == list(range(101, 301))
+
+
+def test_closing_an_unstarted_stream_unsubscribes():
+    bus = ChangeBus()
+    stream = stream_changes(bus.subscribe(), bus)
+
+    stream.close()
+
+    assert bus.stats()["subscribers"] == 0
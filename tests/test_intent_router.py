@@ -0,0 +1,38 @@
+"""
+Intent Router Tests
+Maker ids in routed timeline queries: singular mentions, and the plural "makers"
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.environ.setdefault("CORNERSTONE_CACHE_DIR", "off")
+
+from agent_runtime.intent_router import maker_ids  # noqa: E402
+from timeline_agent.agent import INTENT_ROUTER  # noqa: E402
+
+
+def _routed(text):
+    intent, args = INTENT_ROUTER.route(text)
+    return intent.name, args
+
+
+def test_plural_makers_is_not_a_maker_id():
+    assert maker_ids("Which makers are delayed?") == []
+    assert maker_ids("status of all the makers") == []
+    assert maker_ids("Is Maker B on track? And maker_c?") == ["MAKER_B", "MAKER_C"]
+
+
+def test_plural_status_questions_route_to_every_timeline():
+    for text in ("Which makers are delayed?", "Which makers are on track?",
+                 "What's the status of all the makers?", "status of the makers"):
+        assert _routed(text) == ("timeline_status", {"maker_id": ""}), text
+
+
+def test_single_maker_status_routes_to_that_maker():
+    assert _routed("Is Maker B on track?") == ("timeline_status", {"maker_id": "MAKER_B"})
+    assert _routed("What is the status of maker_a?") == ("timeline_status", {"maker_id": "MAKER_A"})
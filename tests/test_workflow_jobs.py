@@ -0,0 +1,123 @@
+"""
+Workflow Job Tests
+Background workflow jobs served by every worker of a multi-worker gunicorn server
+
+    python -m pytest tests
+"""
+
+import http.client
+import json
+import os
+import signal
+import socket
+import subprocess
+import sys
+import time
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+pytest.importorskip("gunicorn")
+
+STARTUP_TIMEOUT_SECONDS = 120
+JOB_TIMEOUT_SECONDS = 60
+
+
+def _free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _request(port, method, path, body=None):
+    # A fresh connection per request, so requests spread over the workers
+    connection = http.client.HTTPConnection("127.0.0.1", port, timeout=JOB_TIMEOUT_SECONDS)
+    try:
+        payload = json.dumps(body).encode() if body is not None else None
+        connection.request(method, path, payload, {"Content-Type": "application/json", "Connection": "close"})
+        response = connection.getresponse()
+        return response.status, response.read()
+    finally:
+        connection.close()
+
+
+@pytest.fixture(scope="module")
+def server():
+    port = _free_port()
+    env = dict(
+        os.environ,
+        CORNERSTONE_LLM_BACKEND="local",
+        CORNERSTONE_CACHE_DIR="off",
+        CORNERSTONE_FAST_START="1",
+        CORNERSTONE_ADMISSION="off",
+        CORNERSTONE_BIND=f"127.0.0.1:{port}",
+        CORNERSTONE_WEB_WORKERS="2",
+        CORNERSTONE_WEB_THREADS="4",
+    )
+    env.pop("CORNERSTONE_SHARED_STATE", None)
+    process = subprocess.Popen([sys.executable, "-m", "gunicorn", "-c", "backend/gunicorn.conf.py"], cwd=ROOT, env=env)
+    try:
+        deadline = time.monotonic() + STARTUP_TIMEOUT_SECONDS
+        pids = set()
+        while len(pids) < 2:
+            if process.poll() is not None or time.monotonic() > deadline:
+                pytest.fail("gunicorn did not start two workers")
+            try:
+                status, data = _request(port, "GET", "/api/health")
+                if status == 200:
+                    pids.add(json.loads(data)["worker_pid"])
+                    continue
+            except OSError:
+                pass
+            time.sleep(0.5)
+        yield port
+    finally:
+        process.send_signal(signal.SIGTERM)
+        try:
+            process.wait(timeout=90)
+        except subprocess.TimeoutExpired:
+            process.kill()
+
+
+def test_any_worker_reports_a_jobs_status(server):
+    status, data = _request(server, "POST", "/api/workflow-jobs", {})
+    assert status == 202, data
+    job_id = json.loads(data)["report"]["job_id"]
+
+    deadline = time.monotonic() + JOB_TIMEOUT_SECONDS
+    pids = set()
+    report = None
+    while time.monotonic() < deadline and (len(pids) < 2 or report["status"] != "SUCCEEDED"):
+        status, data = _request(server, "GET", f"/api/workflow-jobs/{job_id}")
+        assert status == 200, data
+        report = json.loads(data)["report"]
+        status, data = _request(server, "GET", "/api/health")
+        pids.add(json.loads(data)["worker_pid"])
+        time.sleep(0.1)
+
+    assert report["status"] == "SUCCEEDED", report
+    assert report["steps_completed"]
+    assert len(pids) == 2
+
+
+def test_any_worker_replays_a_jobs_events(server):
+    status, data = _request(server, "POST", "/api/workflow-jobs", {})
+    job_id = json.loads(data)["report"]["job_id"]
+
+    for _ in range(4):
+        status, data = _request(server, "GET", f"/api/workflow-jobs/{job_id}/events")
+        assert status == 200, data
+        names = [line.split(": ", 1)[1] for line in data.decode().splitlines() if line.startswith("event: ")]
+        assert names[0] == "started"
+        assert names[-1] == "complete"
+
+    status, data = _request(server, "GET", f"/api/workflow-jobs/{job_id}/events")
+    last_id = max(int(line[4:]) for line in data.decode().splitlines() if line.startswith("id: "))
+    connection = http.client.HTTPConnection("127.0.0.1", server, timeout=JOB_TIMEOUT_SECONDS)
+    try:
+        connection.request("GET", f"/api/workflow-jobs/{job_id}/events", headers={"Last-Event-ID": str(last_id - 1)})
+        resumed = connection.getresponse().read().decode()
+    finally:
+        connection.close()
+    assert [line for line in resumed.splitlines() if line.startswith("id: ")] == [f"id: {last_id}"]
@@ -0,0 +1,39 @@
+"""
+Workflow Tests
+Repeated Flask workflow runs, through the synchronous route
+
+    python -m pytest tests
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+sys.path.insert(0, os.path.join(ROOT, "backend"))
+os.environ.setdefault("CORNERSTONE_LLM_BACKEND", "local")
+os.environ.setdefault("CORNERSTONE_CACHE_DIR", "off")
+os.environ.setdefault("CORNERSTONE_FAST_START", "1")
+
+from app import app  # noqa: E402
+from bid_coordinator_agent.bid_windows import BID_WINDOWS  # noqa: E402
+
+
+def test_workflow_runs_twice_with_separate_bid_windows():
+    client = app.test_client()
+
+    first = client.post("/api/complete-workflow-flask", json={})
+    second = client.post("/api/complete-workflow-flask", json={})
+
+    assert first.status_code == 200, first.get_json()
+    assert second.status_code == 200, second.get_json()
+    jobs = [r.get_json()["workflow"]["step_2_bid"]["job_id"] for r in (first, second)]
+    assert jobs[0] != jobs[1]
+    for job in jobs:
+        assert BID_WINDOWS[job]["status"] == "CLOSED"
+
+
+def test_workflow_reports_the_closed_window_bid_count():
+    step = app.test_client().post("/api/complete-workflow-flask", json={}).get_json()["workflow"]["step_2_bid"]
+
+    assert step["total_bids"] == BID_WINDOWS[step["job_id"]]["total_bids"]
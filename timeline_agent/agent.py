@@ -5,8 +5,14 @@ ADK Agent for handling manufacturer timeline updates and communication
 Following ADK pattern: https://google.github.io/adk-docs/get-started/quickstart/
 """
 
-from google.adk.agents import Agent
 from datetime import datetime, timedelta
+from agent_runtime.read_model import DASHBOARD
+from agent_runtime.shared_state import register_shared, commit_change, mutates_shared_state
+from agent_runtime.agent_cache import AgentCache
+from agent_runtime.compact import compact_tool
+from agent_runtime.lazy import lazy_module_attrs
+from agent_runtime.tracing import traced
+from agent_runtime.intent_router import Intent, IntentRouter, JOB_PATTERN, MAKER_PATTERN, maker_id, iso_date, day_count
 
 
 # Mock timeline database - tracks active manufacturing jobs
@@ -34,7 +40,12 @@ TIMELINES = {
     },
 }
 
+# Seeds the dashboard read model; update_timeline keeps it (and other server workers) current
+register_shared("timelines", TIMELINES, "timelines", DASHBOARD.apply_timeline)
 
+
+@traced
+@mutates_shared_state
 def update_timeline(maker_id: str, new_completion_date: str, reason: str = "") -> dict:
     """
     Updates the completion timeline for a specific manufacturer.
@@ -58,10 +69,7 @@ def update_timeline(maker_id: str, new_completion_date: str, reason: str = "") -
     # Store old date
     old_date = TIMELINES[maker_id]["current_date"]
     
-    # Update the timeline
-    TIMELINES[maker_id]["current_date"] = new_completion_date
-    
-    # Calculate delay in days
+    # Calculate delay in days (before changing anything, so a bad date leaves the timeline as it was)
     try:
         old_dt = datetime.strptime(old_date, "%Y-%m-%d")
         new_dt = datetime.strptime(new_completion_date, "%Y-%m-%d")
@@ -72,6 +80,9 @@ def update_timeline(maker_id: str, new_completion_date: str, reason: str = "") -
             "error_message": "Invalid date format. Please use YYYY-MM-DD format."
         }
     
+    # Update the timeline
+    TIMELINES[maker_id]["current_date"] = new_completion_date
+    
     # Update status based on delay
     if delay_days > 0:
         TIMELINES[maker_id]["status"] = "delayed"
@@ -85,6 +96,9 @@ def update_timeline(maker_id: str, new_completion_date: str, reason: str = "") -
     
     # Calculate overall project completion (latest date among all makers)
     latest_date = max(t["current_date"] for t in TIMELINES.values())
+    commit_change("timelines", maker_id, "timeline.updated", job_id=TIMELINES[maker_id]["job_id"], maker_id=maker_id,
+                  old_completion_date=old_date, new_completion_date=new_completion_date, delay_days=delay_days,
+                  timeline_status=TIMELINES[maker_id]["status"], project_completion=latest_date)
     
     # Build response
     result = {
@@ -105,6 +119,7 @@ def update_timeline(maker_id: str, new_completion_date: str, reason: str = "") -
     return result
 
 
+@traced
 def get_timeline_status(maker_id: str = "") -> dict:
     """
     Retrieves the current timeline status for manufacturers working on active jobs.
@@ -153,6 +168,7 @@ def get_timeline_status(maker_id: str = "") -> dict:
         }
 
 
+@traced
 def send_message_to_manufacturer(maker_id: str, message: str) -> dict:
     """
     Sends a message or question to a specific manufacturer.
@@ -188,31 +204,87 @@ def send_message_to_manufacturer(maker_id: str, message: str) -> dict:
 
 # Create the Timeline Manager Agent (root_agent)
 # Following ADK pattern from: https://google.github.io/adk-docs/get-started/quickstart/#agentpy
-root_agent = Agent(
-    name="timeline_manager",
-    model="gemini-2.0-flash",
-    description=(
-        "Timeline and communication manager for Cornerstone's manufacturing network. "
-        "Handles schedule updates, delays, and manufacturer communications for active production jobs. "
-        "Ensures project coordination and recalculates logistics when timelines change."
-    ),
-    instruction=(
-        "You are the Cornerstone Timeline Manager, responsible for coordinating manufacturer schedules.\n\n"
-        "Your primary responsibilities:\n"
-        "1. When manufacturers report delays or timeline changes, call update_timeline() to record the new date and recalculate project impact\n"
-        "2. When asked about project status or specific manufacturer timelines, call get_timeline_status()\n"
-        "3. When you need to communicate with a manufacturer, call send_message_to_manufacturer()\n\n"
-        "Key behaviors:\n"
-        "- Be professional and understanding when handling delays - manufacturers are partners, not adversaries\n"
-        "- Always acknowledge timeline updates and clearly communicate the impact on overall project completion\n"
-        "- When delays occur, focus on solutions and recalculated timelines rather than blame\n"
-        "- Provide clear summaries of project status including which manufacturers are on track vs delayed\n\n"
-        "Example interactions:\n"
-        "User: 'Maker_A has a delay, need 2 more days for KNICK_2025'\n"
-        "You: Call update_timeline(maker_id='MAKER_A', new_completion_date='2025-11-04', reason='2-day delay'), then respond:\n"
-        "'Acknowledged. I've updated Maker A's schedule to November 4th. The overall project completion has been recalculated. [Provide impact summary]'\n\n"
-        "User: 'What's the status of all manufacturers?'\n"
-        "You: Call get_timeline_status() and summarize who's on track, who's delayed, and the overall completion date."
-    ),
-    tools=[update_timeline, get_timeline_status, send_message_to_manufacturer],
-)
+def _delay_params(text):
+    maker = maker_id(text)
+    if maker not in TIMELINES:
+        return None
+    new_date = iso_date(text)
+    days = day_count(text)
+    if new_date is None:
+        if days is None:
+            return None
+        current = datetime.strptime(TIMELINES[maker]["current_date"], "%Y-%m-%d")
+        new_date = (current + timedelta(days=days)).strftime("%Y-%m-%d")
+    reason = f"{days}-day delay" if days is not None else "schedule change"
+    return {"maker_id": maker, "new_completion_date": new_date, "reason": reason}
+
+
+# Common requests that map directly onto one tool call (answered without the LLM)
+INTENT_ROUTER = IntentRouter("timeline_manager", [
+    Intent("report_delay", update_timeline, [
+        rf"{MAKER_PATTERN} (?:has|reports|reported) (?:a )?delay,? (?:and )?(?:needs?|needing) \d+ (?:more |extra |additional )?days?(?: for {JOB_PATTERN})?",
+        rf"{MAKER_PATTERN} (?:is|will be) (?:delayed|late|behind)(?: by)? \d+ days?(?: (?:for|on) {JOB_PATTERN})?",
+        rf"(?:move|reschedule|push) {MAKER_PATTERN}(?:'s)?(?: completion| deadline| date)* (?:back )?to \d{{4}}-\d{{2}}-\d{{2}}",
+        rf"(?:delay|push back) {MAKER_PATTERN} by \d+ days?",
+    ], params=_delay_params),
+    Intent("timeline_status", get_timeline_status, [
+        r"(?:what(?:'s| is) the )?(?:timeline |project )?status of (?:all )?(?:the )?(?:manufacturers|makers)",
+        r"(?:what(?:'s| is) the |show(?: me)? (?:the )?|get (?:the )?)?(?:project|timeline) status",
+        r"(?:show(?: me)?|get|list) (?:all )?(?:the )?timelines",
+        r"(?:who is|which (?:manufacturers|makers) are) (?:delayed|on track)",
+        rf"(?:what(?:'s| is) the )?(?:timeline )?status (?:of|for) {MAKER_PATTERN}",
+        rf"is {MAKER_PATTERN} on (?:track|schedule|time)",
+    ], params=lambda text: {"maker_id": maker_id(text) or ""}),
+])
+
+
+TOOLS = [
+    # Compact variants: updates no longer echo every other manufacturer's timeline
+    compact_tool(update_timeline, drop=("all_timelines",)),
+    compact_tool(get_timeline_status),
+    compact_tool(send_message_to_manufacturer, drop=("message_sent",)),
+]
+
+
+# Answers and read-only tool results are replayed until the data they depend on changes
+AGENT_CACHE = AgentCache("timeline_manager", read_only_tools=("get_timeline_status",))
+
+
+def _build_root_agent():
+    """Creates the ADK agent. Deferred (see agent_runtime/lazy.py) so importing the tools does not load ADK."""
+    from google.adk.agents import Agent
+    from agent_runtime.local_model import resolve_model
+
+    return Agent(
+        name="timeline_manager",
+        model=resolve_model("gemini-2.0-flash"),
+        description=(
+            "Timeline and communication manager for Cornerstone's manufacturing network. "
+            "Handles schedule updates, delays, and manufacturer communications for active production jobs. "
+            "Ensures project coordination and recalculates logistics when timelines change."
+        ),
+        instruction=(
+            "You are the Cornerstone Timeline Manager, responsible for coordinating manufacturer schedules.\n\n"
+            "Your primary responsibilities:\n"
+            "1. When manufacturers report delays or timeline changes, call update_timeline() to record the new date and recalculate project impact\n"
+            "2. When asked about project status or specific manufacturer timelines, call get_timeline_status()\n"
+            "3. When you need to communicate with a manufacturer, call send_message_to_manufacturer()\n\n"
+            "Key behaviors:\n"
+            "- Be professional and understanding when handling delays - manufacturers are partners, not adversaries\n"
+            "- Always acknowledge timeline updates and clearly communicate the impact on overall project completion\n"
+            "- When delays occur, focus on solutions and recalculated timelines rather than blame\n"
+            "- Provide clear summaries of project status including which manufacturers are on track vs delayed\n\n"
+            "Example interactions:\n"
+            "User: 'Maker_A has a delay, need 2 more days for KNICK_2025'\n"
+            "You: Call update_timeline(maker_id='MAKER_A', new_completion_date='2025-11-04', reason='2-day delay'), then respond:\n"
+            "'Acknowledged. I've updated Maker A's schedule to November 4th. The overall project completion has been recalculated. [Provide impact summary]'\n\n"
+            "User: 'What's the status of all manufacturers?'\n"
+            "You: Call get_timeline_status() and summarize who's on track, who's delayed, and the overall completion date."
+        ),
+        tools=TOOLS,
+        before_model_callback=INTENT_ROUTER.before_model_callback,
+        **AGENT_CACHE.callbacks()
+    )
+
+
+__getattr__ = lazy_module_attrs(globals(), root_agent=_build_root_agent)